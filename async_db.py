@@ -0,0 +1,184 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import database as db
+
+# Semua akses SQLite dijalankan di thread khusus supaya event loop bot
+# tidak pernah menunggu query/commit database. Pembacaan memakai beberapa
+# thread (satu per koneksi pembaca di pool), penulisan cukup satu thread
+# karena SQLite hanya mengizinkan satu penulis.
+_read_executor = ThreadPoolExecutor(max_workers=db.READER_POOL_SIZE, thread_name_prefix="db-read")
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+
+
+async def _run(executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_read(func, *args, **kwargs):
+    """Menjalankan fungsi baca database sinkron di executor pembaca."""
+    return await _run(_read_executor, func, *args, **kwargs)
+
+
+async def run_write(func, *args, **kwargs):
+    """Menjalankan fungsi tulis database sinkron di executor penulis."""
+    return await _run(_write_executor, func, *args, **kwargs)
+
+
+def shutdown():
+    """Menghentikan executor dan menutup pool koneksi (dipanggil saat bot berhenti)."""
+    _read_executor.shutdown(wait=True)
+    _write_executor.shutdown(wait=True)
+    db.close_all()
+
+
+async def get_matkul(chat_id):
+    """Versi async dari db.get_matkul()."""
+    return await run_read(db.get_matkul, chat_id)
+
+
+async def get_semua_matkul():
+    """Versi async dari db.get_semua_matkul()."""
+    return await run_read(db.get_semua_matkul)
+
+
+async def add_matkul(chat_id, nama, hari, jam, ruangan):
+    """Versi async dari db.add_matkul()."""
+    return await run_write(db.add_matkul, chat_id, nama, hari, jam, ruangan)
+
+
+async def delete_matkul(chat_id, matkul_id):
+    """Versi async dari db.delete_matkul()."""
+    return await run_write(db.delete_matkul, chat_id, matkul_id)
+
+
+async def get_nama_matkul(chat_id):
+    """Versi async dari db.get_nama_matkul()."""
+    return await run_read(db.get_nama_matkul, chat_id)
+
+
+async def add_tugas(chat_id, matkul, deskripsi, deadline, deadline_ts=None):
+    """Versi async dari db.add_tugas()."""
+    return await run_write(db.add_tugas, chat_id, matkul, deskripsi, deadline, deadline_ts)
+
+
+async def get_tugas(chat_id, status='pending'):
+    """Versi async dari db.get_tugas()."""
+    return await run_read(db.get_tugas, chat_id, status)
+
+
+async def get_tugas_page(chat_id, status, limit, offset):
+    """Versi async dari db.get_tugas_page()."""
+    return await run_read(db.get_tugas_page, chat_id, status, limit, offset)
+
+
+async def get_tugas_deadline_range(mulai_ts, akhir_ts, status='pending'):
+    """Versi async dari db.get_tugas_deadline_range()."""
+    return await run_read(db.get_tugas_deadline_range, mulai_ts, akhir_ts, status)
+
+
+async def update_tugas_status(chat_id, tugas_id, status):
+    """Versi async dari db.update_tugas_status()."""
+    return await run_write(db.update_tugas_status, chat_id, tugas_id, status)
+
+
+async def delete_tugas(chat_id, tugas_id):
+    """Versi async dari db.delete_tugas()."""
+    return await run_write(db.delete_tugas, chat_id, tugas_id)
+
+
+async def update_status_banyak(chat_id, tugas_ids, status):
+    """Versi async dari db.update_status_banyak()."""
+    return await run_write(db.update_status_banyak, chat_id, tugas_ids, status)
+
+
+async def delete_tugas_banyak(chat_id, tugas_ids):
+    """Versi async dari db.delete_tugas_banyak()."""
+    return await run_write(db.delete_tugas_banyak, chat_id, tugas_ids)
+
+
+async def get_tugas_selesai_page(chat_id, limit, offset):
+    """Versi async dari db.get_tugas_selesai_page()."""
+    return await run_read(db.get_tugas_selesai_page, chat_id, limit, offset)
+
+
+async def arsipkan_tugas(batas_selesai, batas_deadline, batch=500):
+    """Versi async dari db.arsipkan_tugas()."""
+    return await run_write(db.arsipkan_tugas, batas_selesai, batas_deadline, batch)
+
+
+async def rawat_database(halaman=2000):
+    """Versi async dari db.rawat_database()."""
+    return await run_write(db.rawat_database, halaman)
+
+
+async def clear_all_tugas(chat_id):
+    """Versi async dari db.clear_all_tugas()."""
+    return await run_write(db.clear_all_tugas, chat_id)
+
+
+async def import_matkul(chat_id, baris):
+    """Versi async dari db.import_matkul()."""
+    return await run_write(db.import_matkul, chat_id, baris)
+
+
+async def import_tugas(chat_id, baris):
+    """Versi async dari db.import_tugas()."""
+    return await run_write(db.import_tugas, chat_id, baris)
+
+
+async def cari_tugas(chat_ids, teks, limit, offset=0):
+    """Versi async dari db.cari_tugas()."""
+    return await run_read(db.cari_tugas, chat_ids, teks, limit, offset)
+
+
+async def tambah_anggota_chat(user_id, chat_id):
+    """Versi async dari db.tambah_anggota_chat()."""
+    return await run_write(db.tambah_anggota_chat, user_id, chat_id)
+
+
+async def get_chat_user(user_id):
+    """Versi async dari db.get_chat_user()."""
+    return await run_read(db.get_chat_user, user_id)
+
+
+async def get_percakapan(nama):
+    """Versi async dari db.get_percakapan()."""
+    return await run_read(db.get_percakapan, nama)
+
+
+async def get_data_persisten(tabel):
+    """Versi async dari db.get_data_persisten()."""
+    return await run_read(db.get_data_persisten, tabel)
+
+
+async def simpan_persisten(percakapan, user_data, chat_data):
+    """Versi async dari db.simpan_persisten()."""
+    return await run_write(db.simpan_persisten, percakapan, user_data, chat_data)
+
+
+async def ambil_lease(nama, pemilik, durasi):
+    """Versi async dari db.ambil_lease()."""
+    return await run_write(db.ambil_lease, nama, pemilik, durasi)
+
+
+async def lepas_lease(nama, pemilik):
+    """Versi async dari db.lepas_lease()."""
+    return await run_write(db.lepas_lease, nama, pemilik)
+
+
+async def pasang_pencatat_perubahan(instance):
+    """Versi async dari db.pasang_pencatat_perubahan()."""
+    return await run_write(db.pasang_pencatat_perubahan, instance)
+
+
+async def get_perubahan_luar(instance):
+    """Versi async dari db.get_perubahan_luar()."""
+    return await run_read(db.get_perubahan_luar, instance)
+
+
+async def hapus_perubahan_lama(batas):
+    """Versi async dari db.hapus_perubahan_lama()."""
+    return await run_write(db.hapus_perubahan_lama, batas)
@@ -0,0 +1,164 @@
+import asyncio
+import datetime
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+
+import async_db as adb
+import database as db
+from deadline import WIB
+
+BACKUP_DIR = os.getenv('BACKUP_DIR', 'backup')
+# Jumlah snapshot terjadwal dan snapshot /backup yang disimpan (masing-masing); yang lebih lama dihapus.
+BACKUP_SIMPAN = int(os.getenv('BACKUP_SIMPAN', '7'))
+BACKUP_SIMPAN_MANUAL = int(os.getenv('BACKUP_SIMPAN_MANUAL', '3'))
+BACKUP_GZIP = os.getenv('BACKUP_GZIP', '1') != '0'
+
+# Halaman yang disalin per langkah backup, dan jeda antarlangkah (detik).
+HALAMAN_PER_LANGKAH = 256
+JEDA_LANGKAH = 0.002
+TABEL_WAJIB = ('mata_kuliah', 'tugas')
+
+_RE_WAKTU_SNAPSHOT = re.compile(r'-(\d{8}-\d{6})\.db(?:\.gz)?$')
+
+_lock = asyncio.Lock()
+
+
+class RestoreGagal(Exception):
+    """Snapshot tidak ditemukan, rusak, atau bukan database bot ini."""
+
+
+def daftar_snapshot():
+    """
+    Nama berkas snapshot di BACKUP_DIR, terbaru lebih dulu menurut waktu di
+    namanya (apa pun awalannya); berkas tanpa waktu di nama paling akhir.
+    """
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    nama = [n for n in os.listdir(BACKUP_DIR) if n.endswith(('.db', '.db.gz')) and not n.startswith('.')]
+
+    def waktu(n):
+        cocok = _RE_WAKTU_SNAPSHOT.search(n)
+        return (cocok.group(1) if cocok else '', n)
+    return sorted(nama, key=waktu, reverse=True)
+
+
+def periksa_konfigurasi() -> None:
+    """Dipanggil saat bot mulai; ValueError jika jumlah snapshot yang disimpan tidak masuk akal."""
+    for nama, nilai in (('BACKUP_SIMPAN', BACKUP_SIMPAN), ('BACKUP_SIMPAN_MANUAL', BACKUP_SIMPAN_MANUAL)):
+        if nilai < 1:
+            raise ValueError(f"{nama} minimal 1 (sekarang {nilai}).")
+
+
+def _rotasi(prefix: str, simpan: int, baru: str) -> None:
+    """Menyisakan `simpan` snapshot berawalan `prefix`, termasuk `baru` yang tidak pernah dihapus."""
+    lama = [n for n in daftar_snapshot() if n.startswith(prefix + '-') and n != baru]
+    for nama in lama[max(simpan - 1, 0):]:
+        os.remove(os.path.join(BACKUP_DIR, nama))
+
+
+def buat_snapshot(prefix: str = 'tugas', simpan: int = BACKUP_SIMPAN) -> str:
+    """
+    Menyalin database ke BACKUP_DIR dengan online backup API SQLite, lalu
+    (opsional) mengompresnya dan merotasi snapshot lama berawalan `prefix`
+    (hanya `simpan` terbaru yang disisakan). Mengembalikan nama berkas.
+
+    Sumbernya koneksi baca tersendiri yang menahan satu transaksi baca
+    selama backup: snapshot konsisten, dan karena WAL, penulis tidak pernah
+    tertahan serta backup tidak perlu mengulang dari awal saat ada tulisan
+    baru. Penyalinan berjalan per HALAMAN_PER_LANGKAH halaman.
+    """
+    if simpan < 1:
+        raise ValueError(f"simpan minimal 1 (sekarang {simpan}).")
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    nama = f"{prefix}-{datetime.datetime.now(WIB).strftime('%Y%m%d-%H%M%S')}.db"
+    path = os.path.join(BACKUP_DIR, nama)
+    sementara = os.path.join(BACKUP_DIR, f".{nama}.tmp")
+
+    sumber = db.get_db_connection(readonly=True)
+    tujuan = sqlite3.connect(sementara)
+    try:
+        sumber.execute("BEGIN")
+        sumber.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        sumber.backup(tujuan, pages=HALAMAN_PER_LANGKAH, sleep=JEDA_LANGKAH)
+        # Snapshot cukup satu berkas tanpa -wal/-shm.
+        tujuan.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        tujuan.close()
+        sumber.close()
+
+    if BACKUP_GZIP:
+        nama += '.gz'
+        path += '.gz'
+        with open(sementara, 'rb') as masuk, gzip.open(sementara + '.gz', 'wb', compresslevel=6) as keluar:
+            shutil.copyfileobj(masuk, keluar, 1024 * 1024)
+        os.remove(sementara)
+        sementara += '.gz'
+    os.replace(sementara, path)
+    _rotasi(prefix, simpan, nama)
+    return nama
+
+
+def pulihkan_snapshot(nama: str, default_chat_id=None) -> None:
+    """
+    Mengganti isi database dengan snapshot `nama` setelah lolos integrity_check,
+    lalu memigrasikannya ke skema terbaru (db.pulihkan_dari). Disalin lewat
+    koneksi penulis (dijalankan di executor penulis), jadi penulisan lain
+    menunggu sampai selesai sementara pembaca tetap jalan.
+    """
+    if nama not in daftar_snapshot():
+        raise RestoreGagal(f"snapshot {nama} tidak ada.")
+    path = os.path.join(BACKUP_DIR, nama)
+    sementara = os.path.join(BACKUP_DIR, f".restore-{os.getpid()}.tmp")
+    try:
+        if nama.endswith('.gz'):
+            with gzip.open(path, 'rb') as masuk, open(sementara, 'wb') as keluar:
+                shutil.copyfileobj(masuk, keluar, 1024 * 1024)
+        else:
+            shutil.copyfile(path, sementara)
+
+        sumber = sqlite3.connect(sementara)
+        try:
+            try:
+                hasil = sumber.execute("PRAGMA integrity_check").fetchall()
+                tabel = {row[0] for row in sumber.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            except sqlite3.DatabaseError as e:
+                raise RestoreGagal(f"snapshot rusak ({e}).")
+            if hasil != [('ok',)]:
+                raise RestoreGagal(f"integrity_check gagal: {hasil[0][0]}")
+            if not set(TABEL_WAJIB) <= tabel:
+                raise RestoreGagal("snapshot bukan database bot ini.")
+            db.pulihkan_dari(sumber, default_chat_id)
+        finally:
+            sumber.close()
+    except OSError as e:
+        raise RestoreGagal(f"snapshot tidak bisa dibaca ({e}).")
+    finally:
+        if os.path.exists(sementara):
+            os.remove(sementara)
+
+
+async def backup(prefix: str = 'tugas', simpan: int = BACKUP_SIMPAN) -> str:
+    """Membuat snapshot tanpa menahan event loop maupun penulis database."""
+    async with _lock:
+        return await asyncio.to_thread(buat_snapshot, prefix, simpan)
+
+
+async def backup_manual() -> str:
+    """Snapshot /backup: berawalan 'manual' dengan rotasinya sendiri, jadi tidak menggeser snapshot terjadwal."""
+    return await backup('manual', BACKUP_SIMPAN_MANUAL)
+
+
+async def restore(nama: str, default_chat_id=None) -> str:
+    """
+    Memulihkan snapshot `nama`. Database saat ini lebih dulu disimpan sebagai
+    snapshot 'pra-restore' supaya restore bisa dibatalkan. Mengembalikan nama snapshot tersebut.
+    """
+    async with _lock:
+        if nama not in daftar_snapshot():
+            raise RestoreGagal(f"snapshot {nama} tidak ada.")
+        cadangan = await asyncio.to_thread(buat_snapshot, 'pra-restore', 3)
+        await adb.run_write(pulihkan_snapshot, nama, default_chat_id)
+        return cadangan
@@ -0,0 +1,308 @@
+"""
+Benchmark throughput dan latensi handler bot.py.
+
+Menjalankan Application dan handler asli dengan Update sintetis terhadap
+Bot API tiruan (tanpa jaringan) dan database tugas.db sementara berisi
+sejumlah tugas. Contoh:
+
+    python benchmark.py --tugas 10000 --updates 5000 --konkurensi 32
+
+Hasil: updates/detik, latensi p50/p95/p99 per skenario, dan waktu DB.
+"""
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark handler bot tugas.")
+    parser.add_argument("--tugas", type=int, default=1000, help="jumlah tugas di database (10 - 100000)")
+    parser.add_argument("--chat", type=int, default=20, help="jumlah chat yang berbagi tugas")
+    parser.add_argument("--updates", type=int, default=2000, help="jumlah update sintetis")
+    parser.add_argument("--konkurensi", type=int, default=16, help="update yang diproses bersamaan")
+    parser.add_argument("--latensi-api", type=float, default=0.0, help="latensi Bot API tiruan (ms)")
+    parser.add_argument("--pengingat", type=int, default=5, help="berapa kali job pengingat harian dijalankan")
+    parser.add_argument("--outbox", action="store_true", help="pakai OutboxRateLimiter asli (ikut batas Telegram)")
+    parser.add_argument("--ratelimit", action="store_true", help="pakai pembatas update masuk asli (per user/chat)")
+    parser.add_argument("--dedupe", action="store_true", help="pakai penyaring tombol ganda asli (TTL per pesan dan debounce per user)")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+
+# Harus diatur sebelum bot/database di-import.
+_tmpdir = tempfile.mkdtemp(prefix="bench-tugas-")
+os.environ["DB_PATH"] = os.path.join(_tmpdir, "tugas.db")
+os.environ["TELEGRAM_TOKEN"] = "123456:BENCHMARK"
+os.environ["ADMIN_ID"] = "1"
+os.environ["MAX_CONCURRENT_UPDATES"] = str(ARGS.konkurensi)
+
+import logging  # noqa: E402
+
+from telegram import Update  # noqa: E402
+from telegram.ext import BaseRateLimiter, CallbackContext  # noqa: E402
+from telegram.request import BaseRequest, RequestData  # noqa: E402
+
+import async_db as adb  # noqa: E402
+import bot  # noqa: E402
+import database as db  # noqa: E402
+from dedupe import CallbackDedupe  # noqa: E402
+from ratelimit import InboundLimiter  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+
+class FakeBotAPI(BaseRequest):
+    """Pengganti Bot API Telegram: membalas setiap method dengan JSON yang masuk akal."""
+
+    def __init__(self, latensi_ms=0.0):
+        self._latensi = latensi_ms / 1000
+        self._message_id = itertools.count(1)
+        self.panggilan = {}
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data: RequestData = None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.panggilan[endpoint] = self.panggilan.get(endpoint, 0) + 1
+        params = request_data.parameters if request_data else {}
+        if self._latensi:
+            await asyncio.sleep(self._latensi)
+
+        if endpoint == "getMe":
+            hasil = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        elif endpoint in ("sendMessage", "editMessageText", "sendDocument"):
+            chat_id = params.get("chat_id", 1)
+            hasil = {
+                "message_id": next(self._message_id), "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private" if int(chat_id) > 0 else "group"},
+                "text": params.get("text", ""),
+            }
+        elif endpoint == "getChatAdministrators":
+            hasil = []
+        else:
+            hasil = True
+        return 200, json.dumps({"ok": True, "result": hasil}).encode()
+
+
+class TanpaBatas(BaseRateLimiter):
+    """Rate limiter yang langsung meneruskan request; yang diukur biaya handler, bukan batas Telegram."""
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        return await callback(*args, **kwargs)
+
+
+# --- Pengukuran waktu DB per skenario ---
+
+_skenario = contextvars.ContextVar("skenario", default="lainnya")
+_waktu_db = {}
+_run_asli = adb._run
+
+
+async def _run_terukur(executor, func, *args, **kwargs):
+    mulai = time.perf_counter()
+    try:
+        return await _run_asli(executor, func, *args, **kwargs)
+    finally:
+        nama = _skenario.get()
+        _waktu_db[nama] = _waktu_db.get(nama, 0.0) + time.perf_counter() - mulai
+
+
+adb._run = _run_terukur
+
+
+# --- Update sintetis ---
+
+_update_id = itertools.count(1)
+_msg_id = itertools.count(1)
+
+
+def _user(user_id):
+    return {"id": user_id, "is_bot": False, "first_name": f"U{user_id}"}
+
+
+def pesan(chat_id, user_id, teks):
+    entities = []
+    if teks.startswith("/"):
+        entities = [{"type": "bot_command", "offset": 0, "length": len(teks.split()[0])}]
+    return {
+        "update_id": next(_update_id),
+        "message": {
+            "message_id": next(_msg_id), "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"}, "from": _user(user_id),
+            "text": teks, "entities": entities,
+        },
+    }
+
+
+def tombol(chat_id, user_id, data):
+    return {
+        "update_id": next(_update_id),
+        "callback_query": {
+            "id": str(next(_update_id)), "chat_instance": "bench", "from": _user(user_id), "data": data,
+            "message": {
+                "message_id": next(_msg_id), "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "text": "daftar tugas",
+            },
+        },
+    }
+
+
+def seed_database(jumlah_tugas, jumlah_chat, rng):
+    """Mengisi database sementara dengan matkul dan tugas untuk setiap chat."""
+    db.init_db(default_chat_id=1)
+    sekarang = int(time.time())
+    with db.write_connection() as conn:
+        conn.executemany(
+            "INSERT INTO mata_kuliah (nama, hari, jam, ruangan, chat_id) VALUES (?, ?, ?, ?, ?)",
+            [(f"Matkul {i}", "Senin", "08:00 - 10:00", "R1", chat_id)
+             for chat_id in range(1, jumlah_chat + 1) for i in range(5)]
+        )
+        conn.executemany(
+            "INSERT INTO tugas (matkul_nama, deskripsi, deadline, deadline_ts, status, chat_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f"Matkul {i % 5}", f"Tugas nomor {i}", "30/12/2030",
+                    sekarang + rng.randint(-3 * 86400, 30 * 86400),
+                    "done" if rng.random() < 0.3 else "pending",
+                    rng.randint(1, jumlah_chat),
+                )
+                for i in range(jumlah_tugas)
+            ]
+        )
+        conn.execute("ANALYZE")
+
+
+def buat_skenario(jumlah, jumlah_chat, rng):
+    """
+    Daftar (nama_skenario, [update...]). Satu skenario bisa berisi beberapa
+    update berurutan (percakapan add_tugas), yang harus diproses berurutan.
+    """
+    skenario = []
+    user_conv = itertools.count(10_000)
+    for _ in range(jumlah):
+        chat_id = rng.randint(1, jumlah_chat)
+        pilihan = rng.random()
+        if pilihan < 0.35:
+            skenario.append(("cek_tugas", [pesan(chat_id, chat_id, "📝 Cek Tugas")]))
+        elif pilihan < 0.55:
+            skenario.append(("cek_matkul", [pesan(chat_id, chat_id, "📚 Cek Jadwal")]))
+        elif pilihan < 0.75:
+            skenario.append(("button_callback", [tombol(chat_id, chat_id, f"tpage_{rng.randint(0, 3)}")]))
+        elif pilihan < 0.85:
+            tugas_id = rng.randint(1, ARGS.tugas)
+            skenario.append(("button_callback", [tombol(chat_id, chat_id, f"tdone_{tugas_id}_0")]))
+        else:
+            # Percakapan di chat pribadi user baru supaya tidak bentrok dengan state lain.
+            user_id = next(user_conv)
+            with db.write_connection() as conn:
+                conn.execute(
+                    "INSERT INTO mata_kuliah (nama, hari, jam, ruangan, chat_id) VALUES ('Matkul 0', 'Senin', '08:00', 'R1', ?)",
+                    (user_id,)
+                )
+            skenario.append(("add_tugas", [
+                pesan(user_id, user_id, "/add_tugas"),
+                pesan(user_id, user_id, "Matkul 0"),
+                pesan(user_id, user_id, "Kerjakan laporan"),
+                pesan(user_id, user_id, "besok 23:59"),
+            ]))
+    return skenario
+
+
+def persentil(data, p):
+    if not data:
+        return 0.0
+    data = sorted(data)
+    k = min(len(data) - 1, max(0, round(p / 100 * (len(data) - 1))))
+    return data[k]
+
+
+async def jalankan():
+    rng = random.Random(ARGS.seed)
+    mulai_seed = time.perf_counter()
+    seed_database(ARGS.tugas, ARGS.chat, rng)
+    print(f"Seed {ARGS.tugas} tugas / {ARGS.chat} chat: {time.perf_counter() - mulai_seed:.2f}s")
+
+    api = FakeBotAPI(ARGS.latensi_api)
+    if not ARGS.ratelimit:
+        # Update sintetis jauh lebih rapat dari user sungguhan; pembatas tetap jalan tapi tidak pernah menolak.
+        bot.pembatas_masuk = InboundLimiter(user=(math.inf, 0), chat=(math.inf, 0), jendela_sama=0)
+    if not ARGS.dedupe:
+        # Sama: penyaring tombol ganda tetap jalan tapi tidak pernah menganggap tekanan sebagai duplikat.
+        bot.tombol = CallbackDedupe(ttl=0, debounce=0)
+    application = bot.build_application(request=api, rate_limiter=None if ARGS.outbox else TanpaBatas())
+    skenario = buat_skenario(ARGS.updates, ARGS.chat, rng)
+
+    latensi = {}
+    semaphore = asyncio.Semaphore(ARGS.konkurensi)
+
+    async def proses(nama, updates):
+        async with semaphore:
+            _skenario.set(nama)
+            for data in updates:
+                update = Update.de_json(data, application.bot)
+                mulai = time.perf_counter()
+                # Lewat update processor supaya urutan per chat ikut teruji seperti saat polling.
+                await application.update_processor.process_update(update, application.process_update(update))
+                latensi.setdefault(nama, []).append(time.perf_counter() - mulai)
+
+    async with application:
+        await application.start()
+        await bot.siapkan_bot(application)
+
+        mulai = time.perf_counter()
+        await asyncio.gather(*(proses(nama, updates) for nama, updates in skenario))
+        durasi = time.perf_counter() - mulai
+
+        context = CallbackContext(application)
+        _skenario.set("kirim_pengingat_harian")
+        for _ in range(ARGS.pengingat):
+            mulai_job = time.perf_counter()
+            await bot.kirim_pengingat_harian(context)
+            latensi.setdefault("kirim_pengingat_harian", []).append(time.perf_counter() - mulai_job)
+
+        await application.stop()
+
+    total_update = sum(len(updates) for _, updates in skenario)
+    print(f"\n{total_update} update dalam {durasi:.2f}s -> {total_update / durasi:.1f} updates/detik "
+          f"(konkurensi {ARGS.konkurensi}, latensi API {ARGS.latensi_api} ms)\n")
+    print(f"{'skenario':<24}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'DB ms/upd':>12}")
+    for nama in sorted(latensi):
+        nilai = latensi[nama]
+        db_ms = _waktu_db.get(nama, 0.0) * 1000 / len(nilai)
+        print(f"{nama:<24}{len(nilai):>7}{persentil(nilai, 50) * 1000:>10.2f}"
+              f"{persentil(nilai, 95) * 1000:>10.2f}{persentil(nilai, 99) * 1000:>10.2f}{db_ms:>12.2f}")
+    print("\nPanggilan Bot API:", ", ".join(f"{k}={v}" for k, v in sorted(api.panggilan.items())))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(jalankan())
+    finally:
+        adb.shutdown()
+        shutil.rmtree(_tmpdir, ignore_errors=True)
@@ -1,12 +1,36 @@
+import html
 import logging
 import os
+import tempfile
 import database as db  
+import async_db as adb
+from deadline import WIB, parse_deadline, format_deadline
+from reminders import ReminderScheduler
+from cache import VersionedCache
+from outbox import OutboxRateLimiter, SIARAN
+import metrics
+from processor import PerChatUpdateProcessor
+from persistence import SQLitePersistence
+from dedupe import CallbackDedupe, edit_pesan
+from timetable import ClassReminder, TimetableIndex, menit_minggu
+from prefix_index import PrefixIndex
+from lease import LeaderLease
+from ratelimit import InboundLimiter
+import render
+from render import Pesan, Template
+import transfer
+import backup
 from dotenv import load_dotenv
 from telegram import BotCommand
 import telegram 
+import asyncio
+import functools
 import datetime 
+import time
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
-from telegram.constants import ParseMode
+from telegram import InlineQueryResultArticle, InputTextMessageContent
+from telegram.constants import ChatType, ParseMode
+from telegram.request import HTTPXRequest
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -14,14 +38,26 @@ from telegram.ext import (
     ConversationHandler,
     MessageHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
+    TypeHandler,
     filters,
 )
 
 load_dotenv()
 TOKEN = os.getenv("TELEGRAM_TOKEN")
+# "polling" (default) atau "webhook"; lihat jalankan_webhook() untuk variabel WEBHOOK_*.
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+# Jika diisi, metrik tersedia dalam format Prometheus di http://127.0.0.1:METRICS_PORT/metrics.
+METRICS_PORT = os.getenv("METRICS_PORT")
+# Jumlah update dari chat berbeda yang diproses bersamaan; update di chat yang sama tetap berurutan.
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "16"))
+# Menit sebelum kelas dimulai untuk mengirim pengingat kelas; 0 untuk mematikan.
+PENGINGAT_KELAS_MENIT = int(os.getenv("PENGINGAT_KELAS_MENIT", "15"))
+# ADMIN_ID (opsional) adalah pemilik bot: admin di semua chat dan pemilik
+# data lama yang dibuat sebelum bot mendukung banyak chat.
 try:
-    ADMIN_ID = int(os.getenv("ADMIN_ID"))
-except (ValueError, TypeError):
+    ADMIN_ID = int(os.getenv("ADMIN_ID")) if os.getenv("ADMIN_ID") else None
+except ValueError:
     print("Error: Pastikan ADMIN_ID di file .env sudah benar (berisi angka).")
     exit()
 
@@ -33,9 +69,31 @@ logger = logging.getLogger(__name__)
 PILIH_MATKUL, DESKRIPSI, DEADLINE = range(3)
 MATKUL_NAMA, MATKUL_HARI, MATKUL_JAM, MATKUL_RUANGAN = range(3, 7) 
 
-def is_admin(user_id: int) -> bool:
-    """Mengecek apakah user adalah admin."""
-    return user_id == ADMIN_ID
+ADMIN_CACHE_TTL = 600
+_admin_cache = {}
+
+async def is_admin(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    """
+    Mengecek apakah user adalah admin di chat ini: pemilik bot, pemilik chat
+    pribadi, atau admin grup Telegram (daftar admin grup di-cache 10 menit).
+    """
+    chat = update.effective_chat
+    user_id = update.effective_user.id
+    if user_id == ADMIN_ID or chat.type == ChatType.PRIVATE:
+        return True
+
+    entri = _admin_cache.get(chat.id)
+    if entri is None or entri[0] < time.monotonic():
+        admins = await context.bot.get_chat_administrators(chat.id)
+        entri = (time.monotonic() + ADMIN_CACHE_TTL, {member.user.id for member in admins})
+        _admin_cache[chat.id] = entri
+    return user_id in entri[1]
+
+def format_deadline_tugas(tugas) -> str:
+    """Teks deadline asli dari user, ditambah tanggal hasil parsing jika ada."""
+    if tugas['deadline_ts'] is None:
+        return tugas['deadline']
+    return f"{tugas['deadline']} ({format_deadline(tugas['deadline_ts'])})"
 
 MAIN_MENU_KEYBOARD = ReplyKeyboardMarkup(
     [
@@ -57,10 +115,11 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler untuk command /help."""
     admin_text = ""
-    if is_admin(update.effective_user.id):
+    if await is_admin(update, context):
         admin_text = (
             "\n\n<b>--- 👮 Perintah Admin ---</b>\n"
             "/clear_tugas - Menghapus SEMUA tugas.\n"
+            "/import - Impor matkul/tugas dari berkas CSV/JSON.\n"
             "Tombol 'Hapus' di /cek_tugas."
         )
 
@@ -69,117 +128,617 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "/start - Memulai bot\n"
         "/help - Menampilkan bantuan ini\n"
         "/cek_matkul - Menampilkan jadwal mata kuliah\n"
+        "/sekarang - Kelas yang sedang berlangsung\n"
+        "/berikutnya - Kelas berikutnya\n"
         "/cek_tugas - Menampilkan semua tugas yang belum selesai\n"
         "/add_tugas - Menambahkan tugas baru (interaktif)\n"
+        "/cari &lt;kata&gt; - Mencari tugas, termasuk yang selesai dan diarsipkan (atau ketik @nama_bot &lt;kata&gt; di chat mana pun)\n"
+        "/export - Ekspor jadwal/tugas (CSV atau kalender .ics)\n"
         "/cancel - Membatalkan proses penambahan tugas"
         f"{admin_text}"
     )
 
+# Jadwal jarang berubah (hanya lewat /add_matkul dan /del_matkul), jadi hasil
+# query, HTML, dan keyboard-nya disimpan per chat sampai versi data matkul naik.
+jadwal_cache = VersionedCache(db.get_matkul_version)
+# Penyaring tekanan tombol ganda untuk button_callback dan cari_callback.
+tombol = CallbackDedupe()
+
+async def get_matkul_cached(chat_id: int):
+    """Daftar mata kuliah sebuah chat, terurut (dari cache)."""
+    return await jadwal_cache.get(chat_id, 'matkul', lambda: adb.get_matkul(chat_id))
+
+# Index prefix matkul + tugas pending untuk inline query; dijaga lewat tugas_ditambah/tugas_dihapus.
+indeks_inline = PrefixIndex(get_matkul_cached, adb.get_tugas)
+
+def tugas_ditambah(tugas) -> None:
+    """Mendaftarkan tugas pending baru ke penjadwal pengingat dan index inline."""
+    pengingat.tambah(tugas)
+    indeks_inline.tambah_tugas(tugas['chat_id'], tugas)
+
+def tugas_dihapus(chat_id: int, tugas_id: int) -> None:
+    """Mengeluarkan tugas yang selesai/dihapus dari penjadwal pengingat dan index inline."""
+    pengingat.hapus(tugas_id)
+    indeks_inline.hapus_tugas(chat_id, tugas_id)
+
+BARIS_JADWAL = Template(
+    "<b>{nama}</b>\n"
+    "  📅: {hari}\n"
+    "  ⏰: {jam}\n"
+    "  🏫: {ruangan}\n"
+    "--------------------\n"
+)
+
+async def _render_jadwal(chat_id: int):
+    """Potongan pesan jadwal (lihat render.Pesan), atau None jika belum ada matkul."""
+    matkul_list = await get_matkul_cached(chat_id)
+    if not matkul_list:
+        return None
+
+    pesan = Pesan("<b>Jadwal Mata Kuliah</b> 📚\n\n")
+    for matkul in matkul_list:
+        pesan.tambah(BARIS_JADWAL, **matkul)
+    return pesan.hasil()
+
+async def _build_keyboard_matkul(chat_id: int):
+    nama_matkul = await adb.get_nama_matkul(chat_id)
+    if not nama_matkul:
+        return None
+    keyboard = [nama_matkul[i:i + 2] for i in range(0, len(nama_matkul), 2)]
+    return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
+
 async def cek_matkul(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler untuk /cek_matkul. Menampilkan jadwal."""
     try:
-        matkul_list = db.get_matkul()
-        if not matkul_list:
+        chat_id = update.effective_chat.id
+        potongan = await jadwal_cache.get(chat_id, 'jadwal_pesan', lambda: _render_jadwal(chat_id))
+        if potongan is None:
             await update.message.reply_text("Belum ada data mata kuliah.")
             return
 
-        message = "<b>Jadwal Mata Kuliah</b> 📚\n\n"
+        await render.kirim(update.message.reply_html, potongan)
+
+    except Exception as e:
+        logger.error(f"Error di cek_matkul: {e}")
+        await update.message.reply_text(f"Terjadi error: {e}")
+
+async def get_indeks_jadwal(chat_id: int) -> TimetableIndex:
+    """Indeks menit-minggu jadwal sebuah chat (dibangun ulang hanya jika matkul berubah)."""
+    async def bangun():
+        return TimetableIndex(await get_matkul_cached(chat_id))
+    return await jadwal_cache.get(chat_id, 'indeks', bangun)
+
+def _format_durasi(menit: int) -> str:
+    hari, menit = divmod(menit, 24 * 60)
+    jam, menit = divmod(menit, 60)
+    bagian = [f"{n} {satuan}" for n, satuan in ((hari, "hari"), (jam, "jam"), (menit, "menit")) if n]
+    return " ".join(bagian) or "kurang dari 1 menit"
+
+def _format_kelas(matkul) -> str:
+    return (
+        f"<b>{html.escape(matkul['nama'])}</b>\n"
+        f"  📅: {html.escape(matkul['hari'])}\n"
+        f"  ⏰: {html.escape(matkul['jam'])}\n"
+        f"  🏫: {html.escape(matkul['ruangan'])}\n"
+    )
+
+async def sekarang(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler /sekarang: kelas yang sedang berlangsung, lalu kelas berikutnya."""
+    try:
+        indeks = await get_indeks_jadwal(update.effective_chat.id)
+        menit = menit_minggu(datetime.datetime.now(WIB))
+        berlangsung = indeks.sedang_berlangsung(menit)
+        if berlangsung:
+            message = "<b>Sedang Berlangsung</b> 🟢\n\n"
+            for mulai, selesai, matkul in berlangsung:
+                message += _format_kelas(matkul) + f"  ⏳: selesai {_format_durasi(selesai - menit)} lagi\n\n"
+        else:
+            message = "Tidak ada kelas yang sedang berlangsung. ☕\n\n"
+
+        mulai, matkul_list = indeks.berikutnya(menit)
+        if mulai is None:
+            if not berlangsung:
+                message = "Belum ada jadwal mata kuliah dengan jam seperti 08:00 - 10:00."
+        else:
+            nama = ", ".join(html.escape(matkul['nama']) for matkul in matkul_list)
+            message += f"Berikutnya: <b>{nama}</b> dalam {_format_durasi(mulai - menit)}."
+        await update.message.reply_html(message)
+
+    except Exception as e:
+        logger.error(f"Error di sekarang: {e}")
+        await update.message.reply_text(f"Terjadi error: {e}")
+
+async def berikutnya(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler /berikutnya: kelas terdekat yang akan dimulai."""
+    try:
+        indeks = await get_indeks_jadwal(update.effective_chat.id)
+        menit = menit_minggu(datetime.datetime.now(WIB))
+        mulai, matkul_list = indeks.berikutnya(menit)
+        if mulai is None:
+            await update.message.reply_text("Belum ada jadwal mata kuliah dengan jam seperti 08:00 - 10:00.")
+            return
+
+        message = "<b>Kelas Berikutnya</b> ⏭️\n\n"
         for matkul in matkul_list:
-            message += (
-                f"<b>{matkul['nama']}</b>\n"
-                f"  📅: {matkul['hari']}\n"
-                f"  ⏰: {matkul['jam']}\n"
-                f"  🏫: {matkul['ruangan']}\n"
-                "--------------------\n"
-            )
-        
+            message += _format_kelas(matkul) + "\n"
+        message += f"Mulai dalam <b>{_format_durasi(mulai - menit)}</b>."
         await update.message.reply_html(message)
 
     except Exception as e:
-        logger.error(f"Error di cek_matkul: {e}")
+        logger.error(f"Error di berikutnya: {e}")
         await update.message.reply_text(f"Terjadi error: {e}")
 
+TUGAS_PER_HALAMAN = 5
+
+def _kode_pilihan(ids) -> str:
+    """Menyandikan id tugas terpilih untuk callback_data: base36 dipisah titik."""
+    return '.'.join(_base36(i) for i in sorted(ids))
+
+def _base36(n: int) -> str:
+    digit = '0123456789abcdefghijklmnopqrstuvwxyz'
+    hasil = ''
+    while True:
+        n, sisa = divmod(n, 36)
+        hasil = digit[sisa] + hasil
+        if n == 0:
+            return hasil
+
+def _baca_pilihan(kode: str) -> set:
+    return {int(x, 36) for x in kode.split('.') if x}
+
+# Deskripsi dipotong supaya satu halaman daftar selalu muat dalam satu pesan.
+BARIS_TUGAS = Template(
+    "<b>{nomor}.</b> 📚 <b>{matkul_nama:100}</b>\n"
+    "📝: {deskripsi:500}\n"
+    "⏳: <b>{waktu}</b>\n\n"
+)
+
+async def render_halaman_tugas(chat_id: int, page: int, pilihan=None):
+    """
+    Membangun teks dan keyboard satu halaman tugas pending.
+    Jika `pilihan` (set id) diberikan, keyboard berisi kotak centang untuk
+    aksi massal. Mengembalikan (None, None) jika tidak ada tugas pending sama sekali.
+    """
+    while True:
+        tugas_list = await adb.get_tugas_page(
+            chat_id, 'pending', TUGAS_PER_HALAMAN + 1, page * TUGAS_PER_HALAMAN
+        )
+        # Halaman bisa kosong jika tugas terakhirnya baru saja diselesaikan.
+        if tugas_list or page == 0:
+            break
+        page -= 1
+    if not tugas_list:
+        return None, None
+
+    ada_berikutnya = len(tugas_list) > TUGAS_PER_HALAMAN
+    tugas_list = tugas_list[:TUGAS_PER_HALAMAN]
+
+    pesan = Pesan(f"<b>Daftar Tugas Belum Selesai</b> 📝 (hal. {page + 1})\n\n")
+    tombol_selesai, tombol_hapus = [], []
+    for nomor, tugas in enumerate(tugas_list, start=page * TUGAS_PER_HALAMAN + 1):
+        pesan.tambah(BARIS_TUGAS, nomor=nomor, waktu=format_deadline_tugas(tugas), **tugas)
+        tombol_selesai.append(InlineKeyboardButton(f"✅ {nomor}", callback_data=f"tdone_{tugas['id']}_{page}"))
+        tombol_hapus.append(InlineKeyboardButton(f"❌ {nomor}", callback_data=f"tdel_{tugas['id']}_{page}"))
+
+    message = pesan.satu()
+    if pilihan is not None:
+        return message, _keyboard_pilihan(tugas_list, page, pilihan)
+
+    navigasi = []
+    if page > 0:
+        navigasi.append(InlineKeyboardButton("⬅️ Sebelumnya", callback_data=f"tpage_{page - 1}"))
+    if ada_berikutnya:
+        navigasi.append(InlineKeyboardButton("Berikutnya ➡️", callback_data=f"tpage_{page + 1}"))
+
+    keyboard = [tombol_selesai, tombol_hapus]
+    if navigasi:
+        keyboard.append(navigasi)
+    keyboard.append([InlineKeyboardButton("☑️ Pilih beberapa", callback_data=f"ms_{page}_")])
+    return message, InlineKeyboardMarkup(keyboard)
+
+def _keyboard_pilihan(tugas_list, page: int, pilihan: set):
+    """
+    Keyboard mode pilih: setiap tombol centang membawa pilihan hasil toggle
+    di callback_data (ms_{halaman}_{id base36}), jadi tidak ada state di server.
+    """
+    ids_halaman = {tugas['id'] for tugas in tugas_list}
+    pilihan = pilihan & ids_halaman
+    centang = []
+    for nomor, tugas in enumerate(tugas_list, start=page * TUGAS_PER_HALAMAN + 1):
+        dipilih = tugas['id'] in pilihan
+        baru = pilihan - {tugas['id']} if dipilih else pilihan | {tugas['id']}
+        centang.append(InlineKeyboardButton(
+            f"{'☑' if dipilih else '☐'} {nomor}", callback_data=f"ms_{page}_{_kode_pilihan(baru)}"
+        ))
+    kode = _kode_pilihan(pilihan)
+    keyboard = [centang]
+    if pilihan:
+        keyboard.append([
+            InlineKeyboardButton(f"✅ Selesai ({len(pilihan)})", callback_data=f"msd_{page}_{kode}"),
+            InlineKeyboardButton(f"❌ Hapus ({len(pilihan)})", callback_data=f"msx_{page}_{kode}"),
+        ])
+    semua = "Kosongkan" if pilihan == ids_halaman else "Pilih semua"
+    keyboard.append([
+        InlineKeyboardButton(semua, callback_data=f"ms_{page}_{'' if pilihan == ids_halaman else _kode_pilihan(ids_halaman)}"),
+        InlineKeyboardButton("↩️ Batal", callback_data=f"tpage_{page}"),
+    ])
+    return InlineKeyboardMarkup(keyboard)
+
 async def cek_tugas(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handler untuk /cek_tugas. Menampilkan tugas dengan tombol inline."""
+    """Handler untuk /cek_tugas. Menampilkan satu halaman tugas dengan tombol inline."""
     try:
-        tugas_list = db.get_tugas(status='pending')
-        if not tugas_list:
+        message, reply_markup = await render_halaman_tugas(update.effective_chat.id, 0)
+        if message is None:
             await update.message.reply_text("Hore! Tidak ada tugas yang pending. 🎉")
             return
 
-        await update.message.reply_text("Berikut adalah daftar tugas yang belum selesai:")
-        for tugas in tugas_list:
-            task_id = tugas['id']
-            message = (
-                f"📚 <b>{tugas['matkul_nama']}</b>\n"
-                f"📝: {tugas['deskripsi']}\n"
-                f"⏳: <b>{tugas['deadline']}</b>"
-            )
-            
-            keyboard = [
-                [
-                    InlineKeyboardButton("✅ Selesai", callback_data=f"done_{task_id}"),
-                    InlineKeyboardButton("❌ Hapus", callback_data=f"delete_{task_id}")
-                ]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await update.message.reply_html(message, reply_markup=reply_markup)
+        await update.message.reply_html(message, reply_markup=reply_markup)
 
     except Exception as e:
         logger.error(f"Error di cek_tugas: {e}")
         await update.message.reply_text(f"Terjadi error: {e}")
 
 
+SELESAI_PER_HALAMAN = 10
+
+BARIS_SELESAI_TANPA_WAKTU = Template(
+    "📚 <b>{matkul_nama:100}</b>\n"
+    "📝: {deskripsi:250}\n"
+    "⏳: <i>{waktu}</i>\n"
+    "--------------------\n"
+)
+BARIS_SELESAI = Template(
+    "📚 <b>{matkul_nama:100}</b>\n"
+    "📝: {deskripsi:250}\n"
+    "⏳: <i>{waktu}</i>\n"
+    "✅: <i>{waktu_selesai}</i>\n"
+    "--------------------\n"
+)
+
+async def render_halaman_selesai(chat_id: int, page: int):
+    """
+    Membangun teks dan keyboard satu halaman tugas selesai (termasuk arsip).
+    Mengembalikan (None, None) jika belum ada tugas selesai.
+    """
+    tugas_list = await adb.get_tugas_selesai_page(
+        chat_id, SELESAI_PER_HALAMAN + 1, page * SELESAI_PER_HALAMAN
+    )
+    if not tugas_list:
+        return None, None
+
+    ada_berikutnya = len(tugas_list) > SELESAI_PER_HALAMAN
+    pesan = Pesan(f"<b>Daftar Tugas yang Sudah Selesai</b> ✅ (hal. {page + 1})\n\n")
+    for tugas in tugas_list[:SELESAI_PER_HALAMAN]:
+        if tugas['selesai_at'] is not None:
+            pesan.tambah(
+                BARIS_SELESAI, waktu=format_deadline_tugas(tugas),
+                waktu_selesai=format_deadline(tugas['selesai_at']), **tugas
+            )
+        else:
+            pesan.tambah(BARIS_SELESAI_TANPA_WAKTU, waktu=format_deadline_tugas(tugas), **tugas)
+    message = pesan.satu()
+
+    navigasi = []
+    if page > 0:
+        navigasi.append(InlineKeyboardButton("⬅️ Sebelumnya", callback_data=f"spage_{page - 1}"))
+    if ada_berikutnya:
+        navigasi.append(InlineKeyboardButton("Berikutnya ➡️", callback_data=f"spage_{page + 1}"))
+    return message, InlineKeyboardMarkup([navigasi]) if navigasi else None
+
 async def tugas_selesai(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handler untuk /tugas_selesai. Menampilkan tugas yang sudah 'done'."""
+    """Handler untuk /tugas_selesai. Menampilkan tugas 'done' per halaman, terbaru dulu."""
     try:
-        tugas_list = db.get_tugas(status='done')
-        if not tugas_list:
+        message, reply_markup = await render_halaman_selesai(update.effective_chat.id, 0)
+        if message is None:
             await update.message.reply_text("Belum ada tugas yang selesai. Semangat! 💪")
             return
 
-        message = "<b>Daftar Tugas yang Sudah Selesai</b> ✅\n\n"
-        for tugas in tugas_list:
-            message += (
-                f"📚 <b>{tugas['matkul_nama']}</b>\n"
-                f"📝: {tugas['deskripsi']}\n"
-                f"⏳: <i>{tugas['deadline']}</i>\n"
-                "--------------------\n"
-            )
-        
-        await update.message.reply_html(message)
+        await update.message.reply_html(message, reply_markup=reply_markup)
 
     except Exception as e:
         logger.error(f"Error di tugas_selesai: {e}")
         await update.message.reply_text(f"Terjadi error: {e}")
 
+CARI_PER_HALAMAN = 5
+INLINE_PER_HALAMAN = 20
+INLINE_CACHE_TIME = 10
+# Kata kunci ikut disimpan di callback_data (maks. 64 byte), jadi dipotong.
+MAKS_KATA_KUNCI = 40
+
+def _potong_kata_kunci(teks: str) -> str:
+    return teks.encode()[:MAKS_KATA_KUNCI].decode(errors='ignore').strip()
+
+BARIS_CARI = Template(
+    "<b>{nomor}.</b> {tanda} 📚 <b>{matkul_nama:100}</b>\n"
+    "📝: {deskripsi:500}\n"
+    "⏳: <b>{waktu}</b>\n\n"
+)
+
+async def render_hasil_cari(chat_id: int, teks: str, page: int):
+    """
+    Membangun teks dan keyboard satu halaman hasil /cari (paling relevan dulu).
+    Tugas yang sudah diarsipkan ikut tampil tanpa tombol aksi.
+    Mengembalikan (None, None) jika tidak ada tugas yang cocok.
+    """
+    while True:
+        hasil = await adb.cari_tugas([chat_id], teks, CARI_PER_HALAMAN + 1, page * CARI_PER_HALAMAN)
+        if hasil or page == 0:
+            break
+        page -= 1
+    if not hasil:
+        return None, None
+
+    ada_berikutnya = len(hasil) > CARI_PER_HALAMAN
+    hasil = hasil[:CARI_PER_HALAMAN]
+
+    pesan = Pesan(f"<b>Hasil Pencarian</b> 🔎 <i>{html.escape(teks)}</i> (hal. {page + 1})\n\n")
+    tombol_selesai, tombol_hapus = [], []
+    for nomor, tugas in enumerate(hasil, start=page * CARI_PER_HALAMAN + 1):
+        if tugas['diarsipkan']:
+            pesan.tambah(BARIS_CARI, nomor=nomor, tanda="🗄️", waktu=format_deadline_tugas(tugas), **tugas)
+            continue
+        tanda = "✅" if tugas['status'] == 'done' else "⏳"
+        pesan.tambah(BARIS_CARI, nomor=nomor, tanda=tanda, waktu=format_deadline_tugas(tugas), **tugas)
+        if tugas['status'] == 'pending':
+            tombol_selesai.append(InlineKeyboardButton(f"✅ {nomor}", callback_data=f"cari_d_{tugas['id']}_{page}_{teks}"))
+        tombol_hapus.append(InlineKeyboardButton(f"❌ {nomor}", callback_data=f"cari_x_{tugas['id']}_{page}_{teks}"))
+
+    navigasi = []
+    if page > 0:
+        navigasi.append(InlineKeyboardButton("⬅️ Sebelumnya", callback_data=f"cari_p_0_{page - 1}_{teks}"))
+    if ada_berikutnya:
+        navigasi.append(InlineKeyboardButton("Berikutnya ➡️", callback_data=f"cari_p_0_{page + 1}_{teks}"))
+
+    keyboard = [baris for baris in (tombol_selesai, tombol_hapus, navigasi) if baris]
+    return pesan.satu(), InlineKeyboardMarkup(keyboard)
+
+async def cari(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler untuk /cari <kata kunci>. Mencari tugas di chat ini berdasarkan deskripsi dan matkul."""
+    teks = _potong_kata_kunci(' '.join(context.args))
+    if not teks:
+        await update.message.reply_text("Gunakan: /cari <kata kunci>\nContoh: /cari laporan basis data")
+        return
+    try:
+        message, reply_markup = await render_hasil_cari(update.effective_chat.id, teks, 0)
+        if message is None:
+            await update.message.reply_text(f"Tidak ada tugas yang cocok dengan \"{teks}\".")
+            return
+        await update.message.reply_html(message, reply_markup=reply_markup)
+
+    except Exception as e:
+        logger.error(f"Error di cari: {e}")
+        await update.message.reply_text(f"Terjadi error: {e}")
+
+async def cari_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler tombol di hasil /cari: cari_{aksi}_{tugas_id}_{halaman}_{kata kunci}."""
+    query = update.callback_query
+    chat_id = update.effective_chat.id
+    jawaban = tombol.cek(query)
+    if jawaban is not None:
+        await query.answer(*jawaban)
+        return
+    _, aksi, tugas_id, page, teks = query.data.split('_', 4)
+    tugas_id, page = int(tugas_id), int(page)
+
+    try:
+        if aksi == "d":
+            if await adb.update_tugas_status(chat_id, tugas_id, 'done'):
+                tugas_dihapus(chat_id, tugas_id)
+                await tombol.jawab(query, "✅ Tugas ditandai selesai.")
+            else:
+                await tombol.jawab(query, "Tugas ini sudah tidak ada.")
+        elif aksi == "x":
+            if not await is_admin(update, context):
+                await tombol.jawab(query, "Maaf, hanya admin yang bisa menghapus tugas.", show_alert=True)
+                return
+            if await adb.delete_tugas(chat_id, tugas_id):
+                tugas_dihapus(chat_id, tugas_id)
+                await tombol.jawab(query, "❌ Tugas dihapus.")
+            else:
+                await tombol.jawab(query, "Tugas ini sudah tidak ada.")
+        else:
+            await tombol.jawab(query)
+
+        message, reply_markup = await render_hasil_cari(chat_id, teks, page)
+        if message is None:
+            await edit_pesan(query, f"Tidak ada lagi tugas yang cocok dengan \"{teks}\".")
+            return
+        await edit_pesan(query, text=message, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
+    except Exception as e:
+        logger.error(f"Error di cari_callback: {e}")
+        tombol.lupakan(query)
+        await query.answer(f"Terjadi error: {e}", show_alert=True)
+
+async def inline_cari(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Inline query (@bot <awalan kata>): matkul dan tugas pending di chat pribadi
+    user dan di grup tempat user pernah memakai bot, dari index di memori.
+    Tanpa kata kunci, semua matkul dan tugas pending ditampilkan.
+    """
+    query = update.inline_query
+    offset = int(query.offset or 0)
+    chat_ids = await get_chat_user_cached(query.from_user.id)
+    hasil = await indeks_inline.cari(chat_ids, query.query)
+
+    results = []
+    for jenis, data in hasil[offset:offset + INLINE_PER_HALAMAN]:
+        if jenis == 'm':
+            results.append(InlineQueryResultArticle(
+                id=f"m{data['id']}",
+                title=f"📚 {data['nama']}",
+                description=f"{data['hari']}, {data['jam']} · {data['ruangan']}",
+                input_message_content=InputTextMessageContent(_format_kelas(data), parse_mode=ParseMode.HTML),
+            ))
+        else:
+            results.append(InlineQueryResultArticle(
+                id=f"t{data['id']}",
+                title=f"{data['matkul_nama']}: {data['deskripsi']}",
+                description=f"⏳ {format_deadline_tugas(data)}",
+                input_message_content=InputTextMessageContent(
+                    f"📚 <b>{html.escape(data['matkul_nama'])}</b>\n"
+                    f"📝: {html.escape(data['deskripsi'])}\n"
+                    f"⏳: <b>{html.escape(format_deadline_tugas(data))}</b>",
+                    parse_mode=ParseMode.HTML,
+                ),
+            ))
+    next_offset = str(offset + INLINE_PER_HALAMAN) if len(hasil) > offset + INLINE_PER_HALAMAN else ""
+    await query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=True, next_offset=next_offset)
+
+# Daftar chat milik user untuk inline query: user_id -> (kedaluwarsa, [chat_id...]).
+CHAT_USER_TTL = 300
+_chat_user_cache = {}
+
+async def get_chat_user_cached(user_id: int):
+    """Chat pribadi user ditambah grup tempat user pernah memakai bot (di-cache CHAT_USER_TTL detik)."""
+    entri = _chat_user_cache.get(user_id)
+    if entri is None or entri[0] < time.monotonic():
+        entri = (time.monotonic() + CHAT_USER_TTL, [user_id] + await adb.get_chat_user(user_id))
+        _chat_user_cache[user_id] = entri
+    return entri[1]
+
+# Dipasang di grup -2, sebelum handler lain (termasuk catat_anggota).
+pembatas_masuk = InboundLimiter(
+    teks_menu=[tombol.text for baris in MAIN_MENU_KEYBOARD.keyboard for tombol in baris]
+)
+
+_anggota_dikenal = set()
+
+async def catat_anggota(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Mencatat (sekali per proses) user yang memakai bot di grup, untuk cakupan inline_cari."""
+    chat, user = update.effective_chat, update.effective_user
+    if chat is None or user is None or chat.type == ChatType.PRIVATE:
+        return
+    if (user.id, chat.id) in _anggota_dikenal:
+        return
+    _anggota_dikenal.add((user.id, chat.id))
+    await adb.tambah_anggota_chat(user.id, chat.id)
+    _chat_user_cache.pop(user.id, None)
+
+PANDUAN_IMPOR = (
+    "Kirim berkas CSV/JSON dengan caption <code>/import matkul</code> atau <code>/import tugas</code>.\n\n"
+    "Kolom matkul: <code>nama, hari, jam, ruangan</code> (jam seperti 08:00 - 10:00)\n"
+    "Kolom tugas: <code>matkul, deskripsi, deadline, status</code> (status opsional: pending/done)\n\n"
+    "Contoh isi berkas bisa diambil dari /export matkul atau /export tugas."
+)
+MAKS_ERROR_DITAMPILKAN = 20
+
+async def impor(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Handler /import (admin): berkas CSV/JSON dengan caption /import matkul|tugas.
+    Baris yang valid dimasukkan dalam satu transaksi, sisanya dilaporkan per baris.
+    """
+    message = update.message
+    if not await is_admin(update, context):
+        await message.reply_text("Maaf, perintah ini hanya untuk admin. 👮")
+        return
+
+    argumen = (message.caption or message.text or '').split()[1:]
+    jenis = argumen[0].lower() if argumen else None
+    document = message.document
+    if document is None or jenis not in transfer.KOLOM:
+        await message.reply_html(PANDUAN_IMPOR)
+        return
+    if document.file_size and document.file_size > transfer.MAKS_UKURAN_IMPOR:
+        await message.reply_text("Berkas terlalu besar (maksimal 1 MB).")
+        return
+
+    try:
+        berkas = await document.get_file()
+        data = bytes(await berkas.download_as_bytearray())
+        baris, error = await asyncio.to_thread(transfer.siapkan_impor, jenis, data, document.file_name or '')
+        tugas_baru = []
+        if baris and jenis == 'matkul':
+            await adb.import_matkul(update.effective_chat.id, baris)
+            await pengingat_kelas.segarkan()
+        elif baris:
+            tugas_baru = await adb.import_tugas(update.effective_chat.id, baris)
+    except transfer.ImporGagal as e:
+        await message.reply_text(f"Berkas tidak bisa diimpor: {e}")
+        return
+    except Exception as e:
+        logger.error(f"Error di impor: {e}")
+        await message.reply_text(f"Terjadi error: {e}")
+        return
+
+    for tugas in tugas_baru:
+        tugas_ditambah(dict(tugas))
+
+    laporan = (
+        f"<b>Impor {jenis} selesai</b> ✅\n"
+        f"{len(baris)} baris ditambahkan, {len(error)} baris dilewati."
+    )
+    if error:
+        laporan += "\n\n" + "\n".join(html.escape(e, quote=False) for e in error[:MAKS_ERROR_DITAMPILKAN])
+        if len(error) > MAKS_ERROR_DITAMPILKAN:
+            laporan += f"\n... dan {len(error) - MAKS_ERROR_DITAMPILKAN} baris lainnya."
+    await message.reply_html(laporan)
+
+async def ekspor(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler /export matkul|tugas|ical. Data ditulis langsung dari DB ke berkas sementara, lalu dikirim."""
+    jenis = context.args[0].lower() if context.args else None
+    if jenis not in ('matkul', 'tugas', 'ical'):
+        await update.message.reply_html(
+            "Gunakan: <code>/export matkul</code>, <code>/export tugas</code> (CSV), "
+            "atau <code>/export ical</code> (kalender jadwal dan deadline)."
+        )
+        return
+
+    chat_id = update.effective_chat.id
+    try:
+        with tempfile.TemporaryFile() as berkas:
+            if jenis == 'ical':
+                await adb.run_read(transfer.ekspor_ical, chat_id, berkas)
+                nama_berkas = "jadwal.ics"
+            else:
+                await adb.run_read(transfer.ekspor_csv, chat_id, jenis, berkas)
+                nama_berkas = f"{jenis}.csv"
+            berkas.seek(0)
+            await update.message.reply_document(document=berkas, filename=nama_berkas)
+
+    except Exception as e:
+        logger.error(f"Error di ekspor: {e}")
+        await update.message.reply_text(f"Terjadi error: {e}")
+
+# Telegram menolak inline keyboard berisi lebih dari 100 tombol.
+MAKS_TOMBOL_HAPUS_MATKUL = 100
+BARIS_HAPUS_MATKUL = Template(
+    "<b>{nomor}. {nama:100}</b>\n"
+    "({hari}, {jam}, {ruangan})\n\n"
+)
+
+async def render_hapus_matkul(chat_id: int):
+    """
+    Daftar matkul bernomor (render.Pesan) dan keyboard tombol hapus per nomor,
+    atau (None, None) jika tidak ada matkul.
+    """
+    matkul_list = await get_matkul_cached(chat_id)
+    if not matkul_list:
+        return None, None
+
+    pesan = Pesan("Pilih mata kuliah yang ingin dihapus (HATI-HATI!):\n\n")
+    tombol_hapus = []
+    for nomor, matkul in enumerate(matkul_list[:MAKS_TOMBOL_HAPUS_MATKUL], start=1):
+        pesan.tambah(BARIS_HAPUS_MATKUL, nomor=nomor, **matkul)
+        tombol_hapus.append(InlineKeyboardButton(f"❌ {nomor}", callback_data=f"delmatkul_{matkul['id']}"))
+    if len(matkul_list) > MAKS_TOMBOL_HAPUS_MATKUL:
+        pesan.tambah_html(f"<i>… dan {len(matkul_list) - MAKS_TOMBOL_HAPUS_MATKUL} mata kuliah lainnya.</i>")
+    keyboard = [tombol_hapus[i:i + 5] for i in range(0, len(tombol_hapus), 5)]
+    return pesan, InlineKeyboardMarkup(keyboard)
+
 async def del_matkul(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handler untuk /del_matkul (Admin). Menampilkan matkul dengan tombol hapus."""
-    if not is_admin(update.effective_user.id):
+    """Handler untuk /del_matkul (Admin). Menampilkan matkul dalam satu daftar dengan tombol hapus."""
+    if not await is_admin(update, context):
         await update.message.reply_text("Maaf, perintah ini hanya untuk admin. 👮")
         return
         
     try:
-        matkul_list = db.get_matkul()
-        if not matkul_list:
+        pesan, reply_markup = await render_hapus_matkul(update.effective_chat.id)
+        if pesan is None:
             await update.message.reply_text("Tidak ada mata kuliah untuk dihapus.")
             return
 
-        await update.message.reply_text("Pilih mata kuliah yang ingin dihapus (HATI-HATI!):")
-        for matkul in matkul_list:
-            matkul_id = matkul['id']
-            message = (
-                f"<b>{matkul['nama']}</b>\n"
-                f"({matkul['hari']}, {matkul['jam']}, {matkul['ruangan']})"
-            )
-            
-            keyboard = [[
-                InlineKeyboardButton("❌ Hapus Matkul Ini", callback_data=f"delmatkul_{matkul_id}")
-            ]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await update.message.reply_html(message, reply_markup=reply_markup)
+        await render.kirim(update.message.reply_html, pesan.hasil(), reply_markup=reply_markup)
 
     except Exception as e:
         logger.error(f"Error di del_matkul: {e}")
@@ -189,7 +748,7 @@ async def del_matkul(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 async def add_matkul_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Langkah 1: Memulai tambah matkul, meminta NAMA."""
     
-    if not is_admin(update.effective_user.id):
+    if not await is_admin(update, context):
         await update.message.reply_text("Maaf, perintah ini hanya untuk admin. 👮")
         return ConversationHandler.END
 
@@ -243,13 +802,19 @@ async def matkul_jam(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 async def matkul_ruangan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Langkah 5: Menyimpan RUANGAN, simpan ke DB, dan selesai."""
+    nama = context.user_data['matkul_nama']
+    hari = context.user_data['matkul_hari']
+    jam = context.user_data['matkul_jam']
+    ruangan = update.message.text
+
     try:
-        db.add_matkul(nama, hari, jam, ruangan)
+        await adb.add_matkul(update.effective_chat.id, nama, hari, jam, ruangan)
+        await pengingat_kelas.segarkan()
         
         await update.message.reply_html(
             "<b>Mata Kuliah berhasil ditambahkan!</b> ✅\n\n"
-            f"📚 <b>Nama:</b> {nama}\n"
-            f"🏫 <b>Ruangan:</b> {ruangan}",
+            f"📚 <b>Nama:</b> {html.escape(nama)}\n"
+            f"🏫 <b>Ruangan:</b> {html.escape(ruangan)}",
             reply_markup=MAIN_MENU_KEYBOARD
         )
     except Exception as e:
@@ -266,12 +831,14 @@ async def matkul_ruangan(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def clear_tugas(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler untuk /clear_tugas (Hanya Admin)."""
-    if not is_admin(update.effective_user.id):
+    if not await is_admin(update, context):
         await update.message.reply_text("Maaf, perintah ini hanya untuk admin. 👮")
         return
 
     try:
-        db.clear_all_tugas()
+        await adb.clear_all_tugas(update.effective_chat.id)
+        pengingat.hapus_chat(update.effective_chat.id)
+        indeks_inline.hapus_chat(update.effective_chat.id)
         await update.message.reply_text("BERHASIL! Semua tugas telah dihapus dari database. 🗑️")
     except Exception as e:
         logger.error(f"Error di clear_tugas: {e}")
@@ -279,17 +846,16 @@ async def clear_tugas(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
 async def add_tugas_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Langkah 1: Memulai proses tambah tugas, meminta pilih matkul."""
-    nama_matkul = db.get_nama_matkul()
-    if not nama_matkul:
+    chat_id = update.effective_chat.id
+    keyboard_matkul = await jadwal_cache.get(chat_id, 'keyboard_matkul', lambda: _build_keyboard_matkul(chat_id))
+    if keyboard_matkul is None:
         await update.message.reply_text("Database mata kuliah kosong. Hubungi admin.")
         return ConversationHandler.END
-
-    keyboard = [nama_matkul[i:i + 2] for i in range(0, len(nama_matkul), 2)]
     
     await update.message.reply_text(
         "Oke, mari tambahkan tugas baru.\n"
         "<b>Langkah 1:</b> Pilih mata kuliah.",
-        reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True),
+        reply_markup=keyboard_matkul,
         parse_mode=ParseMode.HTML
     )
     return PILIH_MATKUL
@@ -300,7 +866,7 @@ async def pilih_matkul(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     context.user_data['matkul'] = matkul
     
     await update.message.reply_text(
-        f"Matkul: <b>{matkul}</b>\n"
+        f"Matkul: <b>{html.escape(matkul)}</b>\n"
         "<b>Langkah 2:</b> Sekarang masukkan deskripsi tugasnya.",
         reply_markup=ReplyKeyboardRemove(),
         parse_mode=ParseMode.HTML
@@ -324,17 +890,31 @@ async def deskripsi_tugas(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def deadline_tugas(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Langkah 4: Menyimpan deadline, simpan ke DB, dan selesai."""
     deadline = update.message.text
+    deadline_ts = parse_deadline(deadline)
+    if deadline_ts is None:
+        await update.message.reply_text(
+            "Deadline tidak dikenali. Coba lagi, misalnya:\n"
+            "<i>Besok 23:59, Senin 15 Okt, 30/10/2025, Jumat depan, lusa jam 9 malam</i>",
+            parse_mode=ParseMode.HTML
+        )
+        return DEADLINE
+
+    chat_id = update.effective_chat.id
     matkul = context.user_data['matkul']
     deskripsi = context.user_data['deskripsi']
     
     try:
-        db.add_tugas(matkul, deskripsi, deadline)
+        tugas_id = await adb.add_tugas(chat_id, matkul, deskripsi, deadline, deadline_ts)
+        tugas_ditambah({
+            'id': tugas_id, 'chat_id': chat_id, 'matkul_nama': matkul, 'deskripsi': deskripsi,
+            'deadline': deadline, 'deadline_ts': deadline_ts,
+        })
         
         await update.message.reply_html(
             "<b>Tugas berhasil ditambahkan!</b> ✅\n\n"
-            f"📚 <b>Matkul:</b> {matkul}\n"
-            f"📝 <b>Tugas:</b> {deskripsi}\n"
-            f"⏳ <b>Deadline:</b> {deadline}",
+            f"📚 <b>Matkul:</b> {html.escape(matkul)}\n"
+            f"📝 <b>Tugas:</b> {html.escape(deskripsi)}\n"
+            f"⏳ <b>Deadline:</b> {html.escape(deadline)} ({format_deadline(deadline_ts)})",
             reply_markup=MAIN_MENU_KEYBOARD 
         )
     except Exception as e:
@@ -356,47 +936,123 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     context.user_data.clear()
     return ConversationHandler.END
 
+async def tampilkan_halaman_tugas(query, chat_id: int, page: int, pilihan=None) -> None:
+    """Mengganti pesan daftar tugas dengan halaman `page` (edit di tempat)."""
+    message, reply_markup = await render_halaman_tugas(chat_id, page, pilihan)
+    if message is None:
+        await edit_pesan(query, "Hore! Tidak ada tugas yang pending. 🎉")
+        return
+    await edit_pesan(query, text=message, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handler untuk semua tombol inline (Selesai, Hapus Tugas, Hapus Matkul)."""
+    """Handler untuk semua tombol inline (Selesai, Hapus Tugas, Hapus Matkul, Halaman)."""
     query = update.callback_query
-    await query.answer()  
+    chat_id = update.effective_chat.id
+    jawaban = tombol.cek(query)
+    if jawaban is not None:
+        # Tekanan ganda: jawab dari memori tanpa menyentuh database atau Bot API edit.
+        await query.answer(*jawaban)
+        return
 
-    data = query.data
-    action, data_id_str = data.split('_', 1) 
-    data_id = int(data_id_str)
+    action, *args = query.data.split('_')
+    data_id = int(args[0])
     
     try:
-        if action == "done":
-            db.update_tugas_status(data_id, 'done')
-            await query.edit_message_text(
+        if action == "ms":
+            await tombol.jawab(query)
+            await tampilkan_halaman_tugas(query, chat_id, data_id, _baca_pilihan(args[1]))
+
+        elif action in ("msd", "msx"):
+            pilihan = _baca_pilihan(args[1])
+            if action == "msx" and not await is_admin(update, context):
+                await tombol.jawab(query, "Maaf, hanya admin yang bisa menghapus tugas.", show_alert=True)
+                return
+            # Semua tugas terpilih diubah dalam satu transaksi dan satu edit pesan.
+            if action == "msd":
+                diubah = await adb.update_status_banyak(chat_id, pilihan, 'done')
+                await tombol.jawab(query, f"✅ {len(diubah)} tugas ditandai selesai.")
+            else:
+                diubah = await adb.delete_tugas_banyak(chat_id, pilihan)
+                await tombol.jawab(query, f"❌ {len(diubah)} tugas dihapus.")
+            for tugas_id in diubah:
+                tugas_dihapus(chat_id, tugas_id)
+            await tampilkan_halaman_tugas(query, chat_id, data_id)
+
+        elif action == "tpage":
+            await tombol.jawab(query)
+            await tampilkan_halaman_tugas(query, chat_id, data_id)
+
+        elif action == "spage":
+            await tombol.jawab(query)
+            message, reply_markup = await render_halaman_selesai(chat_id, data_id)
+            if message is not None:
+                await edit_pesan(query, text=message, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
+        elif action == "tdone":
+            if await adb.update_tugas_status(chat_id, data_id, 'done'):
+                tugas_dihapus(chat_id, data_id)
+                await tombol.jawab(query, "✅ Tugas ditandai selesai.")
+            else:
+                await tombol.jawab(query, "Tugas ini sudah tidak ada.")
+            await tampilkan_halaman_tugas(query, chat_id, int(args[1]))
+
+        elif action == "tdel":
+            if not await is_admin(update, context):
+                await tombol.jawab(query, "Maaf, hanya admin yang bisa menghapus tugas.", show_alert=True)
+                return
+
+            if await adb.delete_tugas(chat_id, data_id):
+                tugas_dihapus(chat_id, data_id)
+                await tombol.jawab(query, "❌ Tugas dihapus.")
+            else:
+                await tombol.jawab(query, "Tugas ini sudah tidak ada.")
+            await tampilkan_halaman_tugas(query, chat_id, int(args[1]))
+
+        # "done_" dan "delete_" berasal dari pesan lama (satu pesan per tugas).
+        elif action == "done":
+            if await adb.update_tugas_status(chat_id, data_id, 'done'):
+                tugas_dihapus(chat_id, data_id)
+            await tombol.jawab(query)
+            await edit_pesan(
+                query,
                 text=f"{query.message.text_html}\n\n--- <b>Status: ✅ SELESAI</b> ---", 
                 parse_mode=ParseMode.HTML
             )
             
         elif action == "delete":
-            if not is_admin(query.from_user.id):
-                await query.answer("Maaf, hanya admin yang bisa menghapus tugas.", show_alert=True)
+            if not await is_admin(update, context):
+                await tombol.jawab(query, "Maaf, hanya admin yang bisa menghapus tugas.", show_alert=True)
                 return
                 
-            db.delete_tugas(data_id)
-            await query.edit_message_text(
+            if await adb.delete_tugas(chat_id, data_id):
+                tugas_dihapus(chat_id, data_id)
+            await tombol.jawab(query)
+            await edit_pesan(
+                query,
                 text=f"{query.message.text_html}\n\n--- <b>Status: ❌ DIHAPUS ADMIN</b> ---", 
                 parse_mode=ParseMode.HTML
             )
             
         elif action == "delmatkul":
-            if not is_admin(query.from_user.id):
-                await query.answer("Maaf, hanya admin yang bisa menghapus mata kuliah.", show_alert=True)
+            if not await is_admin(update, context):
+                await tombol.jawab(query, "Maaf, hanya admin yang bisa menghapus mata kuliah.", show_alert=True)
                 return
             
-            db.delete_matkul(data_id)
-            await query.edit_message_text(
-                text=f"{query.message.text_html}\n\n--- <b>Status: ❌ MATA KULIAH DIHAPUS</b> ---", 
-                parse_mode=ParseMode.HTML
-            )
+            if await adb.delete_matkul(chat_id, data_id):
+                await tombol.jawab(query, "❌ Mata kuliah dihapus.")
+            else:
+                await tombol.jawab(query, "Mata kuliah ini sudah tidak ada.")
+            await pengingat_kelas.segarkan()
+            # Daftar diperbarui di tempat, jadi nomor tombol tetap cocok dengan isinya.
+            pesan, reply_markup = await render_hapus_matkul(chat_id)
+            if pesan is None:
+                await edit_pesan(query, text="✅ Semua mata kuliah sudah dihapus.")
+            else:
+                await edit_pesan(query, text=pesan.satu(), reply_markup=reply_markup, parse_mode=ParseMode.HTML)
             
     except Exception as e:
         logger.error(f"Error di button_callback: {e}")
+        tombol.lupakan(query)
         await query.answer(f"Terjadi error: {e}", show_alert=True)
 
 async def setup_commands(application: Application) -> None:
@@ -404,9 +1060,13 @@ async def setup_commands(application: Application) -> None:
     commands = [
         BotCommand("start", "🚀 Mulai bot"),
         BotCommand("cek_matkul", "📚 Lihat jadwal matkul"),
+        BotCommand("sekarang", "🟢 Kelas yang sedang berlangsung"),
+        BotCommand("berikutnya", "⏭️ Kelas berikutnya"),
         BotCommand("cek_tugas", "📝 Lihat tugas pending"),
         BotCommand("tugas_selesai", "✅ Lihat tugas selesai"), 
         BotCommand("add_tugas", "➕ Tambah tugas baru"),
+        BotCommand("cari", "🔎 Cari tugas"),
+        BotCommand("export", "📤 Ekspor jadwal/tugas"),
         BotCommand("help", "❓ Bantuan"),
     ]
     await application.bot.set_my_commands(commands)
@@ -416,12 +1076,23 @@ async def setup_commands(application: Application) -> None:
             BotCommand("add_matkul", "🎓 TAMBAH MATKUL (Admin)"),   
             BotCommand("del_matkul", "🚫 HAPUS MATKUL (Admin)"),   
             BotCommand("clear_tugas", "🗑️ HAPUS SEMUA TUGAS (Admin)"),
+            BotCommand("import", "📥 IMPOR CSV/JSON (Admin)"),
         ]
-        await application.bot.set_my_commands(admin_commands, scope=telegram.BotCommandScopeChat(chat_id=ADMIN_ID))
-        logger.info(f"Perintah admin khusus diatur untuk ADMIN_ID: {ADMIN_ID}")
+        # Di chat pribadi user adalah admin chat-nya sendiri; di grup, admin grup.
+        await application.bot.set_my_commands(admin_commands, scope=telegram.BotCommandScopeAllPrivateChats())
+        await application.bot.set_my_commands(admin_commands, scope=telegram.BotCommandScopeAllChatAdministrators())
+        logger.info("Perintah admin diatur untuk chat pribadi dan admin grup.")
     except Exception as e:
-        logger.warning(f"Gagal mengatur perintah admin (Mungkin ADMIN_ID salah?): {e}")
+        logger.warning(f"Gagal mengatur perintah admin: {e}")
+
+BARIS_PENGINGAT_HARIAN = Template(
+    "📚 <b>{matkul_nama}</b>\n"
+    "📝: {deskripsi}\n"
+    "⏳: <b>{waktu}</b>\n"
+    "--------------------\n"
+)
 
+@metrics.terukur('job')
 async def kirim_pengingat_harian(context: ContextTypes.DEFAULT_TYPE):
     """
     JOB Harian: Mengecek DB dan mengirim pengingat jika ada deadline dekat.
@@ -430,43 +1101,267 @@ async def kirim_pengingat_harian(context: ContextTypes.DEFAULT_TYPE):
     logger.info("JOB: Menjalankan pengecekan pengingat harian...")
     
     try:
-        tugas_list = db.get_tugas(status='pending')
-        if not tugas_list:
-            logger.info("JOB: Tidak ada tugas pending, tidak ada pengingat dikirim.")
+        # Tugas yang deadline-nya dari sekarang sampai akhir hari besok (WIB).
+        sekarang = datetime.datetime.now(WIB)
+        akhir_besok = datetime.datetime.combine(
+            sekarang.date() + datetime.timedelta(days=2), datetime.time(0, 0), tzinfo=WIB
+        )
+        deadline_dekat = await adb.get_tugas_deadline_range(
+            int(sekarang.timestamp()), int(akhir_besok.timestamp()) - 1
+        )
+
+        if not deadline_dekat:
+            logger.info("JOB: Tidak ada tugas yang deadline-nya hari ini atau besok.")
             return
 
-        deadline_dekat = []
-        for tugas in tugas_list:
-            deadline_lower = tugas['deadline'].lower()
-            if 'besok' in deadline_lower or 'hari ini' in deadline_lower:
-                deadline_dekat.append(tugas)
-
-        if deadline_dekat:
-            message = "‼️ <b>PENGINGAT TUGAS HARIAN</b> ‼️\n\nHati-hati, ada tugas yang deadline-nya dekat:\n\n"
-            for tugas in deadline_dekat:
-                message += (
-                    f"📚 <b>{tugas['matkul_nama']}</b>\n"
-                    f"📝: {tugas['deskripsi']}\n"
-                    f"⏳: <b>{tugas['deadline']}</b>\n"
-                    "--------------------\n"
+        # Satu query untuk semua chat, lalu dikelompokkan per chat.
+        per_chat = {}
+        for tugas in deadline_dekat:
+            per_chat.setdefault(tugas['chat_id'], []).append(tugas)
+
+        async def kirim_ke_chat(chat_id, tugas_chat):
+            pesan = Pesan("‼️ <b>PENGINGAT TUGAS HARIAN</b> ‼️\n\nHati-hati, ada tugas yang deadline-nya dekat:\n\n")
+            for tugas in tugas_chat:
+                pesan.tambah(BARIS_PENGINGAT_HARIAN, waktu=format_deadline_tugas(tugas), **tugas)
+            try:
+                await render.kirim(
+                    functools.partial(context.bot.send_message, chat_id), pesan.hasil(),
+                    parse_mode=ParseMode.HTML, rate_limit_args={'prioritas': SIARAN}
                 )
-            await context.bot.send_message(chat_id=ADMIN_ID, text=message, parse_mode=ParseMode.HTML)
-            logger.info(f"JOB: Berhasil mengirim pengingat untuk {len(deadline_dekat)} tugas.")
-        else:
-            logger.info("JOB: Ada tugas, tapi tidak ada yang deadline-nya 'besok' or 'hari ini'.")
+            except Exception as e:
+                logger.error(f"JOB: Gagal mengirim pengingat harian ke chat {chat_id}: {e}")
+
+        # Semua chat dikirim bersamaan; laju pengiriman diatur oleh OutboxRateLimiter.
+        await asyncio.gather(*(kirim_ke_chat(chat_id, t) for chat_id, t in per_chat.items()))
+        logger.info(f"JOB: Pengingat harian untuk {len(deadline_dekat)} tugas dikirim ke {len(per_chat)} chat.")
             
     except Exception as e:
         logger.error(f"JOB: Gagal menjalankan kirim_pengingat_harian: {e}")
 
 
-# --- Fungsi Main ---
+async def kirim_pengingat_tugas(context: ContextTypes.DEFAULT_TYPE, tugas, offset: int) -> None:
+    """Mengirim pengingat satu tugas, `offset` detik sebelum deadline-nya."""
+    await context.bot.send_message(
+        chat_id=tugas['chat_id'],
+        text=(
+            f"⏰ <b>PENGINGAT: deadline {offset // 3600} jam lagi!</b>\n\n"
+            f"📚 <b>{html.escape(tugas['matkul_nama'])}</b>\n"
+            f"📝: {html.escape(tugas['deskripsi'])}\n"
+            f"⏳: <b>{html.escape(format_deadline_tugas(tugas))}</b>"
+        ),
+        parse_mode=ParseMode.HTML,
+        rate_limit_args={'prioritas': SIARAN}
+    )
+    logger.info(f"JOB: Pengingat {offset // 3600} jam terkirim untuk tugas {tugas['id']}.")
 
-def main() -> None:
-    """Fungsi utama untuk setup dan menjalankan bot."""
+pengingat = ReminderScheduler(kirim_pengingat_tugas)
 
-    logger.info("Menginisialisasi database...")
-    db.init_db()
-    application = Application.builder().token(TOKEN).build()
+async def kirim_pengingat_kelas(context: ContextTypes.DEFAULT_TYPE, matkul, menit: int) -> None:
+    """Mengirim pengingat satu kelas, `menit` menit sebelum kelas dimulai."""
+    await context.bot.send_message(
+        chat_id=matkul['chat_id'],
+        text=f"🔔 <b>Kelas dimulai {menit} menit lagi!</b>\n\n" + _format_kelas(matkul),
+        parse_mode=ParseMode.HTML,
+        rate_limit_args={'prioritas': SIARAN}
+    )
+    logger.info(f"JOB: Pengingat kelas terkirim untuk matkul {matkul['id']}.")
+
+pengingat_kelas = ClassReminder(kirim_pengingat_kelas, PENGINGAT_KELAS_MENIT)
+
+async def jadi_pemimpin(job_queue) -> None:
+    """Instance ini memegang lease: penjadwal pengingat tugas dan kelas dijalankan di sini."""
+    await pengingat.mulai(job_queue)
+    await pengingat_kelas.mulai(job_queue)
+
+async def bukan_pemimpin(job_queue) -> None:
+    pengingat.berhenti()
+    pengingat_kelas.berhenti()
+
+async def data_diubah_instance_lain(tabel: str) -> None:
+    """Membuang cache di memori yang basi karena tulisan instance lain (lihat lease.py)."""
+    if tabel == 'tugas':
+        await pengingat.muat_ulang()
+        indeks_inline.kosongkan()
+    elif tabel == 'mata_kuliah':
+        db.invalidasi_versi_matkul()
+        await pengingat_kelas.segarkan()
+
+# Hanya satu instance (pemegang lease) yang menjalankan job terjadwal.
+lease_jadwal = LeaderLease(jadi_pemimpin, bukan_pemimpin, data_diubah_instance_lain)
+
+# Tugas selesai dipindah ke arsip setelah 30 hari; tugas pending yang
+# deadline-nya sudah lewat 60 hari dianggap kedaluwarsa dan ikut diarsipkan.
+ARSIP_SELESAI_HARI = int(os.getenv("ARSIP_SELESAI_HARI", "30"))
+ARSIP_KEDALUWARSA_HARI = 60
+ARSIP_BATCH = 500
+
+@metrics.terukur('job')
+async def arsipkan_tugas_lama(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Job harian: memindahkan tugas lama ke arsip per batch (satu transaksi per
+    batch, sehingga penulisan dari handler bisa menyela), lalu merawat database.
+    """
+    try:
+        sekarang = int(time.time())
+        total = 0
+        while True:
+            jumlah = await adb.arsipkan_tugas(
+                sekarang - ARSIP_SELESAI_HARI * 86400, sekarang - ARSIP_KEDALUWARSA_HARI * 86400, ARSIP_BATCH
+            )
+            total += jumlah
+            if jumlah < ARSIP_BATCH:
+                break
+        if total:
+            # Tugas pending yang kedaluwarsa ikut diarsipkan; muat ulang index inline dari database.
+            indeks_inline.kosongkan()
+        halaman = await adb.rawat_database()
+        logger.info(f"JOB: {total} tugas diarsipkan, {halaman} halaman database dibebaskan.")
+    except Exception as e:
+        logger.error(f"JOB: Gagal menjalankan arsipkan_tugas_lama: {e}")
+
+
+@metrics.terukur('job')
+async def backup_database(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Job harian: snapshot database ke BACKUP_DIR tanpa menghentikan bot."""
+    try:
+        mulai = time.monotonic()
+        nama = await backup.backup()
+        logger.info(f"JOB: Backup {nama} selesai dalam {time.monotonic() - mulai:.1f} detik.")
+    except Exception as e:
+        logger.error(f"JOB: Gagal menjalankan backup_database: {e}")
+
+
+_metrics_server = None
+
+
+def _pemilik_bot(update: Update) -> bool:
+    return ADMIN_ID is not None and update.effective_user.id == ADMIN_ID
+
+
+async def buat_backup(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler /backup (khusus pemilik bot): membuat snapshot database sekarang."""
+    if not _pemilik_bot(update):
+        await update.message.reply_text("Perintah ini khusus pemilik bot.")
+        return
+    try:
+        nama = await backup.backup_manual()
+        await update.message.reply_html(f"✅ Snapshot <code>{html.escape(nama)}</code> dibuat.")
+    except Exception as e:
+        logger.error(f"Error di buat_backup: {e}")
+        await update.message.reply_text(f"Terjadi error: {e}")
+
+
+async def restore(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Handler /restore (khusus pemilik bot). Tanpa argumen: daftar snapshot.
+    /restore <nama>: memulihkan snapshot, lalu memuat ulang cache dan pengingat.
+    """
+    if not _pemilik_bot(update):
+        await update.message.reply_text("Perintah ini khusus pemilik bot.")
+        return
+    if not context.args:
+        daftar = backup.daftar_snapshot()
+        if not daftar:
+            await update.message.reply_text("Belum ada snapshot.")
+            return
+        baris = "\n".join(f"<code>{html.escape(nama)}</code>" for nama in daftar[:20])
+        await update.message.reply_html(f"<b>Snapshot tersedia</b> (terbaru di atas):\n{baris}\n\nPakai: /restore &lt;nama&gt;")
+        return
+
+    try:
+        # Snapshot lama dimigrasikan ke skema terbaru sebagai bagian dari restore.
+        cadangan = await backup.restore(context.args[0], ADMIN_ID)
+        await pengingat.muat_ulang()
+        indeks_inline.kosongkan()
+        await pengingat_kelas.segarkan()
+        await update.message.reply_html(
+            f"✅ Database dipulihkan dari <code>{html.escape(context.args[0])}</code>.\n"
+            f"Data sebelumnya disimpan sebagai <code>{html.escape(cadangan)}</code>."
+        )
+    except backup.RestoreGagal as e:
+        await update.message.reply_text(f"Restore dibatalkan: {e}")
+    except Exception as e:
+        logger.error(f"Error di restore: {e}")
+        await update.message.reply_text(f"Terjadi error: {e}")
+
+
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler /stats (khusus pemilik bot): ringkasan latensi handler, DB, Bot API, dan job."""
+    if not _pemilik_bot(update):
+        await update.message.reply_text("Perintah ini khusus pemilik bot.")
+        return
+    await update.message.reply_html(f"<pre>{metrics.format_ringkas()}</pre>")
+
+
+async def siapkan_bot(application: Application) -> None:
+    """
+    Dipanggil sebelum bot mulai: mengambil lease job terjadwal; jika berhasil,
+    jadwal pengingat per tugas dan per kelas dimuat dari DB.
+    """
+    global _metrics_server
+    await lease_jadwal.mulai(application.job_queue)
+    if METRICS_PORT:
+        _metrics_server = await metrics.mulai_server(int(METRICS_PORT))
+
+
+async def tutup_bot(application: Application) -> None:
+    """Dipanggil saat bot berhenti: menutup endpoint metrik dan executor database."""
+    if _metrics_server is not None:
+        _metrics_server.close()
+    await lease_jadwal.berhenti()
+    adb.shutdown()
+
+
+def jalankan_webhook(application: Application) -> None:
+    """
+    Menjalankan bot dalam mode webhook: server HTTP lokal menerima update
+    dari Telegram (bisa di belakang reverse proxy). Request tanpa header
+    X-Telegram-Bot-Api-Secret-Token yang cocok ditolak. Berhenti dengan
+    rapi saat menerima SIGINT/SIGTERM.
+    """
+    webhook_url = os.getenv("WEBHOOK_URL")
+    if not webhook_url:
+        print("Error: BOT_MODE=webhook butuh WEBHOOK_URL (URL publik, cth: https://bot.contoh.id).")
+        exit()
+    listen = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+    port = int(os.getenv("WEBHOOK_PORT", "8443"))
+    url_path = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+    secret = os.getenv("WEBHOOK_SECRET")
+    if not secret:
+        logger.warning("WEBHOOK_SECRET kosong: siapa pun yang tahu URL webhook bisa mengirim update palsu.")
+
+    logger.info(f"Bot mulai berjalan (webhook) di {listen}:{port}/{url_path}...")
+    application.run_webhook(
+        listen=listen,
+        port=port,
+        url_path=url_path,
+        webhook_url=f"{webhook_url.rstrip('/')}/{url_path}",
+        secret_token=secret,
+        allowed_updates=Update.ALL_TYPES,
+    )
+
+
+# --- Fungsi Main ---
+
+def build_application(request=None, rate_limiter=None) -> Application:
+    """
+    Membangun Application lengkap dengan semua handler dan job.
+    `request` dan `rate_limiter` bisa diganti (cth: Bot API tiruan di benchmark.py).
+    """
+    builder = (
+        Application.builder().token(TOKEN).persistence(SQLitePersistence())
+        .post_init(siapkan_bot).post_shutdown(tutup_bot)
+    )
+    if request is None:
+        request = HTTPXRequest(connection_pool_size=256)
+    else:
+        builder = builder.get_updates_request(request)
+    # getUpdates (long polling) sengaja tidak diukur supaya tidak menenggelamkan metrik lain.
+    builder = builder.request(metrics.RequestTerukur(request))
+    builder = builder.rate_limiter(rate_limiter or OutboxRateLimiter())
+    if MAX_CONCURRENT_UPDATES > 1:
+        builder = builder.concurrent_updates(PerChatUpdateProcessor(MAX_CONCURRENT_UPDATES))
+    application = builder.build()
 
     conv_handler_tugas = ConversationHandler(
         entry_points=[
@@ -479,6 +1374,8 @@ def main() -> None:
             DEADLINE: [MessageHandler(filters.TEXT & ~filters.COMMAND, deadline_tugas)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name="add_tugas",
+        persistent=True,
     )
 
     conv_handler_matkul = ConversationHandler(
@@ -490,31 +1387,78 @@ def main() -> None:
             MATKUL_RUANGAN: [MessageHandler(filters.TEXT & ~filters.COMMAND, matkul_ruangan)],
         },
         fallbacks=[CommandHandler("cancel", cancel)], 
+        name="add_matkul",
+        persistent=True,
     )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("cek_matkul", cek_matkul))
+    application.add_handler(CommandHandler("sekarang", sekarang))
+    application.add_handler(CommandHandler("berikutnya", berikutnya))
     application.add_handler(CommandHandler("cek_tugas", cek_tugas))
     application.add_handler(CommandHandler("clear_tugas", clear_tugas))
     application.add_handler(CommandHandler("tugas_selesai", tugas_selesai))
     application.add_handler(CommandHandler("del_matkul", del_matkul))
+    application.add_handler(CommandHandler("stats", stats))
+    application.add_handler(CommandHandler("backup", buat_backup))
+    application.add_handler(CommandHandler("restore", restore))
+    application.add_handler(CommandHandler("cari", cari))
+    application.add_handler(CommandHandler("export", ekspor))
+    application.add_handler(CommandHandler("import", impor))
+    application.add_handler(MessageHandler(filters.Document.ALL & filters.CaptionRegex(r"^/import(@\w+)?(\s|$)"), impor))
+    application.add_handler(InlineQueryHandler(inline_cari))
+    application.add_handler(TypeHandler(Update, pembatas_masuk.saring), group=-2)
+    application.add_handler(TypeHandler(Update, catat_anggota), group=-1)
     application.add_handler(conv_handler_tugas)
     application.add_handler(conv_handler_matkul) 
+    application.add_handler(CallbackQueryHandler(cari_callback, pattern="^cari_"))
     application.add_handler(CallbackQueryHandler(button_callback)) 
     application.add_handler(MessageHandler(filters.TEXT & filters.Regex("^📚 Cek Jadwal$"), cek_matkul))
     application.add_handler(MessageHandler(filters.TEXT & filters.Regex("^📝 Cek Tugas$"), cek_tugas))
     application.add_handler(MessageHandler(filters.TEXT & filters.Regex("^✅ Tugas Selesai$"), tugas_selesai))
     application.add_handler(MessageHandler(filters.TEXT & filters.Regex("^❓ Bantuan$"), help_command))
+    metrics.instrumentasi_handlers(application)
+    # Fungsi tanpa query (versi matkul dibaca setiap lookup cache) tidak diukur.
+    metrics.instrumentasi_modul(db, 'db', kecuali=(
+        'get_db_connection', 'write_connection', 'read_connection', 'close_all',
+        'get_matkul_version', 'invalidasi_versi_matkul',
+    ))
     job_queue = application.job_queue
-    job_queue.run_once(setup_commands, 0) 
+    # Job terjadwal didaftarkan di semua instance, tetapi hanya pemegang lease yang menjalankannya.
+    khusus_pemimpin = lease_jadwal.khusus_pemimpin
+    job_queue.run_once(khusus_pemimpin(setup_commands), 0)
     target_time = datetime.time(hour=1, minute=0, second=0) 
-    job_queue.run_daily(kirim_pengingat_harian, time=target_time, days=(0, 1, 2, 3, 4, 5, 6))
+    job_queue.run_daily(khusus_pemimpin(kirim_pengingat_harian), time=target_time, days=(0, 1, 2, 3, 4, 5, 6))
     logger.info("Job pengingat harian diatur untuk jam 01:00 UTC (08:00 WIB).")
+    job_queue.run_daily(khusus_pemimpin(arsipkan_tugas_lama), time=datetime.time(hour=19, minute=0))
+    logger.info("Job arsip tugas diatur untuk jam 19:00 UTC (02:00 WIB).")
+    job_queue.run_daily(khusus_pemimpin(backup_database), time=datetime.time(hour=20, minute=0))
+    logger.info(f"Job backup diatur untuk jam 20:00 UTC (03:00 WIB) ke {backup.BACKUP_DIR}/.")
+    logger.info("Pengingat per tugas dikirim 24, 3, dan 1 jam sebelum deadline.")
+    return application
+
+
+def main() -> None:
+    """Fungsi utama untuk setup dan menjalankan bot."""
+
+    try:
+        backup.periksa_konfigurasi()
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit()
 
+    logger.info("Menginisialisasi database...")
+    mulai = time.perf_counter()
+    diterapkan = db.init_db(default_chat_id=ADMIN_ID)
+    logger.info(f"Database siap dalam {(time.perf_counter() - mulai) * 1000:.1f} ms ({diterapkan} migrasi baru).")
+    application = build_application()
 
-    logger.info("Bot mulai berjalan...")
-    application.run_polling()
+    if BOT_MODE == "webhook":
+        jalankan_webhook(application)
+    else:
+        logger.info("Bot mulai berjalan (polling)...")
+        application.run_polling()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,28 @@
+class VersionedCache:
+    """
+    Cache read-through di memori, dipisah per partisi (cth: per chat), yang
+    otomatis kosong saat versi data partisi tersebut berubah.
+
+    `get_version(partisi)` adalah fungsi murah (tanpa I/O) yang nilainya naik
+    setiap kali data sumber ditulis, misalnya db.get_matkul_version.
+    """
+
+    def __init__(self, get_version):
+        self._get_version = get_version
+        self._partisi = {}
+
+    async def get(self, partisi, key, build):
+        """Mengambil nilai `key` di `partisi`; jika belum ada, dibangun dengan `await build()`."""
+        version = self._get_version(partisi)
+        cached_version, data = self._partisi.get(partisi, (None, None))
+        if cached_version != version:
+            data = {}
+            self._partisi[partisi] = (version, data)
+        if key in data:
+            return data[key]
+
+        value = await build()
+        # Jangan simpan hasil yang dibangun dari data yang berubah di tengah jalan.
+        if self._get_version(partisi) == version:
+            data[key] = value
+        return value
@@ -1,66 +1,128 @@
+import os
+import queue
+import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 
-def get_db_connection():
-    """Membuat koneksi ke database."""
-    conn = sqlite3.connect('tugas.db')
+import migrations
+
+DB_PATH = os.getenv('DB_PATH', 'tugas.db')
+READER_POOL_SIZE = 4
+
+# Diterapkan ke setiap koneksi. WAL membuat pembaca tidak pernah menunggu
+# penulis; synchronous=NORMAL aman untuk WAL dan jauh lebih murah dari FULL.
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+_writer = None
+_writer_lock = threading.Lock()
+_readers = queue.LifoQueue()
+_reader_count = 0
+_pool_lock = threading.Lock()
+
+# Versi data mata_kuliah per chat, naik setiap kali ditulis; dipakai untuk
+# invalidasi cache tanpa query ke database.
+_matkul_version = {}
+# Naik saat seluruh isi database diganti (restore), membatalkan semua versi di atas.
+_matkul_epoch = 0
+# Id instance yang perubahannya dicatat di tabel perubahan (lihat pasang_pencatat_perubahan).
+_pencatat = None
+
+def get_db_connection(readonly=False):
+    """Membuat koneksi baru ke database (dipakai oleh pool koneksi)."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
     return conn
 
-def init_db():
-    """Inisialisasi database dan tabel, lalu isi data matkul."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS mata_kuliah (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nama TEXT NOT NULL,
-        hari TEXT NOT NULL,
-        jam TEXT NOT NULL,
-        ruangan TEXT NOT NULL
-    )
-    ''')
-
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS tugas (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        matkul_nama TEXT NOT NULL,
-        deskripsi TEXT NOT NULL,
-        deadline TEXT NOT NULL,
-        status TEXT NOT NULL DEFAULT 'pending'
-    )
-    ''')
-    
-    cursor.execute("SELECT COUNT(*) FROM mata_kuliah")
-    if cursor.fetchone()[0] == 0:
-        # Isi 7 mata kuliah (contoh)
-        matkul_default = [
-            ('Kalkulus', 'Senin', '13:30 - 16:00', 'G3E'),
-            ('Bahasa Indonesia', 'Selasa', '08:00 - 09:40', 'G3E'),
-            ('Sistem Basis Data', 'Selasa', '10:45 - 13:15', 'Lab Programming'),
-            ('Emerging Technologies & Digital Transformation', 'Selasa', '13:30 - 16:00', 'G1A'),
-            ('Logika Informatika', 'Rabu', '08:00 - 10:30', 'G3A'),
-            ('Algoritma Pemrograman', 'Rabu', '10:45 - 13:15', 'Lab Programming'),
-            ('Sistem Operasi', 'Rabu', '16:00 - 18:00', 'Lab Programming')
-            
-        ]
-        cursor.executemany(
-            "INSERT INTO mata_kuliah (nama, hari, jam, ruangan) VALUES (?, ?, ?, ?)",
-            matkul_default
-        )
-        print("Database diinisialisasi dan 7 mata kuliah ditambahkan.")
-        
-    conn.commit()
-    conn.close()
+@contextmanager
+def write_connection():
+    """Meminjam satu-satunya koneksi penulis; commit otomatis di akhir blok."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = get_db_connection()
+            if _pencatat is not None:
+                _buat_trigger_pencatat(_writer, _pencatat)
+        with _writer:
+            yield _writer
+
+@contextmanager
+def read_connection():
+    """Meminjam koneksi pembaca dari pool (maksimal READER_POOL_SIZE koneksi)."""
+    global _reader_count
+    try:
+        conn = _readers.get_nowait()
+    except queue.Empty:
+        with _pool_lock:
+            buat_baru = _reader_count < READER_POOL_SIZE
+            if buat_baru:
+                _reader_count += 1
+        conn = get_db_connection(readonly=True) if buat_baru else _readers.get()
+    try:
+        yield conn
+    finally:
+        _readers.put(conn)
+
+def close_all():
+    """Menutup koneksi penulis dan semua koneksi pembaca di pool."""
+    global _writer, _reader_count
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+    with _pool_lock:
+        while True:
+            try:
+                _readers.get_nowait().close()
+            except queue.Empty:
+                break
+        _reader_count = 0
+
+def init_db(default_chat_id=None):
+    """
+    Menyiapkan skema database lewat migrasi (lihat migrations.py); tidak ada
+    DDL jika skema sudah terbaru. Data dari versi lama (sebelum ada chat_id)
+    dan matkul contoh dimasukkan ke chat `default_chat_id`. Mengembalikan
+    jumlah migrasi yang diterapkan.
+    """
+    with write_connection() as conn:
+        diterapkan = migrations.jalankan(conn, default_chat_id)
+    if diterapkan and default_chat_id is not None:
+        _bump_matkul_version(default_chat_id)
+    return diterapkan
+
+
+def _bump_matkul_version(chat_id):
+    _matkul_version[chat_id] = _matkul_version.get(chat_id, 0) + 1
+    # Kunci None adalah versi gabungan yang naik setiap kali matkul chat mana pun berubah.
+    _matkul_version[None] = _matkul_version.get(None, 0) + 1
 
-def get_matkul():
-    """Mengambil semua data mata kuliah, diurutkan berdasarkan hari dan jam."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def get_matkul_version(chat_id):
+    """Versi data mata kuliah sebuah chat (atau semua chat jika None) saat ini, tanpa query ke database."""
+    return _matkul_epoch + _matkul_version.get(chat_id, 0)
 
+def invalidasi_versi_matkul():
+    """Menaikkan versi matkul semua chat sekaligus (cth: setelah database dipulihkan dari backup)."""
+    global _matkul_epoch
+    _matkul_epoch += 1
+
+def get_matkul(chat_id):
+    """Mengambil semua data mata kuliah sebuah chat, diurutkan berdasarkan hari dan jam."""
     sql_query = """
-    SELECT nama, hari, jam, ruangan
+    SELECT id, nama, hari, jam, ruangan
     FROM mata_kuliah
+    WHERE chat_id = ?
     ORDER BY
         CASE
             WHEN hari = 'Senin' THEN 1
@@ -74,92 +136,404 @@ def get_matkul():
         END,
         jam
     """
-    cursor.execute(sql_query)
-    
-    matkul = cursor.fetchall()
-    conn.close()
-    return matkul
+    with read_connection() as conn:
+        return conn.execute(sql_query, (chat_id,)).fetchall()
+
+def get_semua_matkul():
+    """Mengambil mata kuliah semua chat (untuk indeks pengingat kelas)."""
+    with read_connection() as conn:
+        return conn.execute("SELECT id, chat_id, nama, hari, jam, ruangan FROM mata_kuliah").fetchall()
 
-def add_matkul(nama, hari, jam, ruangan):
+def add_matkul(chat_id, nama, hari, jam, ruangan):
     """Menambahkan mata kuliah baru ke database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO mata_kuliah (nama, hari, jam, ruangan) VALUES (?, ?, ?, ?)",
-        (nama, hari, jam, ruangan)
-    )
-    conn.commit()
-    conn.close()
-
-def delete_matkul(matkul_id):
-    """Menghapus mata kuliah berdasarkan ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM mata_kuliah WHERE id = ?", (matkul_id,))
-    conn.commit()
-    conn.close()
-    
-def get_nama_matkul():
+    with write_connection() as conn:
+        conn.execute(
+            "INSERT INTO mata_kuliah (nama, hari, jam, ruangan, chat_id) VALUES (?, ?, ?, ?, ?)",
+            (nama, hari, jam, ruangan, chat_id)
+        )
+    # Setelah commit: pembaca yang melihat versi baru pasti juga melihat barisnya.
+    _bump_matkul_version(chat_id)
+
+def delete_matkul(chat_id, matkul_id):
+    """Menghapus mata kuliah berdasarkan ID, mengembalikan True jika ada yang terhapus."""
+    with write_connection() as conn:
+        cursor = conn.execute("DELETE FROM mata_kuliah WHERE id = ? AND chat_id = ?", (matkul_id, chat_id))
+    _bump_matkul_version(chat_id)
+    return cursor.rowcount > 0
+
+def get_nama_matkul(chat_id):
     """Hanya mengambil nama mata kuliah (untuk keyboard)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT nama FROM mata_kuliah ORDER BY nama")
-
-    nama_matkul = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    return nama_matkul
-
-def add_tugas(matkul, deskripsi, deadline):
-    """Menambahkan tugas baru ke database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO tugas (matkul_nama, deskripsi, deadline, status) VALUES (?, ?, ?, 'pending')",
-        (matkul, deskripsi, deadline)
-    )
-    conn.commit()
-    conn.close()
-
-def get_tugas(status='pending'):
-    """Mengambil semua tugas dengan status tertentu."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, matkul_nama, deskripsi, deadline FROM tugas WHERE status = ? ORDER BY deadline",
-        (status,)
-    )
-    tugas = cursor.fetchall()
-    conn.close()
-    return tugas
-
-def update_tugas_status(tugas_id, status):
-    """Mengubah status tugas (cth: 'pending' -> 'done')."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE tugas SET status = ? WHERE id = ?", (status, tugas_id))
-    conn.commit()
-    conn.close()
-
-def delete_tugas(tugas_id):
-    """Menghapus tugas berdasarkan ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM tugas WHERE id = ?", (tugas_id,))
-    conn.commit()
-    conn.close()
-
-def clear_all_tugas():
-    """Menghapus SEMUA tugas dari tabel."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM tugas")
-
-    cursor.execute("DELETE FROM sqlite_sequence WHERE name='tugas'")
-    conn.commit()
-    conn.close()
+    with read_connection() as conn:
+        rows = conn.execute(
+            "SELECT nama FROM mata_kuliah WHERE chat_id = ? ORDER BY nama", (chat_id,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+def add_tugas(chat_id, matkul, deskripsi, deadline, deadline_ts=None):
+    """Menambahkan tugas baru ke database, mengembalikan ID tugas."""
+    with write_connection() as conn:
+        cursor = conn.execute(
+            "INSERT INTO tugas (matkul_nama, deskripsi, deadline, deadline_ts, status, chat_id) "
+            "VALUES (?, ?, ?, ?, 'pending', ?)",
+            (matkul, deskripsi, deadline, deadline_ts, chat_id)
+        )
+        return cursor.lastrowid
+
+def get_tugas(chat_id, status='pending'):
+    """Mengambil semua tugas sebuah chat dengan status tertentu, urut dari deadline terdekat."""
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, matkul_nama, deskripsi, deadline, deadline_ts FROM tugas "
+            "WHERE chat_id = ? AND status = ? ORDER BY deadline_ts NULLS LAST, id",
+            (chat_id, status)
+        ).fetchall()
+
+def get_tugas_page(chat_id, status, limit, offset):
+    """Mengambil satu halaman tugas (LIMIT/OFFSET di atas index chat+status+deadline)."""
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, matkul_nama, deskripsi, deadline, deadline_ts FROM tugas "
+            "WHERE chat_id = ? AND status = ? ORDER BY deadline_ts NULLS LAST, id LIMIT ? OFFSET ?",
+            (chat_id, status, limit, offset)
+        ).fetchall()
+
+def get_tugas_deadline_range(mulai_ts, akhir_ts, status='pending'):
+    """Mengambil tugas SEMUA chat yang deadline-nya di antara dua epoch (memakai index)."""
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, chat_id, matkul_nama, deskripsi, deadline, deadline_ts FROM tugas "
+            "WHERE status = ? AND deadline_ts BETWEEN ? AND ? ORDER BY deadline_ts",
+            (status, mulai_ts, akhir_ts)
+        ).fetchall()
+
+def update_tugas_status(chat_id, tugas_id, status):
+    """Mengubah status tugas (cth: 'pending' -> 'done'), True jika tugas ditemukan."""
+    selesai_at = int(time.time()) if status == 'done' else None
+    with write_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE tugas SET status = ?, selesai_at = ? WHERE id = ? AND chat_id = ?",
+            (status, selesai_at, tugas_id, chat_id)
+        )
+        return cursor.rowcount > 0
+
+def update_status_banyak(chat_id, tugas_ids, status):
+    """
+    Mengubah status banyak tugas sekaligus dalam satu transaksi.
+    Mengembalikan id yang benar-benar ada di chat ini dan statusnya berubah;
+    tugas yang statusnya sudah `status` (cth: sudah selesai) tidak disentuh.
+    """
+    selesai_at = int(time.time()) if status == 'done' else None
+    with write_connection() as conn:
+        ids = _ids_milik_chat(conn, chat_id, tugas_ids, "AND status != ?", (status,))
+        conn.executemany(
+            "UPDATE tugas SET status = ?, selesai_at = ? WHERE id = ?",
+            [(status, selesai_at, tugas_id) for tugas_id in ids]
+        )
+        return ids
+
+def delete_tugas_banyak(chat_id, tugas_ids):
+    """Menghapus banyak tugas sekaligus dalam satu transaksi; mengembalikan id yang terhapus."""
+    with write_connection() as conn:
+        ids = _ids_milik_chat(conn, chat_id, tugas_ids)
+        conn.executemany("DELETE FROM tugas WHERE id = ?", [(tugas_id,) for tugas_id in ids])
+        return ids
+
+def _ids_milik_chat(conn, chat_id, tugas_ids, syarat='', params=()):
+    tugas_ids = list(tugas_ids)
+    if not tugas_ids:
+        return []
+    tanda = ','.join('?' * len(tugas_ids))
+    return [row[0] for row in conn.execute(
+        f"SELECT id FROM tugas WHERE chat_id = ? AND id IN ({tanda}) {syarat}", (chat_id, *tugas_ids, *params)
+    )]
+
+def get_tugas_selesai_page(chat_id, limit, offset):
+    """Satu halaman tugas selesai dari tabel tugas dan arsip, yang terakhir selesai lebih dulu."""
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, matkul_nama, deskripsi, deadline, deadline_ts, selesai_at FROM tugas "
+            "WHERE chat_id = ? AND status = 'done' "
+            "UNION ALL "
+            "SELECT id, matkul_nama, deskripsi, deadline, deadline_ts, selesai_at FROM tugas_arsip "
+            "WHERE chat_id = ? AND status = 'done' "
+            "ORDER BY selesai_at DESC, id DESC LIMIT ? OFFSET ?",
+            (chat_id, chat_id, limit, offset)
+        ).fetchall()
+
+def arsipkan_tugas(batas_selesai, batas_deadline, batch=500):
+    """
+    Memindahkan satu batch tugas ke tugas_arsip dalam satu transaksi: tugas
+    yang selesai sebelum `batas_selesai` dan tugas pending yang deadline-nya
+    sebelum `batas_deadline`. Mengembalikan jumlah tugas yang dipindahkan.
+    """
+    with write_connection() as conn:
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM tugas WHERE status = 'done' AND selesai_at < ? "
+            "UNION ALL "
+            "SELECT id FROM tugas WHERE status = 'pending' AND deadline_ts < ? LIMIT ?",
+            (batas_selesai, batas_deadline, batch)
+        )]
+        if not ids:
+            return 0
+        tanda = ','.join('?' * len(ids))
+        sekarang = int(time.time())
+        baris = conn.execute(
+            "SELECT id, matkul_nama, deskripsi, deadline, status, deadline_ts, chat_id, selesai_at "
+            f"FROM tugas WHERE id IN ({tanda})",
+            ids
+        ).fetchall()
+        # Dihapus dulu baru disisipkan: index pencarian memakai id yang sama untuk tugas dan arsipnya.
+        conn.execute(f"DELETE FROM tugas WHERE id IN ({tanda})", ids)
+        conn.executemany(
+            "INSERT OR REPLACE INTO tugas_arsip "
+            "(id, matkul_nama, deskripsi, deadline, status, deadline_ts, chat_id, selesai_at, arsip_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [tuple(b) + (sekarang,) for b in baris]
+        )
+        return len(ids)
+
+def rawat_database(halaman=2000):
+    """
+    Mengembalikan maksimal `halaman` halaman kosong ke sistem (incremental
+    vacuum) lalu memperbarui statistik query planner. Mengembalikan jumlah
+    halaman yang dibebaskan.
+    """
+    with write_connection() as conn:
+        kosong = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(halaman)})").fetchall()
+        conn.execute("PRAGMA analysis_limit = 400")
+        conn.execute("ANALYZE")
+        return kosong - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+def delete_tugas(chat_id, tugas_id):
+    """Menghapus tugas berdasarkan ID, True jika tugas ditemukan."""
+    with write_connection() as conn:
+        cursor = conn.execute("DELETE FROM tugas WHERE id = ? AND chat_id = ?", (tugas_id, chat_id))
+        return cursor.rowcount > 0
+
+def clear_all_tugas(chat_id):
+    """Menghapus SEMUA tugas milik sebuah chat, termasuk arsipnya."""
+    with write_connection() as conn:
+        conn.execute("DELETE FROM tugas WHERE chat_id = ?", (chat_id,))
+        conn.execute("DELETE FROM tugas_arsip WHERE chat_id = ?", (chat_id,))
+
+def import_matkul(chat_id, baris):
+    """Menambahkan banyak matkul (nama, hari, jam, ruangan) sekaligus dalam satu transaksi."""
+    with write_connection() as conn:
+        conn.executemany(
+            "INSERT INTO mata_kuliah (nama, hari, jam, ruangan, chat_id) VALUES (?, ?, ?, ?, ?)",
+            [tuple(b) + (chat_id,) for b in baris]
+        )
+    _bump_matkul_version(chat_id)
+    return len(baris)
+
+def import_tugas(chat_id, baris):
+    """
+    Menambahkan banyak tugas (matkul, deskripsi, deadline, deadline_ts, status)
+    dalam satu transaksi. Mengembalikan tugas pending baru yang punya deadline_ts
+    (untuk dijadwalkan pengingatnya).
+    """
+    with write_connection() as conn:
+        # Kunci tulis diambil sebelum membaca MAX(id): instance lain yang berbagi
+        # database tidak bisa menyisipkan tugas di antaranya, jadi dengan AUTOINCREMENT
+        # semua id di atas id_terakhir adalah hasil impor ini.
+        conn.execute("BEGIN IMMEDIATE")
+        id_terakhir = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tugas").fetchone()[0]
+        sekarang = int(time.time())
+        conn.executemany(
+            "INSERT INTO tugas (matkul_nama, deskripsi, deadline, deadline_ts, status, chat_id, selesai_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [tuple(b) + (chat_id, sekarang if b[4] == 'done' else None) for b in baris]
+        )
+        return conn.execute(
+            "SELECT id, chat_id, matkul_nama, deskripsi, deadline, deadline_ts FROM tugas "
+            "WHERE id > ? AND chat_id = ? AND status = 'pending' AND deadline_ts IS NOT NULL",
+            (id_terakhir, chat_id)
+        ).fetchall()
+
+def iter_matkul(chat_id):
+    """Generator semua matkul sebuah chat, dibaca baris demi baris (untuk ekspor)."""
+    with read_connection() as conn:
+        yield from conn.execute(
+            "SELECT id, nama, hari, jam, ruangan FROM mata_kuliah WHERE chat_id = ? ORDER BY id", (chat_id,)
+        )
+
+def iter_tugas(chat_id):
+    """Generator semua tugas sebuah chat, dibaca baris demi baris (untuk ekspor)."""
+    with read_connection() as conn:
+        yield from conn.execute(
+            "SELECT id, matkul_nama, deskripsi, deadline, deadline_ts, status FROM tugas "
+            "WHERE chat_id = ? ORDER BY deadline_ts NULLS LAST, id",
+            (chat_id,)
+        )
+
+def _query_fts(teks):
+    """Mengubah teks bebas menjadi query FTS5 aman: setiap kata dicari sebagai prefix."""
+    return ' '.join(f'"{kata}"*' for kata in re.findall(r'\w+', teks.lower()))
+
+def token_chat(chat_id):
+    """Token chat di kolom `chat` tugas_cari, cth: -100123 -> 'cn100123' (sama dengan trigger di migrations)."""
+    return f"c{chat_id}".replace('-', 'n')
+
+def cari_tugas(chat_ids, teks, limit, offset=0):
+    """
+    Mencari tugas (pending, selesai, dan yang sudah diarsipkan) di chat-chat
+    `chat_ids` lewat index FTS5, diurutkan dari yang paling relevan (bm25,
+    kecocokan di matkul diberi bobot lebih). Filter chat ada di dalam MATCH,
+    jadi dokumen chat lain tidak ikut dinilai. Kolom `diarsipkan` bernilai 1
+    untuk tugas dari tugas_arsip.
+    """
+    query = _query_fts(teks)
+    if not query or not chat_ids:
+        return []
+    chat = ' OR '.join(f'"{token_chat(chat_id)}"' for chat_id in chat_ids)
+    with read_connection() as conn:
+        return conn.execute(
+            "WITH cocok AS MATERIALIZED ("
+            "SELECT rowid AS id, bm25(tugas_cari, 0.0, 1.0, 2.0) AS skor FROM tugas_cari WHERE tugas_cari MATCH ?) "
+            "SELECT * FROM ("
+            "SELECT t.id, t.chat_id, t.matkul_nama, t.deskripsi, t.deadline, t.deadline_ts, t.status, "
+            "0 AS diarsipkan, c.skor FROM cocok c JOIN tugas t ON t.id = c.id "
+            "UNION ALL "
+            "SELECT a.id, a.chat_id, a.matkul_nama, a.deskripsi, a.deadline, a.deadline_ts, a.status, "
+            "1 AS diarsipkan, c.skor FROM cocok c JOIN tugas_arsip a ON a.id = c.id"
+            ") ORDER BY skor, deadline_ts NULLS LAST, id LIMIT ? OFFSET ?",
+            (f"chat : ({chat}) AND {{deskripsi matkul_nama}} : ({query})", limit, offset)
+        ).fetchall()
+
+def tambah_anggota_chat(user_id, chat_id):
+    """Mencatat bahwa user pernah berinteraksi di sebuah chat grup."""
+    with write_connection() as conn:
+        conn.execute("INSERT OR IGNORE INTO anggota_chat (user_id, chat_id) VALUES (?, ?)", (user_id, chat_id))
+
+def get_chat_user(user_id):
+    """Daftar chat grup yang pernah dipakai user (lihat tambah_anggota_chat)."""
+    with read_connection() as conn:
+        return [row['chat_id'] for row in conn.execute(
+            "SELECT chat_id FROM anggota_chat WHERE user_id = ?", (user_id,)
+        )]
+
+def get_percakapan(nama):
+    """Mengambil semua state percakapan tersimpan milik ConversationHandler `nama`."""
+    with read_connection() as conn:
+        return conn.execute("SELECT kunci, state FROM percakapan WHERE nama = ?", (nama,)).fetchall()
+
+def get_data_persisten(tabel):
+    """Mengambil semua baris user_data atau chat_data sebagai (id, data JSON)."""
+    kolom = {'user_data': 'user_id', 'chat_data': 'chat_id'}[tabel]
+    with read_connection() as conn:
+        return conn.execute(f"SELECT {kolom}, data FROM {tabel}").fetchall()
+
+def simpan_persisten(percakapan, user_data, chat_data):
+    """
+    Menyimpan sekumpulan perubahan persistence dalam satu transaksi.
+    `percakapan` berisi (nama, kunci, state), `user_data`/`chat_data` berisi
+    (id, data JSON). State atau data None berarti barisnya dihapus.
+    """
+    with write_connection() as conn:
+        conn.executemany(
+            "DELETE FROM percakapan WHERE nama = ? AND kunci = ?",
+            [(nama, kunci) for nama, kunci, state in percakapan if state is None]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO percakapan (nama, kunci, state) VALUES (?, ?, ?)",
+            [baris for baris in percakapan if baris[2] is not None]
+        )
+        for tabel, kolom, baris in (('user_data', 'user_id', user_data), ('chat_data', 'chat_id', chat_data)):
+            conn.executemany(
+                f"DELETE FROM {tabel} WHERE {kolom} = ?",
+                [(id_,) for id_, data in baris if data is None]
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {tabel} ({kolom}, data) VALUES (?, ?)",
+                [(id_, data) for id_, data in baris if data is not None]
+            )
+
+def ambil_lease(nama, pemilik, durasi):
+    """
+    Mengambil atau memperpanjang lease `nama` untuk `pemilik` selama `durasi`
+    detik. Gagal (False) jika lease masih dipegang pemilik lain dan belum
+    kedaluwarsa. Jam semua instance dianggap sinkron.
+    """
+    sekarang = time.time()
+    with write_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO lease (nama, pemilik, kedaluwarsa) VALUES (?, ?, ?)
+            ON CONFLICT (nama) DO UPDATE SET pemilik = excluded.pemilik, kedaluwarsa = excluded.kedaluwarsa
+            WHERE lease.pemilik = excluded.pemilik OR lease.kedaluwarsa < ?
+            """,
+            (nama, pemilik, sekarang + durasi, sekarang)
+        )
+        return conn.execute("SELECT pemilik FROM lease WHERE nama = ?", (nama,)).fetchone()[0] == pemilik
+
+def lepas_lease(nama, pemilik):
+    """Melepas lease `nama` jika masih dipegang `pemilik`, supaya instance lain bisa langsung mengambilnya."""
+    with write_connection() as conn:
+        conn.execute("DELETE FROM lease WHERE nama = ? AND pemilik = ?", (nama, pemilik))
+
+def _buat_trigger_pencatat(conn, instance):
+    # Trigger TEMP hanya berlaku di koneksi ini, jadi hanya tulisan instance ini yang tercatat atas namanya.
+    nama_instance = instance.replace("'", "''")
+    for tabel in ('tugas', 'mata_kuliah'):
+        for aksi in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""
+            CREATE TEMP TRIGGER IF NOT EXISTS pencatat_{tabel}_{aksi.lower()} AFTER {aksi} ON main.{tabel} BEGIN
+                INSERT INTO perubahan (instance, tabel, versi, diubah)
+                VALUES ('{nama_instance}', '{tabel}', 1, CAST(strftime('%s', 'now') AS INTEGER))
+                ON CONFLICT (instance, tabel) DO UPDATE SET versi = versi + 1, diubah = excluded.diubah;
+            END
+            """)
+
+def _hapus_trigger_pencatat(conn):
+    for tabel in ('tugas', 'mata_kuliah'):
+        for aksi in ('insert', 'update', 'delete'):
+            conn.execute(f"DROP TRIGGER IF EXISTS temp.pencatat_{tabel}_{aksi}")
+
+def pulihkan_dari(sumber, default_chat_id=None):
+    """
+    Mengganti seluruh isi database dengan database `sumber` (koneksi sqlite3),
+    lalu menjalankan migrasi untuk snapshot dari versi lama. Trigger pencatat
+    dilepas selama itu (snapshot lama belum punya tabel perubahan) dan dipasang
+    lagi setelah skemanya terbaru. Mengembalikan jumlah migrasi yang diterapkan.
+    """
+    with write_connection() as conn:
+        _hapus_trigger_pencatat(conn)
+        sumber.backup(conn)
+        diterapkan = migrations.jalankan(conn, default_chat_id)
+        if _pencatat is not None:
+            _buat_trigger_pencatat(conn, _pencatat)
+    # Semua cache yang bergantung pada versi matkul harus dibangun ulang.
+    invalidasi_versi_matkul()
+    return diterapkan
+
+def pasang_pencatat_perubahan(instance):
+    """
+    Mulai mencatat setiap tulisan ke tugas dan mata_kuliah dari proses ini
+    di tabel perubahan atas nama `instance`, supaya instance lain tahu kapan
+    cache-nya basi (lihat get_perubahan_luar).
+    """
+    global _pencatat
+    with write_connection() as conn:
+        _pencatat = instance
+        _buat_trigger_pencatat(conn, instance)
+
+def get_perubahan_luar(instance):
+    """Jumlah tulisan instance selain `instance` per tabel, cth: {'tugas': 12, 'mata_kuliah': 3}."""
+    with read_connection() as conn:
+        return {row[0]: row[1] for row in conn.execute(
+            "SELECT tabel, SUM(versi) FROM perubahan WHERE instance != ? GROUP BY tabel", (instance,)
+        )}
+
+def hapus_perubahan_lama(batas):
+    """Menghapus catatan perubahan instance yang tidak menulis apa pun sejak epoch `batas`."""
+    with write_connection() as conn:
+        return conn.execute("DELETE FROM perubahan WHERE diubah < ?", (batas,)).rowcount
 
 if __name__ == '__main__':
 
     print("Menginisialisasi database...")
-    init_db()
-    print("Database 'tugas.db' siap.")
\ No newline at end of file
+    admin_id = os.getenv('ADMIN_ID')
+    init_db(int(admin_id) if admin_id else None)
+    close_all()
+    print(f"Database '{DB_PATH}' siap.")
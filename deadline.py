@@ -0,0 +1,191 @@
+import datetime
+import re
+
+# Bot ini dipakai di Indonesia bagian barat, semua deadline dianggap WIB.
+WIB = datetime.timezone(datetime.timedelta(hours=7), "WIB")
+
+HARI = {
+    'senin': 0, 'selasa': 1, 'rabu': 2, 'kamis': 3,
+    'jumat': 4, "jum'at": 4, 'sabtu': 5, 'minggu': 6, 'ahad': 6,
+}
+NAMA_HARI = ['Sen', 'Sel', 'Rab', 'Kam', 'Jum', 'Sab', 'Min']
+# Penulisan hari yang disimpan di mata_kuliah.hari.
+HARI_LENGKAP = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+BULAN = {
+    'jan': 1, 'januari': 1, 'feb': 2, 'februari': 2, 'mar': 3, 'maret': 3,
+    'apr': 4, 'april': 4, 'mei': 5, 'jun': 6, 'juni': 6, 'jul': 7, 'juli': 7,
+    'agu': 8, 'ags': 8, 'agt': 8, 'agustus': 8, 'sep': 9, 'sept': 9, 'september': 9,
+    'okt': 10, 'oktober': 10, 'nov': 11, 'nop': 11, 'november': 11,
+    'des': 12, 'desember': 12,
+}
+NAMA_BULAN = ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun', 'Jul', 'Agu', 'Sep', 'Okt', 'Nov', 'Des']
+
+JAM_DEFAULT = (23, 59)
+
+_RE_ISO = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+# Titik hanya diterima untuk tanggal lengkap supaya "10.30" tetap dibaca sebagai jam.
+_RE_ANGKA = re.compile(r'\b(\d{1,2})([/-])(\d{1,2})(?:\2(\d{2,4}))?\b|\b(\d{1,2})\.(\d{1,2})\.(\d{2,4})\b')
+_RE_NAMA_BULAN = re.compile(
+    r'\b(\d{1,2})\s+(' + '|'.join(sorted(BULAN, key=len, reverse=True)) + r')\.?(?:\s+(\d{4}))?\b'
+)
+_RE_JAM = re.compile(r'\b(\d{1,2})[:.](\d{2})\b')
+_RE_JAM_BULAT = re.compile(r'\b(?:jam|pukul|pkl\.?)\s*(\d{1,2})\b')
+_RE_WAKTU = re.compile(r'\b(pagi|siang|sore|malam)\b')
+_RE_RENTANG_JAM = re.compile(r'^\s*(\d{1,2})[:.](\d{2})\s*(?:-|–|s/?d|sampai)\s*(\d{1,2})[:.](\d{2})\s*$')
+_RE_HARI_LAGI = re.compile(r'\b(\d{1,3})\s+hari\s+lagi\b')
+_RE_MINGGU_LAGI = re.compile(r'\b(\d{1,3})\s+minggu\s+lagi\b')
+_RE_HARI = re.compile(r"\b(" + '|'.join(HARI) + r")\b(\s+depan)?")
+
+
+def _ambil_jam(teks):
+    """
+    Mencari jam (HH:MM, HH.MM, atau 'jam 9') di teks. Jam 1-12 disertai
+    'sore'/'malam' (atau 'siang' untuk jam 1-5) dibaca sebagai jam 13-23,
+    cth: 'jam 9 malam' = 21:00; 'jam 12 malam' dianggap akhir hari (23:59).
+    """
+    cocok = _RE_JAM.search(teks)
+    if cocok:
+        jam, menit = int(cocok.group(1)), int(cocok.group(2))
+    else:
+        cocok = _RE_JAM_BULAT.search(teks)
+        if not cocok:
+            return None
+        jam, menit = int(cocok.group(1)), 0
+    if jam > 23 or menit > 59:
+        return None
+    waktu = _RE_WAKTU.search(teks)
+    if waktu is not None and 1 <= jam <= 12:
+        if waktu.group(1) == 'malam' and jam == 12:
+            return JAM_DEFAULT
+        if waktu.group(1) in ('sore', 'malam') and jam < 12:
+            jam += 12
+        elif waktu.group(1) == 'siang' and jam < 6:
+            jam += 12
+    return jam, menit
+
+
+def _tanggal_absolut(teks, hari_ini):
+    """Mencari tanggal absolut; mengembalikan (date, sisa_teks) atau (None, teks)."""
+    cocok = _RE_ISO.search(teks)
+    if cocok:
+        tahun, bulan, tanggal = (int(g) for g in cocok.groups())
+    else:
+        cocok = _RE_NAMA_BULAN.search(teks)
+        if cocok:
+            tanggal, bulan = int(cocok.group(1)), BULAN[cocok.group(2)]
+            tahun = int(cocok.group(3)) if cocok.group(3) else None
+        else:
+            cocok = _RE_ANGKA.search(teks)
+            if not cocok:
+                return None, teks
+            if cocok.group(1):
+                tanggal, bulan, tahun = int(cocok.group(1)), int(cocok.group(3)), cocok.group(4)
+            else:
+                tanggal, bulan, tahun = int(cocok.group(5)), int(cocok.group(6)), cocok.group(7)
+            if tahun is not None:
+                tahun = int(tahun) + (2000 if len(tahun) == 2 else 0)
+
+    sisa = teks[:cocok.start()] + ' ' + teks[cocok.end():]
+    try:
+        if tahun is not None:
+            return datetime.date(tahun, bulan, tanggal), sisa
+        # Tanpa tahun: ambil kemunculan berikutnya dari tanggal tersebut.
+        hasil = datetime.date(hari_ini.year, bulan, tanggal)
+        if hasil < hari_ini:
+            hasil = datetime.date(hari_ini.year + 1, bulan, tanggal)
+        return hasil, sisa
+    except ValueError:
+        return None, teks
+
+
+def _tanggal_relatif(teks, hari_ini, jam_lewat=False):
+    """
+    Mencari tanggal relatif ('besok', 'lusa', 'Senin', ...). Nama hari yang
+    sama dengan hari ini berarti minggu depan jika `jam_lewat` (jamnya sudah lewat).
+    """
+    if 'hari ini' in teks or 'malam ini' in teks:
+        return hari_ini
+    if 'lusa' in teks:
+        return hari_ini + datetime.timedelta(days=2)
+    if 'besok' in teks:
+        return hari_ini + datetime.timedelta(days=1)
+    if 'minggu depan' in teks:
+        return hari_ini + datetime.timedelta(days=7)
+    cocok = _RE_HARI_LAGI.search(teks)
+    if cocok:
+        return hari_ini + datetime.timedelta(days=int(cocok.group(1)))
+    # Sebelum nama hari: "minggu" di "2 minggu lagi" bukan hari Minggu.
+    cocok = _RE_MINGGU_LAGI.search(teks)
+    if cocok:
+        return hari_ini + datetime.timedelta(weeks=int(cocok.group(1)))
+    cocok = _RE_HARI.search(teks)
+    if cocok:
+        if cocok.group(2):
+            # "Jumat depan": Jumat di minggu berikutnya (minggu dimulai Senin).
+            return hari_ini + datetime.timedelta(days=7 - hari_ini.weekday() + HARI[cocok.group(1)])
+        selisih = (HARI[cocok.group(1)] - hari_ini.weekday()) % 7
+        if selisih == 0 and jam_lewat:
+            selisih = 7
+        return hari_ini + datetime.timedelta(days=selisih)
+    return None
+
+
+def parse_deadline(teks, now=None, izinkan_relatif=True):
+    """
+    Mengubah deadline bahasa Indonesia menjadi epoch (detik, UTC).
+
+    Mendukung tanggal absolut ("30/10/2025", "15 Okt", "2025-10-30") dan
+    relatif ("Besok 23:59", "Senin", "Jumat depan", "lusa jam 9 malam", "3 hari lagi",
+    "2 minggu lagi").
+    Tanpa jam, deadline dianggap pukul 23:59 WIB. Mengembalikan None jika
+    teks tidak dikenali (atau relatif padahal izinkan_relatif=False).
+    """
+    now = now or datetime.datetime.now(WIB)
+    hari_ini = now.astimezone(WIB).date()
+    teks = teks.lower().strip()
+
+    tanggal, sisa = _tanggal_absolut(teks, hari_ini)
+    jam = _ambil_jam(sisa)
+    if tanggal is None:
+        if not izinkan_relatif:
+            return None
+        jam_lewat = datetime.time(*(jam or JAM_DEFAULT)) <= now.astimezone(WIB).time()
+        tanggal = _tanggal_relatif(sisa, hari_ini, jam_lewat)
+        if tanggal is None:
+            if jam is None:
+                return None
+            # Hanya jam: hari ini, atau besok jika jamnya sudah lewat.
+            tanggal = hari_ini
+            if jam_lewat:
+                tanggal += datetime.timedelta(days=1)
+
+    jam, menit = jam or JAM_DEFAULT
+    hasil = datetime.datetime.combine(tanggal, datetime.time(jam, menit), tzinfo=WIB)
+    return int(hasil.timestamp())
+
+
+def parse_rentang_jam(teks):
+    """
+    Membaca rentang jam kuliah seperti "13:30 - 16:00" atau "08.00-09.40".
+    Mengembalikan (mulai, selesai) dalam menit sejak 00:00, atau None jika tidak valid.
+    """
+    cocok = _RE_RENTANG_JAM.match(teks.lower())
+    if not cocok:
+        return None
+    j1, m1, j2, m2 = (int(g) for g in cocok.groups())
+    if j1 > 23 or j2 > 23 or m1 > 59 or m2 > 59:
+        return None
+    mulai, selesai = j1 * 60 + m1, j2 * 60 + m2
+    if mulai >= selesai:
+        return None
+    return mulai, selesai
+
+
+def format_deadline(deadline_ts):
+    """Menampilkan epoch deadline sebagai teks WIB, cth: 'Sen, 15 Okt 2025 23:59'."""
+    waktu = datetime.datetime.fromtimestamp(deadline_ts, WIB)
+    return (
+        f"{NAMA_HARI[waktu.weekday()]}, {waktu.day} {NAMA_BULAN[waktu.month - 1]} "
+        f"{waktu.year} {waktu:%H:%M}"
+    )
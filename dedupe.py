@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+
+from telegram.error import BadRequest
+
+import metrics
+
+# Tekanan ulang tombol yang sama di pesan yang sama dalam selang ini dianggap duplikat.
+TTL_DETIK = 10.0
+# Tombol yang sama (callback_data sama) dari user yang sama dalam selang ini ditahan, di pesan mana pun.
+DEBOUNCE_DETIK = 0.5
+MAKS_ENTRI = 2048
+
+JAWABAN_DEBOUNCE = ("⏳ Sebentar, tombol ini baru saja ditekan.", False)
+
+
+class CallbackDedupe:
+    """
+    Penyaring tekanan tombol inline ganda (double-tap, redelivery Telegram).
+
+    Untuk setiap pesan disimpan callback_data terakhir yang diproses beserta
+    jawabannya. Tekanan ulang dengan data yang sama dalam TTL_DETIK dijawab
+    dari memori tanpa menyentuh database atau mengedit pesan. Karena hanya
+    data terakhir per pesan yang diingat, tombol toggle (cth: kotak centang
+    mode pilih) yang kembali ke data sebelumnya tetap diproses normal.
+
+    Selain itu, callback_data yang sama dari user yang sama dalam
+    DEBOUNCE_DETIK dijawab JAWABAN_DEBOUNCE, walaupun dari pesan lain (cth:
+    salinan daftar yang sama). Tombol lain dari user itu tetap diproses.
+
+    Kedua tabel berupa LRU berukuran MAKS_ENTRI. Pemeriksaan tidak butuh
+    lock: update dari chat yang sama diproses berurutan oleh Application.
+    """
+
+    def __init__(self, ttl=TTL_DETIK, debounce=DEBOUNCE_DETIK, maks=MAKS_ENTRI):
+        self.ttl = ttl
+        self.debounce = debounce
+        self.maks = maks
+        # kunci pesan -> [kedaluwarsa, callback_data, (teks, show_alert) atau None]
+        self._pesan = OrderedDict()
+        # (user_id, callback_data) -> waktu tekanan terakhir yang diproses
+        self._user = OrderedDict()
+
+    @staticmethod
+    def _kunci(query):
+        if query.message is not None:
+            return (query.message.chat.id, query.message.message_id)
+        if query.inline_message_id is not None:
+            return ('inline', query.inline_message_id)
+        return ('cb', query.id)
+
+    def _simpan(self, tabel, kunci, nilai) -> None:
+        tabel[kunci] = nilai
+        tabel.move_to_end(kunci)
+        while len(tabel) > self.maks:
+            tabel.popitem(last=False)
+
+    def cek(self, query):
+        """
+        Mengembalikan jawaban (teks, show_alert) jika tekanan ini duplikat atau
+        terlalu cepat; None jika tekanan ini harus diproses.
+        """
+        now = time.monotonic()
+        kunci = self._kunci(query)
+        entri = self._pesan.get(kunci)
+        if entri is not None and entri[0] > now and entri[1] == query.data:
+            metrics.hitung('callback_dedupe', 'duplikat')
+            return entri[2] or (None, False)
+
+        kunci_user = (query.from_user.id, query.data)
+        terakhir = self._user.get(kunci_user)
+        if terakhir is not None and now - terakhir < self.debounce:
+            metrics.hitung('callback_dedupe', 'debounce')
+            return JAWABAN_DEBOUNCE
+
+        self._simpan(self._pesan, kunci, [now + self.ttl, query.data, None])
+        self._simpan(self._user, kunci_user, now)
+        return None
+
+    async def jawab(self, query, teks=None, show_alert=False) -> None:
+        """query.answer() yang jawabannya diingat untuk tekanan ulang."""
+        entri = self._pesan.get(self._kunci(query))
+        if entri is not None and entri[1] == query.data:
+            entri[2] = (teks, show_alert)
+        await query.answer(teks, show_alert=show_alert)
+
+    def lupakan(self, query) -> None:
+        """Menghapus catatan tekanan ini (cth: saat gagal) supaya tekanan berikutnya diproses ulang."""
+        entri = self._pesan.get(self._kunci(query))
+        if entri is not None and entri[1] == query.data:
+            del self._pesan[self._kunci(query)]
+        self._user.pop((query.from_user.id, query.data), None)
+
+
+async def edit_pesan(query, *args, **kwargs) -> None:
+    """query.edit_message_text() yang mengabaikan error "message is not modified"."""
+    try:
+        await query.edit_message_text(*args, **kwargs)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
@@ -0,0 +1,118 @@
+import functools
+import logging
+import os
+import socket
+import time
+
+import async_db as adb
+
+logger = logging.getLogger(__name__)
+
+# Lama lease berlaku tanpa diperpanjang; pemimpin memperpanjangnya tiap LEASE_DETIK / 3.
+LEASE_DETIK = int(os.getenv('LEASE_DETIK', '30'))
+INSTANCE_ID = os.getenv('INSTANCE_ID') or f"{socket.gethostname()}-{os.getpid()}"
+JOB_NAME = "lease"
+# Catatan perubahan instance yang sudah lama tidak menulis dibuang pemimpin (sekali per jam).
+SIMPAN_PERUBAHAN_DETIK = 7 * 24 * 3600
+JEDA_RAPIKAN = 3600
+
+
+class LeaderLease:
+    """
+    Koordinasi beberapa instance bot yang memakai database yang sama.
+
+    Setiap instance melayani update, tetapi hanya pemegang lease (satu baris
+    di tabel lease yang diperpanjang berkala) yang menjalankan job terjadwal.
+    Jika pemimpin mati, lease-nya kedaluwarsa setelah LEASE_DETIK dan instance
+    lain mengambil alih pada detak berikutnya. `saat_terpilih(job_queue)` dan
+    `saat_lepas(job_queue)` dipanggil ketika status pemimpin instance ini berubah.
+
+    Di detak yang sama, tulisan instance lain ke tugas/mata_kuliah (tabel
+    perubahan) dideteksi dan `saat_data_berubah(tabel)` dipanggil supaya
+    cache di memori dimuat ulang.
+    """
+
+    def __init__(self, saat_terpilih, saat_lepas, saat_data_berubah, nama='jadwal',
+                 durasi=LEASE_DETIK, pemilik=INSTANCE_ID):
+        self._saat_terpilih = saat_terpilih
+        self._saat_lepas = saat_lepas
+        self._saat_data_berubah = saat_data_berubah
+        self.nama = nama
+        self.durasi = durasi
+        self.pemilik = pemilik
+        self._job_queue = None
+        self._pemimpin = False
+        self._berlaku_sampai = 0
+        self._perubahan = None
+        self._rapikan_berikutnya = 0
+
+    @property
+    def pemimpin(self) -> bool:
+        """True jika instance ini memegang lease yang belum kedaluwarsa."""
+        return self._pemimpin and time.time() < self._berlaku_sampai
+
+    async def mulai(self, job_queue) -> None:
+        """Detak pertama langsung dijalankan, jadi instance tunggal sudah jadi pemimpin sebelum job pertama."""
+        self._job_queue = job_queue
+        await adb.pasang_pencatat_perubahan(self.pemilik)
+        self._perubahan = await adb.get_perubahan_luar(self.pemilik)
+        await self._detak()
+        job_queue.run_repeating(
+            self._detak_job, interval=self.durasi / 3, first=self.durasi / 3, name=JOB_NAME
+        )
+        logger.info(f"Lease '{self.nama}': instance {self.pemilik}, {'pemimpin' if self.pemimpin else 'pengikut'}.")
+
+    async def berhenti(self) -> None:
+        """Melepas lease saat bot berhenti supaya instance lain tidak perlu menunggu kedaluwarsa."""
+        if self._pemimpin:
+            self._pemimpin = False
+            await adb.lepas_lease(self.nama, self.pemilik)
+
+    async def _detak_job(self, context) -> None:
+        await self._detak()
+
+    async def _detak(self) -> None:
+        mulai = time.time()
+        try:
+            dapat = await adb.ambil_lease(self.nama, self.pemilik, self.durasi)
+        except Exception as e:
+            # Database sibuk/terkunci: tetap pemimpin selama lease yang sudah ada masih berlaku.
+            logger.warning(f"Lease '{self.nama}': gagal diperbarui: {e}")
+            dapat = self.pemimpin
+        else:
+            if dapat:
+                self._berlaku_sampai = mulai + self.durasi
+
+        if dapat and not self._pemimpin:
+            self._pemimpin = True
+            logger.info(f"Lease '{self.nama}': instance {self.pemilik} menjadi pemimpin.")
+            await self._saat_terpilih(self._job_queue)
+        elif not dapat and self._pemimpin:
+            self._pemimpin = False
+            logger.warning(f"Lease '{self.nama}': instance {self.pemilik} bukan lagi pemimpin.")
+            await self._saat_lepas(self._job_queue)
+
+        await self._cek_perubahan()
+        if self._pemimpin and mulai >= self._rapikan_berikutnya:
+            self._rapikan_berikutnya = mulai + JEDA_RAPIKAN
+            await adb.hapus_perubahan_lama(int(mulai) - SIMPAN_PERUBAHAN_DETIK)
+
+    async def _cek_perubahan(self) -> None:
+        try:
+            perubahan = await adb.get_perubahan_luar(self.pemilik)
+        except Exception as e:
+            logger.warning(f"Lease '{self.nama}': gagal membaca perubahan: {e}")
+            return
+        lama, self._perubahan = self._perubahan, perubahan
+        for tabel in sorted(set(lama) | set(perubahan)):
+            if lama.get(tabel) != perubahan.get(tabel):
+                await self._saat_data_berubah(tabel)
+
+    def khusus_pemimpin(self, callback):
+        """Membungkus callback job supaya hanya dijalankan oleh pemimpin."""
+        @functools.wraps(callback)
+        async def bungkus(context):
+            if not self.pemimpin:
+                return None
+            return await callback(context)
+        return bungkus
@@ -0,0 +1,280 @@
+import asyncio
+import bisect
+import functools
+import inspect
+import logging
+import threading
+import time
+
+from telegram.ext import ApplicationHandlerStop, ConversationHandler
+from telegram.request import BaseRequest
+
+logger = logging.getLogger(__name__)
+
+# Batas atas bucket histogram latensi (detik).
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "tugasbot"
+
+_histogram = {}
+_counter = {}
+_lock = threading.Lock()
+_mulai = time.monotonic()
+
+
+class Histogram:
+    """Histogram latensi dengan bucket tetap; aman dipakai dari thread executor DB."""
+
+    __slots__ = ('counts', 'total', 'maks', '_lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.maks = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, detik: float) -> None:
+        i = bisect.bisect_left(BUCKETS, detik)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += detik
+            if detik > self.maks:
+                self.maks = detik
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def persentil(self, p: float) -> float:
+        """Perkiraan persentil: batas atas bucket tempat persentil tersebut jatuh."""
+        n = self.count
+        if not n:
+            return 0.0
+        target = p / 100 * n
+        kumulatif = 0
+        for i, jumlah in enumerate(self.counts):
+            kumulatif += jumlah
+            if kumulatif >= target:
+                return min(BUCKETS[i], self.maks) if i < len(BUCKETS) else self.maks
+        return self.maks
+
+
+def histogram(jenis: str, nama: str) -> Histogram:
+    """Histogram untuk (jenis, nama), cth: ('handler', 'cek_tugas') atau ('db', 'get_tugas')."""
+    key = (jenis, nama)
+    h = _histogram.get(key)
+    if h is None:
+        with _lock:
+            h = _histogram.setdefault(key, Histogram())
+    return h
+
+
+def hitung(jenis: str, nama: str, n: int = 1) -> None:
+    """Menambah counter (jenis, nama), cth: ('bot_api_error', 'sendMessage')."""
+    key = (jenis, nama)
+    with _lock:
+        _counter[key] = _counter.get(key, 0) + n
+
+
+class timer:
+    """Context manager pengukur waktu: `with metrics.timer('job', 'backup'): ...`."""
+
+    __slots__ = ('_histogram', '_mulai')
+
+    def __init__(self, jenis: str, nama: str):
+        self._histogram = histogram(jenis, nama)
+
+    def __enter__(self):
+        self._mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._mulai)
+        return False
+
+
+def bungkus(jenis: str, nama: str, func):
+    """Membungkus fungsi (sinkron atau async) supaya waktu dan error-nya tercatat."""
+    if getattr(func, '__terukur__', False):
+        return func
+    h = histogram(jenis, nama)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            mulai = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except ApplicationHandlerStop:
+                # Alur normal (cth: update ditolak ratelimit), bukan error.
+                raise
+            except BaseException:
+                hitung(f"{jenis}_error", nama)
+                raise
+            finally:
+                h.observe(time.perf_counter() - mulai)
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            mulai = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except ApplicationHandlerStop:
+                raise
+            except BaseException:
+                hitung(f"{jenis}_error", nama)
+                raise
+            finally:
+                h.observe(time.perf_counter() - mulai)
+
+    wrapper.__terukur__ = True
+    return wrapper
+
+
+def terukur(jenis: str, nama: str = None):
+    """Dekorator versi bungkus(); nama default adalah nama fungsinya."""
+    def dekorator(func):
+        return bungkus(jenis, nama or func.__name__, func)
+    return dekorator
+
+
+def instrumentasi_modul(modul, jenis: str, kecuali=()) -> None:
+    """
+    Mengganti semua fungsi publik di `modul` dengan versi terukur. Pemanggil
+    yang mengakses lewat atribut modul (cth: db.get_tugas) ikut terukur.
+    Generator dilewati: yang terukur hanya pembuatan objeknya, bukan query-nya.
+    """
+    for nama, obj in list(vars(modul).items()):
+        if (nama.startswith('_') or nama in kecuali or not inspect.isfunction(obj)
+                or inspect.isgeneratorfunction(obj) or obj.__module__ != modul.__name__):
+            continue
+        setattr(modul, nama, bungkus(jenis, nama, obj))
+
+
+def _instrumentasi_handler(handler) -> None:
+    if isinstance(handler, ConversationHandler):
+        for anak in handler.entry_points + handler.fallbacks:
+            _instrumentasi_handler(anak)
+        for daftar in handler.states.values():
+            for anak in daftar:
+                _instrumentasi_handler(anak)
+    elif getattr(handler, 'callback', None) is not None:
+        handler.callback = bungkus('handler', handler.callback.__name__, handler.callback)
+
+
+def instrumentasi_handlers(application) -> None:
+    """Membungkus callback semua handler yang sudah terdaftar (termasuk isi ConversationHandler)."""
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            _instrumentasi_handler(handler)
+
+
+class RequestTerukur(BaseRequest):
+    """Pembungkus BaseRequest yang mencatat jumlah, latensi, dan error setiap panggilan Bot API."""
+
+    def __init__(self, request: BaseRequest):
+        self._request = request
+
+    @property
+    def read_timeout(self):
+        return self._request.read_timeout
+
+    async def initialize(self) -> None:
+        await self._request.initialize()
+
+    async def shutdown(self) -> None:
+        await self._request.shutdown()
+
+    async def do_request(self, url, method, request_data=None, read_timeout=BaseRequest.DEFAULT_NONE,
+                         write_timeout=BaseRequest.DEFAULT_NONE, connect_timeout=BaseRequest.DEFAULT_NONE,
+                         pool_timeout=BaseRequest.DEFAULT_NONE):
+        endpoint = url.rsplit('/', 1)[-1]
+        mulai = time.perf_counter()
+        try:
+            kode, payload = await self._request.do_request(
+                url, method, request_data=request_data, read_timeout=read_timeout,
+                write_timeout=write_timeout, connect_timeout=connect_timeout, pool_timeout=pool_timeout,
+            )
+        except BaseException:
+            hitung('bot_api_error', endpoint)
+            raise
+        finally:
+            histogram('bot_api', endpoint).observe(time.perf_counter() - mulai)
+        if kode >= 400:
+            hitung('bot_api_error', endpoint)
+        return kode, payload
+
+
+# --- Tampilan ---
+
+def _ms(detik: float) -> str:
+    return f"{detik * 1000:.1f}"
+
+
+def format_ringkas(maks_baris: int = 12) -> str:
+    """Ringkasan untuk /stats: per jenis, baris dengan total waktu terbesar lebih dulu."""
+    uptime = int(time.monotonic() - _mulai)
+    baris = [f"Uptime {uptime // 3600}j {uptime % 3600 // 60}m"]
+    for jenis, judul in (('handler', 'Handler'), ('db', 'Database'), ('bot_api', 'Bot API'), ('job', 'Job')):
+        data = [(nama, h) for (j, nama), h in list(_histogram.items()) if j == jenis and h.count]
+        if not data:
+            continue
+        data.sort(key=lambda item: item[1].total, reverse=True)
+        baris.append("")
+        baris.append(f"{judul:<22}{'n':>6}{'err':>5}{'p50':>7}{'p95':>7}{'p99':>7}{'tot s':>7}")
+        for nama, h in data[:maks_baris]:
+            error = _counter.get((f"{jenis}_error", nama), 0)
+            baris.append(
+                f"{nama[:22]:<22}{h.count:>6}{error:>5}{_ms(h.persentil(50)):>7}"
+                f"{_ms(h.persentil(95)):>7}{_ms(h.persentil(99)):>7}{h.total:>7.1f}"
+            )
+    return "\n".join(baris)
+
+
+def format_prometheus() -> str:
+    """Semua metrik dalam format teks Prometheus (untuk endpoint scrape)."""
+    baris = [f"{PREFIX}_uptime_seconds {time.monotonic() - _mulai:.0f}"]
+    per_jenis = {}
+    for (jenis, nama), h in sorted(list(_histogram.items())):
+        per_jenis.setdefault(jenis, []).append((nama, h))
+    for jenis, data in per_jenis.items():
+        metrik = f"{PREFIX}_{jenis}_seconds"
+        baris.append(f"# TYPE {metrik} histogram")
+        for nama, h in data:
+            kumulatif = 0
+            for batas, jumlah in zip(BUCKETS, h.counts):
+                kumulatif += jumlah
+                baris.append(f'{metrik}_bucket{{name="{nama}",le="{batas}"}} {kumulatif}')
+            baris.append(f'{metrik}_bucket{{name="{nama}",le="+Inf"}} {h.count}')
+            baris.append(f'{metrik}_sum{{name="{nama}"}} {h.total:.6f}')
+            baris.append(f'{metrik}_count{{name="{nama}"}} {h.count}')
+    per_jenis = {}
+    for (jenis, nama), n in sorted(list(_counter.items())):
+        per_jenis.setdefault(jenis, []).append((nama, n))
+    for jenis, data in per_jenis.items():
+        metrik = f"{PREFIX}_{jenis}s_total"
+        baris.append(f"# TYPE {metrik} counter")
+        for nama, n in data:
+            baris.append(f'{metrik}{{name="{nama}"}} {n}')
+    return "\n".join(baris) + "\n"
+
+
+async def _layani(reader, writer) -> None:
+    try:
+        await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+        isi = format_prometheus().encode()
+        writer.write(
+            b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            + f"Content-Length: {len(isi)}\r\n\r\n".encode() + isi
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def mulai_server(port: int, host: str = "127.0.0.1"):
+    """Membuka endpoint HTTP lokal yang mengembalikan format_prometheus() untuk setiap request."""
+    server = await asyncio.start_server(_layani, host, port)
+    logger.info(f"Metrik tersedia di http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,330 @@
+import logging
+import time
+
+from deadline import parse_deadline
+
+logger = logging.getLogger(__name__)
+
+# Matkul contoh untuk database baru (masuk ke chat pemilik bot).
+MATKUL_CONTOH = [
+    ('Kalkulus', 'Senin', '13:30 - 16:00', 'G3E'),
+    ('Bahasa Indonesia', 'Selasa', '08:00 - 09:40', 'G3E'),
+    ('Sistem Basis Data', 'Selasa', '10:45 - 13:15', 'Lab Programming'),
+    ('Emerging Technologies & Digital Transformation', 'Selasa', '13:30 - 16:00', 'G1A'),
+    ('Logika Informatika', 'Rabu', '08:00 - 10:30', 'G3A'),
+    ('Algoritma Pemrograman', 'Rabu', '10:45 - 13:15', 'Lab Programming'),
+    ('Sistem Operasi', 'Rabu', '16:00 - 18:00', 'Lab Programming'),
+]
+
+
+# Setiap migrasi harus aman dijalankan pada database lama (user_version 0)
+# yang mungkin sudah punya sebagian skemanya dari init_db versi sebelum ini.
+
+def _tabel_dasar(cursor, default_chat_id):
+    baru = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'mata_kuliah'").fetchone() is None
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS mata_kuliah (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nama TEXT NOT NULL,
+        hari TEXT NOT NULL,
+        jam TEXT NOT NULL,
+        ruangan TEXT NOT NULL,
+        chat_id INTEGER NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tugas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        matkul_nama TEXT NOT NULL,
+        deskripsi TEXT NOT NULL,
+        deadline TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        deadline_ts INTEGER,
+        chat_id INTEGER NOT NULL,
+        selesai_at INTEGER
+    )
+    ''')
+    if baru and default_chat_id is not None:
+        cursor.executemany(
+            "INSERT INTO mata_kuliah (nama, hari, jam, ruangan, chat_id) VALUES (?, ?, ?, ?, ?)",
+            [matkul + (default_chat_id,) for matkul in MATKUL_CONTOH]
+        )
+        logger.info(f"{len(MATKUL_CONTOH)} mata kuliah contoh ditambahkan.")
+
+
+def _kolom(cursor, tabel):
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({tabel})")}
+
+
+def _deadline_ts(cursor, default_chat_id):
+    if 'deadline_ts' in _kolom(cursor, 'tugas'):
+        return
+    cursor.execute("ALTER TABLE tugas ADD COLUMN deadline_ts INTEGER")
+    # Hanya deadline absolut yang diisi ulang: 'Besok' yang ditulis pada
+    # hari yang tidak diketahui tidak bisa ditafsirkan dengan benar.
+    rows = cursor.execute("SELECT id, deadline FROM tugas").fetchall()
+    cursor.executemany(
+        "UPDATE tugas SET deadline_ts = ? WHERE id = ?",
+        [(parse_deadline(deadline, izinkan_relatif=False), id_) for id_, deadline in rows]
+    )
+
+
+def _chat_id(cursor, default_chat_id):
+    """Kolom chat_id; data dari versi sebelum mendukung banyak chat diberikan ke default_chat_id."""
+    for tabel in ('mata_kuliah', 'tugas'):
+        if 'chat_id' in _kolom(cursor, tabel):
+            continue
+        cursor.execute(f"ALTER TABLE {tabel} ADD COLUMN chat_id INTEGER NOT NULL DEFAULT 0")
+        if default_chat_id is not None:
+            cursor.execute(f"UPDATE {tabel} SET chat_id = ?", (default_chat_id,))
+
+
+def _index_dasar(cursor, default_chat_id):
+    # (status, deadline_ts) untuk pengingat lintas chat, sisanya untuk query per chat.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tugas_status_deadline ON tugas(status, deadline_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tugas_chat_status_deadline ON tugas(chat_id, status, deadline_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_matkul_chat_nama ON mata_kuliah(chat_id, nama)")
+
+
+def _persistence(cursor, default_chat_id):
+    # State ConversationHandler dan user_data/chat_data (lihat persistence.py).
+    # Baris hanya ada selama percakapan/datanya tidak kosong.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS percakapan (
+        nama TEXT NOT NULL,
+        kunci TEXT NOT NULL,
+        state,
+        PRIMARY KEY (nama, kunci)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE TABLE IF NOT EXISTS user_data (user_id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS chat_data (chat_id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+
+
+def _fts(cursor, default_chat_id):
+    """
+    Index FTS5 (external content) atas deskripsi dan matkul_nama tugas, dijaga
+    tetap sinkron oleh trigger. Saat pertama dibuat, isinya dibangun dari tabel tugas.
+    """
+    ada = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'tugas_fts'").fetchone()
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS tugas_fts USING fts5(
+        deskripsi, matkul_nama, content='tugas', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''')
+    # Perubahan status (paling sering) tidak menyentuh index.
+    for trigger in (
+        """CREATE TRIGGER IF NOT EXISTS tugas_fts_ai AFTER INSERT ON tugas BEGIN
+            INSERT INTO tugas_fts (rowid, deskripsi, matkul_nama) VALUES (new.id, new.deskripsi, new.matkul_nama);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tugas_fts_ad AFTER DELETE ON tugas BEGIN
+            INSERT INTO tugas_fts (tugas_fts, rowid, deskripsi, matkul_nama)
+            VALUES ('delete', old.id, old.deskripsi, old.matkul_nama);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tugas_fts_au AFTER UPDATE OF deskripsi, matkul_nama ON tugas BEGIN
+            INSERT INTO tugas_fts (tugas_fts, rowid, deskripsi, matkul_nama)
+            VALUES ('delete', old.id, old.deskripsi, old.matkul_nama);
+            INSERT INTO tugas_fts (rowid, deskripsi, matkul_nama) VALUES (new.id, new.deskripsi, new.matkul_nama);
+        END""",
+    ):
+        cursor.execute(trigger)
+    if not ada:
+        cursor.execute("INSERT INTO tugas_fts (tugas_fts) VALUES ('rebuild')")
+
+
+def _anggota_chat(cursor, default_chat_id):
+    # Chat grup yang pernah dipakai seorang user; menentukan tugas mana yang boleh muncul di inline query.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS anggota_chat (
+        user_id INTEGER NOT NULL,
+        chat_id INTEGER NOT NULL,
+        PRIMARY KEY (user_id, chat_id)
+    ) WITHOUT ROWID
+    ''')
+
+
+def _arsip(cursor, default_chat_id):
+    if 'selesai_at' not in _kolom(cursor, 'tugas'):
+        cursor.execute("ALTER TABLE tugas ADD COLUMN selesai_at INTEGER")
+        # Waktu selesai tugas lama tidak diketahui; retensi arsip dihitung mulai sekarang.
+        cursor.execute("UPDATE tugas SET selesai_at = ? WHERE status = 'done'", (int(time.time()),))
+    # Tugas selesai/kedaluwarsa yang sudah lewat masa retensi dipindah ke sini (lihat arsipkan_tugas).
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tugas_arsip (
+        id INTEGER PRIMARY KEY,
+        matkul_nama TEXT NOT NULL,
+        deskripsi TEXT NOT NULL,
+        deadline TEXT NOT NULL,
+        status TEXT NOT NULL,
+        deadline_ts INTEGER,
+        chat_id INTEGER NOT NULL,
+        selesai_at INTEGER,
+        arsip_at INTEGER NOT NULL
+    )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_arsip_chat_status_selesai ON tugas_arsip(chat_id, status, selesai_at)"
+    )
+
+
+def _auto_vacuum(cursor, default_chat_id):
+    """
+    auto_vacuum=INCREMENTAL supaya ruang bekas tugas yang diarsipkan bisa
+    dikembalikan sedikit demi sedikit (rawat_database). Database lama perlu
+    VACUUM penuh sekali agar pengaturan ini berlaku.
+    """
+    if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+
+
+def _index_selesai(cursor, default_chat_id):
+    # /tugas_selesai mengurutkan per chat menurut selesai_at; arsipkan_tugas mencari status+selesai_at lintas chat.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tugas_chat_status_selesai ON tugas(chat_id, status, selesai_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tugas_status_selesai ON tugas(status, selesai_at)")
+
+
+def _koordinasi(cursor, default_chat_id):
+    # Lease job terjadwal dan penghitung perubahan per instance (lihat lease.py).
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS lease (
+        nama TEXT PRIMARY KEY,
+        pemilik TEXT NOT NULL,
+        kedaluwarsa REAL NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS perubahan (
+        instance TEXT NOT NULL,
+        tabel TEXT NOT NULL,
+        versi INTEGER NOT NULL,
+        diubah INTEGER NOT NULL,
+        PRIMARY KEY (instance, tabel)
+    ) WITHOUT ROWID
+    ''')
+
+
+def _fts_per_chat(cursor, default_chat_id):
+    """
+    Mengganti tugas_fts dengan tugas_cari: kolom `chat` berisi token chat
+    (lihat database.token_chat) supaya filter chat ikut di dalam MATCH, dan
+    tugas yang diarsipkan tetap terindeks (id tugas tetap sama di arsip).
+    """
+    for trigger in ('tugas_fts_ai', 'tugas_fts_ad', 'tugas_fts_au'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS tugas_fts")
+    ada = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'tugas_cari'").fetchone()
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS tugas_cari USING fts5(
+        chat, deskripsi, matkul_nama, tokenize='unicode61 remove_diacritics 2'
+    )
+    ''')
+    token = "'c' || replace({}.chat_id, '-', 'n')"
+    for tabel, akhiran in (('tugas', ''), ('tugas_arsip', '_arsip')):
+        for trigger in (
+            f"""CREATE TRIGGER IF NOT EXISTS tugas_cari_ai{akhiran} AFTER INSERT ON {tabel} BEGIN
+                INSERT INTO tugas_cari (rowid, chat, deskripsi, matkul_nama)
+                VALUES (new.id, {token.format('new')}, new.deskripsi, new.matkul_nama);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS tugas_cari_ad{akhiran} AFTER DELETE ON {tabel} BEGIN
+                DELETE FROM tugas_cari WHERE rowid = old.id;
+            END""",
+            # Perubahan status (paling sering) tidak menyentuh index.
+            f"""CREATE TRIGGER IF NOT EXISTS tugas_cari_au{akhiran}
+            AFTER UPDATE OF deskripsi, matkul_nama, chat_id ON {tabel} BEGIN
+                UPDATE tugas_cari SET chat = {token.format('new')}, deskripsi = new.deskripsi,
+                    matkul_nama = new.matkul_nama
+                WHERE rowid = old.id;
+            END""",
+        ):
+            cursor.execute(trigger)
+    if not ada:
+        for tabel in ('tugas', 'tugas_arsip'):
+            cursor.execute(
+                "INSERT INTO tugas_cari (rowid, chat, deskripsi, matkul_nama) "
+                f"SELECT id, {token.format(tabel)}, deskripsi, matkul_nama FROM {tabel}"
+            )
+
+
+# (versi, nama, fungsi, dalam_transaksi). Urutan tidak boleh diubah; migrasi baru selalu ditambahkan di akhir.
+MIGRASI = (
+    (1, "tabel dasar", _tabel_dasar, True),
+    (2, "deadline_ts", _deadline_ts, True),
+    (3, "chat_id", _chat_id, True),
+    (4, "index tugas dan matkul", _index_dasar, True),
+    (5, "tabel persistence", _persistence, True),
+    (6, "FTS tugas", _fts, True),
+    (7, "anggota_chat", _anggota_chat, True),
+    (8, "arsip tugas", _arsip, True),
+    # VACUUM tidak bisa dijalankan di dalam transaksi.
+    (9, "auto_vacuum incremental", _auto_vacuum, False),
+    (10, "index tugas selesai", _index_selesai, True),
+    (11, "lease dan perubahan antarinstance", _koordinasi, True),
+    (12, "FTS per chat termasuk arsip", _fts_per_chat, True),
+)
+VERSI_TERBARU = MIGRASI[-1][0]
+# Instance lain mungkin sedang bermigrasi (termasuk VACUUM); tunggu lebih lama dari busy_timeout biasa.
+BUSY_TIMEOUT_MS = 60000
+
+
+def _versi(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def jalankan(conn, default_chat_id=None) -> int:
+    """
+    Menerapkan migrasi yang versinya di atas PRAGMA user_version, satu
+    transaksi per migrasi (user_version ikut di-commit bersama perubahannya).
+    Jika skema sudah terbaru, tidak ada DDL sama sekali. Mengembalikan jumlah
+    migrasi yang diterapkan.
+
+    Aman dijalankan beberapa instance sekaligus: setiap langkah memegang kunci
+    tulis (BEGIN IMMEDIATE) sebelum membaca ulang user_version, jadi instance
+    yang kalah cepat menunggu lalu melewati langkah yang sudah diterapkan.
+    """
+    versi = _versi(conn)
+    if versi >= VERSI_TERBARU:
+        return 0
+
+    mulai = time.perf_counter()
+    diterapkan = 0
+    busy_lama = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    try:
+        for nomor, nama, fungsi, dalam_transaksi in MIGRASI:
+            if nomor <= versi:
+                continue
+            cursor = conn.cursor()
+            if dalam_transaksi:
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    if _versi(cursor) >= nomor:
+                        conn.rollback()
+                        continue
+                    fungsi(cursor, default_chat_id)
+                    cursor.execute(f"PRAGMA user_version = {nomor}")
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+            else:
+                if _versi(cursor) >= nomor:
+                    continue
+                fungsi(cursor, default_chat_id)
+                # Versi hanya dinaikkan, jangan sampai menimpa versi lebih baru dari instance lain.
+                cursor.execute("BEGIN IMMEDIATE")
+                if _versi(cursor) < nomor:
+                    cursor.execute(f"PRAGMA user_version = {nomor}")
+                conn.commit()
+            logger.info(f"Migrasi {nomor} ({nama}) diterapkan.")
+            diterapkan += 1
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {busy_lama}")
+
+    if diterapkan:
+        conn.execute("ANALYZE")
+        logger.info(
+            f"Skema database v{versi} -> v{VERSI_TERBARU} dalam {(time.perf_counter() - mulai) * 1000:.0f} ms."
+        )
+    return diterapkan
@@ -0,0 +1,158 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import time
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Jalur prioritas: balasan interaktif selalu didahulukan dari siaran pengingat.
+# Dipakai lewat rate_limit_args, cth: bot.send_message(..., rate_limit_args={'prioritas': SIARAN}).
+INTERAKTIF = 0
+SIARAN = 1
+
+# Batas Bot API: ~30 pesan/detik total, 1 pesan/detik per chat pribadi,
+# 20 pesan/menit per grup.
+GLOBAL_RATE = 30
+PRIVATE_RATE = 1
+GROUP_RATE = 20 / 60
+CHAT_BURST = 3
+MAX_ANTRIAN = 10000
+MAX_RETRY = 10
+
+
+class TokenBucket:
+    """
+    Token bucket async. Jika token habis, penunggu dilayani berdasarkan
+    prioritas lalu urutan datang; satu timer membangunkan mereka tepat saat
+    token berikutnya tersedia.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._timer = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def idle(self) -> bool:
+        """True jika tidak ada penunggu dan token sudah penuh (aman untuk dibuang)."""
+        self._refill()
+        return not self._waiters and self._tokens >= self.burst
+
+    def tahan(self, detik: float) -> None:
+        """Mengosongkan bucket selama `detik` (cth: setelah RetryAfter dari Telegram)."""
+        self._refill()
+        self._tokens = min(self._tokens, 0) - detik * self.rate
+
+    async def acquire(self, prioritas=INTERAKTIF) -> None:
+        """Menunggu sampai satu token tersedia untuk prioritas ini."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (prioritas, next(self._seq), future))
+        if self._timer is None:
+            self._bangunkan()
+        await future
+
+    def _bangunkan(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        if self._waiters:
+            delay = (1 - self._tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._bangunkan)
+
+
+def _detik(retry_after) -> float:
+    if isinstance(retry_after, datetime.timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class OutboxRateLimiter(BaseRateLimiter):
+    """
+    Rate limiter untuk semua panggilan Bot API dari bot ini.
+
+    Setiap request yang punya chat_id harus mendapat token dari bucket chat
+    tersebut dan dari bucket global, dengan prioritas dari rate_limit_args.
+    RetryAfter membuat bucket chat ditahan lalu request diulang, sehingga
+    pesan tidak hilang. Jumlah request yang menunggu dibatasi MAX_ANTRIAN;
+    request berikutnya ikut menunggu (backpressure), bukan dibuang.
+    """
+
+    def __init__(
+        self,
+        global_rate=GLOBAL_RATE,
+        private_rate=PRIVATE_RATE,
+        group_rate=GROUP_RATE,
+        chat_burst=CHAT_BURST,
+        max_antrian=MAX_ANTRIAN,
+        max_retry=MAX_RETRY,
+    ):
+        self._global = TokenBucket(global_rate, global_rate)
+        self._private_rate = private_rate
+        self._group_rate = group_rate
+        self._chat_burst = chat_burst
+        self._max_retry = max_retry
+        self._max_antrian = max_antrian
+        self._slot = None
+        self._buckets = {}
+
+    async def initialize(self) -> None:
+        self._slot = asyncio.Semaphore(self._max_antrian)
+
+    async def shutdown(self) -> None:
+        self._buckets.clear()
+
+    def _bucket_chat(self, chat_id) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            if len(self._buckets) >= 1024:
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.idle()}
+            # chat_id grup/channel selalu negatif.
+            rate = self._group_rate if int(chat_id) < 0 else self._private_rate
+            bucket = self._buckets[chat_id] = TokenBucket(rate, self._chat_burst)
+        return bucket
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        prioritas = (rate_limit_args or {}).get('prioritas', INTERAKTIF)
+        chat_id = data.get('chat_id')
+        # chat_id berupa @username (channel) tidak bisa dibedakan grup/pribadi; pakai batas global saja.
+        bucket = self._bucket_chat(chat_id) if isinstance(chat_id, int) else None
+
+        async with self._slot:
+            for percobaan in itertools.count():
+                if bucket is not None:
+                    await bucket.acquire(prioritas)
+                if chat_id is not None:
+                    await self._global.acquire(prioritas)
+                try:
+                    return await callback(*args, **kwargs)
+                except RetryAfter as e:
+                    if percobaan >= self._max_retry:
+                        raise
+                    tunggu = _detik(e.retry_after)
+                    logger.warning(f"Outbox: {endpoint} ke chat {chat_id} kena RetryAfter {tunggu}s, diulang.")
+                    if bucket is not None:
+                        bucket.tahan(tunggu)
+                    else:
+                        await asyncio.sleep(tunggu)
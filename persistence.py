@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+import async_db as adb
+
+logger = logging.getLogger(__name__)
+
+# Selang (detik) Application mengirim perubahan ke persistence.
+UPDATE_INTERVAL = 10
+
+
+def _json(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+class SQLitePersistence(BasePersistence):
+    """
+    Persistence untuk state ConversationHandler, user_data, dan chat_data di
+    tabel percakapan/user_data/chat_data pada database bot.
+
+    Application hanya memanggil update_* untuk data yang berubah sejak
+    putaran sebelumnya; semua panggilan dalam satu putaran dikumpulkan lalu
+    ditulis dalam satu transaksi. Percakapan yang selesai dan data kosong
+    langsung dihapus, jadi ukuran tabel mengikuti jumlah percakapan yang
+    sedang berjalan, bukan jumlah user. Data disimpan sebagai JSON.
+    """
+
+    def __init__(self, update_interval=UPDATE_INTERVAL):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, callback_data=False),
+            update_interval=update_interval,
+        )
+        self._percakapan = {}
+        self._user_data = {}
+        self._chat_data = {}
+        self._tulis_task = None
+
+    async def _kumpulkan(self) -> None:
+        """Menunggu penulisan batch putaran ini (dibuat oleh pemanggil pertama)."""
+        if self._tulis_task is None:
+            self._tulis_task = asyncio.create_task(self._tulis())
+        await asyncio.shield(self._tulis_task)
+
+    async def _tulis(self) -> None:
+        # Beri kesempatan update_* lain dari putaran yang sama ikut masuk batch ini.
+        await asyncio.sleep(0)
+        self._tulis_task = None
+        percakapan, self._percakapan = self._percakapan, {}
+        user_data, self._user_data = self._user_data, {}
+        chat_data, self._chat_data = self._chat_data, {}
+        if not (percakapan or user_data or chat_data):
+            return
+        try:
+            await adb.simpan_persisten(
+                [(nama, kunci, state) for (nama, kunci), state in percakapan.items()],
+                list(user_data.items()),
+                list(chat_data.items()),
+            )
+        except Exception:
+            # Kembalikan ke antrean (kecuali sudah ada nilai yang lebih baru) supaya dicoba lagi.
+            self._percakapan = {**percakapan, **self._percakapan}
+            self._user_data = {**user_data, **self._user_data}
+            self._chat_data = {**chat_data, **self._chat_data}
+            raise
+
+    async def get_conversations(self, name):
+        return {tuple(json.loads(kunci)): state for kunci, state in await adb.get_percakapan(name)}
+
+    async def update_conversation(self, name, key, new_state) -> None:
+        self._percakapan[(name, _json(list(key)))] = new_state
+        await self._kumpulkan()
+
+    async def get_user_data(self):
+        return {user_id: json.loads(data) for user_id, data in await adb.get_data_persisten('user_data')}
+
+    async def update_user_data(self, user_id, data) -> None:
+        self._user_data[user_id] = _json(data) if data else None
+        await self._kumpulkan()
+
+    async def drop_user_data(self, user_id) -> None:
+        self._user_data[user_id] = None
+        await self._kumpulkan()
+
+    async def refresh_user_data(self, user_id, user_data) -> None:
+        pass
+
+    async def get_chat_data(self):
+        return {chat_id: json.loads(data) for chat_id, data in await adb.get_data_persisten('chat_data')}
+
+    async def update_chat_data(self, chat_id, data) -> None:
+        self._chat_data[chat_id] = _json(data) if data else None
+        await self._kumpulkan()
+
+    async def drop_chat_data(self, chat_id) -> None:
+        self._chat_data[chat_id] = None
+        await self._kumpulkan()
+
+    async def refresh_chat_data(self, chat_id, chat_data) -> None:
+        pass
+
+    # bot_data dan callback_data tidak dipakai bot ini.
+
+    async def get_bot_data(self):
+        return {}
+
+    async def update_bot_data(self, data) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data) -> None:
+        pass
+
+    async def get_callback_data(self):
+        return None
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Dipanggil saat bot berhenti: menulis sisa perubahan yang belum tersimpan."""
+        if self._tulis_task is not None:
+            await self._tulis_task
+        await self._tulis()
+        logger.info("Persistence: state percakapan dan user_data tersimpan.")
@@ -0,0 +1,189 @@
+import bisect
+import itertools
+import re
+import unicodedata
+from collections import OrderedDict
+
+import database as db
+
+# Partisi (chat) dan hasil query yang disimpan; yang paling lama tidak dipakai dibuang.
+MAKS_PARTISI = 512
+MAKS_CACHE_QUERY = 1024
+
+_RE_KATA = re.compile(r'\w+')
+# Versi partisi diambil dari satu penghitung global, jadi partisi yang dimuat ulang tidak pernah berversi sama.
+_versi = itertools.count(1)
+
+
+def token(teks) -> list:
+    """Kata-kata huruf kecil tanpa diakritik, cth: 'Tugas Kalkulus-2' -> ['tugas', 'kalkulus', '2']."""
+    teks = unicodedata.normalize('NFKD', str(teks).lower())
+    teks = ''.join(c for c in teks if not unicodedata.combining(c))
+    return _RE_KATA.findall(teks)
+
+
+class _Partisi:
+    """Index satu chat: array terurut (token, kunci) untuk pencarian prefix dengan bisect."""
+
+    __slots__ = ('token', 'dok', 'versi', 'versi_matkul')
+
+    def __init__(self):
+        self.token = []
+        self.dok = {}
+        self.versi = next(_versi)
+        self.versi_matkul = None
+
+    def ganti(self, jenis, dokumen) -> None:
+        """
+        Mengganti semua dokumen berkunci (jenis, ...) dengan `dokumen` berisi
+        (kunci, teks, data); array token diurutkan sekali, bukan insort per token.
+        """
+        self.dok = {kunci: isi for kunci, isi in self.dok.items() if kunci[0] != jenis}
+        self.token = [t for t in self.token if t[1][0] != jenis]
+        for kunci, teks, data in dokumen:
+            kata = set(token(teks))
+            self.token.extend((k, kunci) for k in kata)
+            self.dok[kunci] = (kata, data)
+        self.token.sort()
+        self.versi = next(_versi)
+
+    def tambah(self, kunci, teks, data) -> None:
+        self.hapus(kunci)
+        kata = set(token(teks))
+        for k in kata:
+            bisect.insort(self.token, (k, kunci))
+        self.dok[kunci] = (kata, data)
+        self.versi = next(_versi)
+
+    def hapus(self, kunci) -> None:
+        lama = self.dok.pop(kunci, None)
+        if lama is None:
+            return
+        for k in lama[0]:
+            i = bisect.bisect_left(self.token, (k, kunci))
+            del self.token[i]
+        self.versi = next(_versi)
+
+    def cocok(self, kata_kunci):
+        """Kunci dokumen yang setiap kata di `kata_kunci` menjadi awalan salah satu katanya."""
+        hasil = None
+        for awalan in kata_kunci:
+            ketemu = set()
+            i = bisect.bisect_left(self.token, (awalan,))
+            while i < len(self.token) and self.token[i][0].startswith(awalan):
+                ketemu.add(self.token[i][1])
+                i += 1
+            hasil = ketemu if hasil is None else hasil & ketemu
+            if not hasil:
+                return set()
+        return set(self.dok) if hasil is None else hasil
+
+
+class PrefixIndex:
+    """
+    Index prefix di memori atas matkul dan tugas pending per chat, untuk inline query.
+
+    Partisi chat dimuat dari database saat pertama dicari, lalu dijaga lewat
+    tambah_tugas()/hapus_tugas() di setiap tempat tugas berubah. Matkul
+    diperbarui saat versi matkul chat naik (db.get_matkul_version). Hasil
+    per (chat, query) disimpan selama versi partisinya tidak berubah, jadi
+    query yang diketik huruf demi huruf tidak menyentuh database sama sekali.
+
+    `muat_matkul(chat_id)` dan `muat_tugas(chat_id)` adalah fungsi async yang
+    mengembalikan daftar matkul dan tugas pending sebuah chat.
+    """
+
+    def __init__(self, muat_matkul, muat_tugas):
+        self._muat_matkul = muat_matkul
+        self._muat_tugas = muat_tugas
+        self._partisi = OrderedDict()
+        # Penghitung perubahan tugas per chat yang partisinya sedang/sudah dimuat;
+        # entri dibuang bersama partisinya, jadi ukurannya ikut MAKS_PARTISI.
+        self._ubah = {}
+        self._cache = OrderedDict()
+
+    async def _get_partisi(self, chat_id) -> _Partisi:
+        partisi = self._partisi.get(chat_id)
+        if partisi is None:
+            while True:
+                ubah = self._ubah.setdefault(chat_id, 0)
+                partisi = _Partisi()
+                partisi.ganti('t', [self._dokumen_tugas(tugas) for tugas in await self._muat_tugas(chat_id)])
+                # Jangan pakai hasil muat yang terlewat perubahan di tengah jalan (entri hilang juga perubahan).
+                if self._ubah.get(chat_id) == ubah:
+                    break
+            self._partisi[chat_id] = partisi
+            while len(self._partisi) > MAKS_PARTISI:
+                lama, _ = self._partisi.popitem(last=False)
+                self._ubah.pop(lama, None)
+        self._partisi.move_to_end(chat_id)
+
+        versi_matkul = db.get_matkul_version(chat_id)
+        if partisi.versi_matkul != versi_matkul:
+            matkul_list = await self._muat_matkul(chat_id)
+            partisi.ganti('m', [
+                (('m', matkul['id']), f"{matkul['nama']} {matkul['hari']} {matkul['ruangan']}", dict(matkul))
+                for matkul in matkul_list
+            ])
+            partisi.versi_matkul = versi_matkul
+        return partisi
+
+    @staticmethod
+    def _dokumen_tugas(tugas):
+        return ('t', tugas['id']), f"{tugas['matkul_nama']} {tugas['deskripsi']}", dict(tugas)
+
+    def _catat_ubah(self, chat_id) -> None:
+        if chat_id in self._ubah:
+            self._ubah[chat_id] += 1
+
+    def tambah_tugas(self, chat_id, tugas) -> None:
+        """Mendaftarkan tugas pending baru (atau yang berubah)."""
+        self._catat_ubah(chat_id)
+        partisi = self._partisi.get(chat_id)
+        if partisi is not None:
+            partisi.tambah(*self._dokumen_tugas(tugas))
+
+    def hapus_tugas(self, chat_id, tugas_id) -> None:
+        """Mengeluarkan tugas yang selesai atau dihapus."""
+        self._catat_ubah(chat_id)
+        partisi = self._partisi.get(chat_id)
+        if partisi is not None:
+            partisi.hapus(('t', tugas_id))
+
+    def hapus_chat(self, chat_id) -> None:
+        """Membuang partisi sebuah chat; dimuat ulang dari database saat dicari lagi."""
+        self._ubah.pop(chat_id, None)
+        self._partisi.pop(chat_id, None)
+
+    def kosongkan(self) -> None:
+        """Membuang semua partisi (cth: setelah arsip massal atau restore)."""
+        self._ubah.clear()
+        self._partisi.clear()
+        self._cache.clear()
+
+    async def cari(self, chat_ids, teks):
+        """
+        Matkul lalu tugas pending (deadline terdekat dulu) di `chat_ids` yang
+        cocok dengan `teks`; teks kosong berarti semuanya.
+        """
+        kata_kunci = tuple(token(teks))
+        daftar_partisi = [await self._get_partisi(chat_id) for chat_id in chat_ids]
+        versi = tuple(p.versi for p in daftar_partisi)
+        kunci_cache = (tuple(chat_ids), kata_kunci)
+        entri = self._cache.get(kunci_cache)
+        if entri is not None and entri[0] == versi:
+            self._cache.move_to_end(kunci_cache)
+            return entri[1]
+
+        matkul, tugas = [], []
+        for partisi in daftar_partisi:
+            for kunci in partisi.cocok(kata_kunci):
+                (matkul if kunci[0] == 'm' else tugas).append(partisi.dok[kunci][1])
+        matkul.sort(key=lambda m: (m['nama'].lower(), m['id']))
+        tugas.sort(key=lambda t: (t['deadline_ts'] is None, t['deadline_ts'] or 0, t['id']))
+        hasil = [('m', m) for m in matkul] + [('t', t) for t in tugas]
+
+        self._cache[kunci_cache] = (versi, hasil)
+        while len(self._cache) > MAKS_CACHE_QUERY:
+            self._cache.popitem(last=False)
+        return hasil
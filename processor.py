@@ -0,0 +1,68 @@
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+# Batas update yang boleh ditampung sekaligus (termasuk yang sedang menunggu
+# giliran di chat-nya). Batas paralel sebenarnya ada di max_paralel.
+MAX_ANTRIAN = 4096
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Memproses update dari chat berbeda secara paralel (maksimal `max_paralel`
+    sekaligus), tetapi update dari chat yang sama tetap satu per satu sesuai
+    urutan datang. Langkah ConversationHandler dan edit pesan oleh
+    button_callback di satu chat jadi tidak pernah balapan.
+
+    Slot paralel hanya diambil oleh update terdepan di tiap chat, sehingga
+    chat yang sedang banjir update tidak menahan slot milik chat lain.
+    """
+
+    def __init__(self, max_paralel: int):
+        super().__init__(max(MAX_ANTRIAN, max_paralel))
+        self.max_paralel = max_paralel
+        self._slot = asyncio.BoundedSemaphore(max_paralel)
+        # kunci chat -> [Lock, jumlah update yang sedang memakai/menunggu lock]
+        self._chat = {}
+
+    @staticmethod
+    def _kunci(update):
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            # Inline query dan sejenisnya tidak punya chat; urutkan per user.
+            return ('user', update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update, coroutine) -> None:
+        kunci = self._kunci(update)
+        if kunci is None:
+            async with self._slot:
+                await coroutine
+            return
+
+        entri = self._chat.get(kunci)
+        if entri is None:
+            entri = self._chat[kunci] = [asyncio.Lock(), 0]
+        entri[1] += 1
+        dijalankan = False
+        try:
+            async with entri[0]:
+                async with self._slot:
+                    dijalankan = True
+                    await coroutine
+        finally:
+            if not dijalankan:
+                coroutine.close()
+            entri[1] -= 1
+            if entri[1] == 0:
+                del self._chat[kunci]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        self._chat.clear()
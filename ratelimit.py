@@ -0,0 +1,129 @@
+import logging
+import time
+
+from telegram.error import TelegramError
+from telegram.ext import ApplicationHandlerStop
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Token bucket update masuk: (burst, token per detik). Satu user boleh
+# mengirim 6 update beruntun lalu 1 per detik; satu chat (grup) 20 lalu 4 per detik.
+USER_BURST, USER_RATE = 6, 1.0
+CHAT_BURST, CHAT_RATE = 20, 4.0
+# Perintah/tombol menu identik dari user yang sama dalam selang ini digabung dengan yang pertama.
+JENDELA_SAMA = 2.0
+# Balasan "pelan-pelan" untuk pesan dikirim paling sering sekali per selang ini per user.
+JEDA_PERINGATAN = 10.0
+# Selang pembersihan bucket yang sudah penuh lagi (sama saja dengan tidak ada).
+JEDA_SAPU = 60.0
+
+TEKS_PELAN = "⏳ Pelan-pelan ya, tunggu sebentar sebelum mengirim perintah lagi."
+
+
+class InboundLimiter:
+    """
+    Pembatas update masuk per user dan per chat, dipasang sebagai TypeHandler
+    di grup paling awal. Update yang ditolak menghentikan semua handler
+    berikutnya (ApplicationHandlerStop), jadi tidak menyentuh database.
+
+    Bucket disimpan sebagai [token, waktu] dan hanya dihitung ulang saat
+    dipakai; bucket yang sudah terisi penuh dibuang setiap JEDA_SAPU detik.
+    Perintah yang diulang persis dalam JENDELA_SAMA detik dibuang diam-diam
+    (balasan perintah pertama sudah cukup). Tombol inline yang ditolak tetap
+    dijawab supaya spinner di klien berhenti; tekanan ganda tombol sendiri
+    sudah disaring CallbackDedupe. Inline query tidak dibatasi karena
+    dilayani dari memori (PrefixIndex).
+    """
+
+    def __init__(self, teks_menu=(), user=(USER_BURST, USER_RATE), chat=(CHAT_BURST, CHAT_RATE),
+                 jendela_sama=JENDELA_SAMA):
+        self._teks_menu = frozenset(teks_menu)
+        self._jendela_sama = jendela_sama
+        self._batas_user = user
+        self._batas_chat = chat
+        self._user = {}
+        self._chat = {}
+        # user_id -> (tanda perintah, waktu)
+        self._terakhir = {}
+        # user_id -> waktu balasan "pelan-pelan" terakhir
+        self._diperingatkan = {}
+        self._sapu_berikutnya = time.monotonic() + JEDA_SAPU
+
+    @staticmethod
+    def _ambil(ember, kunci, batas, sekarang) -> bool:
+        burst, rate = batas
+        isi = ember.get(kunci)
+        if isi is None:
+            ember[kunci] = [burst - 1, sekarang]
+            return True
+        token = min(burst, isi[0] + (sekarang - isi[1]) * rate)
+        isi[1] = sekarang
+        if token < 1:
+            isi[0] = token
+            return False
+        isi[0] = token - 1
+        return True
+
+    def _tanda(self, update):
+        """Perintah atau tombol menu yang boleh digabung jika diulang, atau None."""
+        message = update.message
+        if message is None or not message.text:
+            return None
+        if message.text.startswith('/') or message.text in self._teks_menu:
+            return (message.chat_id, message.text)
+        return None
+
+    def _sapu(self, sekarang) -> None:
+        # Dibangun ulang (bukan del satu per satu) supaya dict ikut menyusut.
+        for nama, batas in (('_user', self._batas_user), ('_chat', self._batas_chat)):
+            burst, rate = batas
+            setattr(self, nama, {
+                kunci: isi for kunci, isi in getattr(self, nama).items()
+                if isi[0] + (sekarang - isi[1]) * rate < burst
+            })
+        self._terakhir = {k: v for k, v in self._terakhir.items() if sekarang - v[1] < self._jendela_sama}
+        self._diperingatkan = {k: v for k, v in self._diperingatkan.items() if sekarang - v < JEDA_PERINGATAN}
+        self._sapu_berikutnya = sekarang + JEDA_SAPU
+
+    async def saring(self, update, context) -> None:
+        """Callback TypeHandler: lolos tanpa efek, atau ApplicationHandlerStop jika update ditolak."""
+        user = update.effective_user
+        if user is None or update.inline_query is not None:
+            return
+        sekarang = time.monotonic()
+        if sekarang >= self._sapu_berikutnya:
+            self._sapu(sekarang)
+
+        tanda = self._tanda(update)
+        if tanda is not None:
+            lama = self._terakhir.get(user.id)
+            if lama is not None and lama[0] == tanda and sekarang - lama[1] < self._jendela_sama:
+                metrics.hitung('update_masuk', 'digabung')
+                raise ApplicationHandlerStop
+            self._terakhir[user.id] = (tanda, sekarang)
+
+        chat = update.effective_chat
+        if self._ambil(self._user, user.id, self._batas_user, sekarang):
+            if chat is None or chat.id == user.id or self._ambil(self._chat, chat.id, self._batas_chat, sekarang):
+                return
+            # Ditolak karena chat-nya: token user dikembalikan.
+            self._user[user.id][0] += 1
+
+        metrics.hitung('update_masuk', 'dibatasi')
+        await self._tolak(update, user.id, sekarang)
+        raise ApplicationHandlerStop
+
+    async def _tolak(self, update, user_id, sekarang) -> None:
+        try:
+            if update.callback_query is not None:
+                await update.callback_query.answer(TEKS_PELAN)
+                return
+            if sekarang - self._diperingatkan.get(user_id, float('-inf')) < JEDA_PERINGATAN:
+                return
+            self._diperingatkan[user_id] = sekarang
+            if update.effective_message is not None:
+                await update.effective_message.reply_text(TEKS_PELAN)
+        except TelegramError as e:
+            logger.debug(f"Gagal membalas update yang dibatasi: {e}")
@@ -0,0 +1,156 @@
+import heapq
+import logging
+import time
+
+import async_db as adb
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Pengingat dikirim 24 jam, 3 jam, dan 1 jam sebelum deadline.
+REMINDER_OFFSETS = (24 * 3600, 3 * 3600, 3600)
+JOB_NAME = "pengingat_tugas"
+
+
+class ReminderScheduler:
+    """
+    Penjadwal pengingat per tugas berbasis min-heap.
+
+    Heap berisi (waktu_kirim, tugas_id, offset, deadline_ts). Perubahan tugas
+    tidak menghapus isi heap; entri yang sudah tidak cocok dengan data di
+    self._tugas (tugas selesai/dihapus) dibuang saat keluar dari heap.
+    Hanya satu job di job_queue yang aktif, dijadwalkan tepat pada waktu
+    pengingat terdekat.
+    """
+
+    def __init__(self, kirim, offsets=REMINDER_OFFSETS):
+        self._kirim = kirim
+        self._offsets = offsets
+        self._heap = []
+        self._tugas = {}
+        self._job_queue = None
+        self._job = None
+        self._job_waktu = None
+
+    async def mulai(self, job_queue) -> None:
+        """Memuat semua tugas pending yang deadline-nya belum lewat, lalu menjadwalkan job."""
+        self._job_queue = job_queue
+        sekarang = int(time.time())
+        tugas_list = await adb.get_tugas_deadline_range(sekarang, 2**62)
+        self._heap = []
+        self._tugas = {}
+        for tugas in tugas_list:
+            self._push(dict(tugas), sekarang)
+        heapq.heapify(self._heap)
+        logger.info(f"Pengingat: {len(self._heap)} jadwal dimuat untuk {len(self._tugas)} tugas.")
+        self._jadwalkan()
+
+    async def muat_ulang(self) -> None:
+        """Memuat ulang semua jadwal dari database, jika penjadwal sedang berjalan."""
+        if self._job_queue is not None:
+            await self.mulai(self._job_queue)
+
+    def berhenti(self) -> None:
+        """Membatalkan job dan mengosongkan heap (cth: instance ini bukan lagi pemimpin, lihat lease.py)."""
+        if self._job is not None:
+            self._job.schedule_removal()
+        self._job_queue = None
+        self._job = None
+        self._job_waktu = None
+        self._heap = []
+        self._tugas = {}
+
+    def tambah(self, tugas) -> None:
+        """Mendaftarkan (atau memperbarui) tugas pending beserta jadwal pengingatnya."""
+        if self._job_queue is None:
+            # Belum/tidak berjalan; mulai() akan memuat semuanya dari database.
+            return
+        lama = self._tugas.get(tugas['id'])
+        if tugas['deadline_ts'] is None or (lama is not None and lama['deadline_ts'] == tugas['deadline_ts']):
+            return
+        self._push(dict(tugas), int(time.time()), heap_push=True)
+        self._jadwalkan()
+
+    def hapus(self, tugas_id) -> None:
+        """Membatalkan semua pengingat sebuah tugas (selesai atau dihapus)."""
+        if self._tugas.pop(tugas_id, None) is not None:
+            self._rapikan()
+            self._jadwalkan()
+
+    def hapus_chat(self, chat_id) -> None:
+        """Membatalkan semua pengingat milik sebuah chat (cth: setelah /clear_tugas)."""
+        for tugas_id in [t['id'] for t in self._tugas.values() if t['chat_id'] == chat_id]:
+            del self._tugas[tugas_id]
+        self._rapikan()
+        self._jadwalkan()
+
+    def _push(self, tugas, sekarang, heap_push=False) -> None:
+        entri_baru = [
+            (tugas['deadline_ts'] - offset, tugas['id'], offset, tugas['deadline_ts'])
+            for offset in self._offsets
+            if tugas['deadline_ts'] - offset > sekarang
+        ]
+        if not entri_baru:
+            self._tugas.pop(tugas['id'], None)
+            return
+        self._tugas[tugas['id']] = tugas
+        for entri in entri_baru:
+            if heap_push:
+                heapq.heappush(self._heap, entri)
+            else:
+                self._heap.append(entri)
+
+    def _masih_berlaku(self, entri) -> bool:
+        tugas = self._tugas.get(entri[1])
+        return tugas is not None and tugas['deadline_ts'] == entri[3]
+
+    def _rapikan(self) -> None:
+        """Membangun ulang heap jika entri basi sudah lebih banyak dari entri aktif."""
+        if len(self._heap) > 2 * len(self._offsets) * len(self._tugas) + 64:
+            self._heap = [entri for entri in self._heap if self._masih_berlaku(entri)]
+            heapq.heapify(self._heap)
+
+    def _jadwalkan(self) -> None:
+        """Memastikan job aktif berjalan pada waktu pengingat terdekat."""
+        while self._heap and not self._masih_berlaku(self._heap[0]):
+            heapq.heappop(self._heap)
+        if self._job_queue is None:
+            return
+
+        berikutnya = self._heap[0][0] if self._heap else None
+        if berikutnya == self._job_waktu:
+            return
+        if self._job is not None:
+            self._job.schedule_removal()
+            self._job = None
+        self._job_waktu = berikutnya
+        if berikutnya is not None:
+            self._job = self._job_queue.run_once(
+                self._jalankan, max(0, berikutnya - time.time()), name=JOB_NAME
+            )
+
+    @metrics.terukur('job', JOB_NAME)
+    async def _jalankan(self, context) -> None:
+        """Mengirim semua pengingat yang sudah jatuh tempo, lalu tidur sampai jadwal berikutnya."""
+        self._job = None
+        self._job_waktu = None
+        sekarang = time.time()
+        jatuh_tempo = []
+        while self._heap and self._heap[0][0] <= sekarang + 1:
+            entri = heapq.heappop(self._heap)
+            if self._masih_berlaku(entri):
+                jatuh_tempo.append(entri)
+
+        for waktu, tugas_id, offset, deadline_ts in jatuh_tempo:
+            tugas = self._tugas.get(tugas_id)
+            if tugas is None:
+                continue
+            try:
+                await self._kirim(context, tugas, offset)
+            except Exception as e:
+                logger.error(f"Pengingat: gagal mengirim pengingat tugas {tugas_id}: {e}")
+            if offset == min(self._offsets):
+                # Pengingat terakhir sudah terkirim, tugas tidak perlu dilacak lagi.
+                self._tugas.pop(tugas_id, None)
+
+        self._jadwalkan()
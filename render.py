@@ -0,0 +1,130 @@
+import html
+import re
+import string
+
+from telegram.constants import MessageLimit
+
+# Batas Telegram dihitung dari teks setelah tag HTML diurai, dalam satuan UTF-16.
+BATAS = MessageLimit.MAX_TEXT_LENGTH
+
+_RE_TAG = re.compile(r'<[^>]*>')
+
+
+def panjang_utf16(teks: str) -> int:
+    return len(teks.encode('utf-16-le')) // 2
+
+
+def panjang_tampil(teks_html: str) -> int:
+    """Panjang teks yang dilihat Telegram dari potongan HTML (tanpa tag, entity dihitung satu)."""
+    return panjang_utf16(html.unescape(_RE_TAG.sub('', teks_html)))
+
+
+class Template:
+    """
+    Template HTML satu baris dengan field gaya str.format, cth:
+    '📚 <b>{matkul_nama:100}</b>\\n'. Pola diurai sekali saat dibuat; nilai
+    field selalu di-escape, dan angka setelah ':' adalah panjang maksimal
+    nilainya (sisanya diganti '…').
+    """
+
+    __slots__ = ('_bagian', '_panjang_tetap')
+
+    def __init__(self, pola: str):
+        self._bagian = []
+        self._panjang_tetap = 0
+        for literal, field, spec, _ in string.Formatter().parse(pola):
+            if literal:
+                self._bagian.append((literal, None, None))
+                self._panjang_tetap += panjang_tampil(literal)
+            if field is not None:
+                self._bagian.append((None, field, int(spec) if spec else None))
+
+    def render(self, **nilai):
+        """Mengembalikan (html, panjang_tampil)."""
+        keluaran = []
+        panjang = self._panjang_tetap
+        for literal, field, maks in self._bagian:
+            if field is None:
+                keluaran.append(literal)
+                continue
+            teks = str(nilai[field])
+            if maks is not None and len(teks) > maks:
+                teks = teks[:maks - 1] + '…'
+            panjang += panjang_utf16(teks)
+            keluaran.append(html.escape(teks, quote=False))
+        return ''.join(keluaran), panjang
+
+
+class Pesan:
+    """
+    Penampung pesan HTML per baris yang dipecah di batas baris: setiap
+    potongan panjang tampilnya paling banyak `batas`. Baris yang sendirian
+    sudah melebihi batas dikirim sebagai teks biasa yang dipotong-potong.
+    """
+
+    def __init__(self, judul: str = '', batas: int = BATAS):
+        self._batas = batas
+        self._potongan = []
+        self._buffer = []
+        self._panjang = 0
+        if judul:
+            self.tambah_html(judul)
+
+    def tambah(self, template: Template, **nilai) -> None:
+        self._tambah(*template.render(**nilai))
+
+    def tambah_html(self, teks_html: str) -> None:
+        """Menambah HTML yang sudah aman (tidak di-escape lagi)."""
+        self._tambah(teks_html, panjang_tampil(teks_html))
+
+    def _tambah(self, teks_html: str, panjang: int) -> None:
+        if self._buffer and self._panjang + panjang > self._batas:
+            self._tutup()
+        if panjang > self._batas:
+            for bagian in self._pecah_polos(html.unescape(_RE_TAG.sub('', teks_html))):
+                self._potongan.append(html.escape(bagian, quote=False))
+            return
+        self._buffer.append(teks_html)
+        self._panjang += panjang
+
+    def _pecah_polos(self, teks: str):
+        awal, panjang = 0, 0
+        for i, c in enumerate(teks):
+            lebar = 2 if ord(c) > 0xFFFF else 1
+            if panjang + lebar > self._batas:
+                yield teks[awal:i]
+                awal, panjang = i, 0
+            panjang += lebar
+        if awal < len(teks):
+            yield teks[awal:]
+
+    def _tutup(self) -> None:
+        self._potongan.append(''.join(self._buffer))
+        self._buffer = []
+        self._panjang = 0
+
+    def hasil(self) -> list:
+        """Semua potongan pesan, berurutan."""
+        if self._buffer:
+            self._tutup()
+        return self._potongan
+
+    def satu(self) -> str:
+        """Hanya potongan pertama, untuk pesan yang diedit di tempat (cth: halaman daftar)."""
+        potongan = self.hasil()
+        if not potongan:
+            return ''
+        pertama = potongan[0].rstrip()
+        if len(potongan) > 1 and panjang_tampil(pertama) + 2 <= self._batas:
+            return pertama + "\n…"
+        return potongan[0]
+
+
+async def kirim(kirim_fn, potongan, reply_markup=None, **kwargs) -> None:
+    """
+    Mengirim potongan pesan berurutan lewat `kirim_fn(teks, ...)`;
+    reply_markup hanya dipasang di potongan terakhir.
+    """
+    for i, teks in enumerate(potongan):
+        akhir = i == len(potongan) - 1
+        await kirim_fn(teks, reply_markup=reply_markup if akhir else None, **kwargs)
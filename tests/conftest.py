@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Database kosong di folder sementara; semua koneksi ditutup setelah tes."""
+    db.close_all()
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'tugas.db'))
+    monkeypatch.setattr(db, '_pencatat', None)
+    db.init_db()
+    yield db
+    db.close_all()
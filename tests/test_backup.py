@@ -0,0 +1,35 @@
+import sqlite3
+
+import backup
+
+
+def test_daftar_snapshot_terbaru_dulu_lintas_awalan(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, 'BACKUP_DIR', str(tmp_path))
+    for nama in ('tugas-20261001-030000.db.gz', 'manual-20261005-120000.db.gz',
+                 'pra-restore-20261003-080000.db', 'salinan.db', 'tugas-20261004-030000.db.gz'):
+        (tmp_path / nama).write_bytes(b'')
+    assert backup.daftar_snapshot() == [
+        'manual-20261005-120000.db.gz', 'tugas-20261004-030000.db.gz',
+        'pra-restore-20261003-080000.db', 'tugas-20261001-030000.db.gz', 'salinan.db',
+    ]
+
+
+def test_pulihkan_snapshot_lama_saat_pencatat_terpasang(database, tmp_path):
+    # Skema versi awal: belum ada chat_id maupun tabel perubahan.
+    lama = sqlite3.connect(str(tmp_path / 'lama.db'))
+    lama.executescript('''
+    CREATE TABLE mata_kuliah (id INTEGER PRIMARY KEY AUTOINCREMENT, nama TEXT NOT NULL,
+        hari TEXT NOT NULL, jam TEXT NOT NULL, ruangan TEXT NOT NULL);
+    CREATE TABLE tugas (id INTEGER PRIMARY KEY AUTOINCREMENT, matkul_nama TEXT NOT NULL,
+        deskripsi TEXT NOT NULL, deadline TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending');
+    INSERT INTO tugas (matkul_nama, deskripsi, deadline) VALUES ('Kalkulus', 'Lama', '30/10/2026');
+    ''')
+    database.pasang_pencatat_perubahan('a')
+
+    assert database.pulihkan_dari(lama, default_chat_id=1) > 0
+    lama.close()
+
+    assert [t['deskripsi'] for t in database.iter_tugas(1)] == ['Lama']
+    # Trigger pencatat dipasang lagi dan mencatat tulisan setelah restore.
+    database.add_tugas(1, 'Kalkulus', 'Baru', 'Besok')
+    assert database.get_perubahan_luar('b') == {'tugas': 1}
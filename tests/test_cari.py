@@ -0,0 +1,27 @@
+import time
+
+
+def test_cari_hanya_chat_yang_diminta(database):
+    database.add_tugas(1, 'Kalkulus', 'Laporan integral', 'Besok')
+    database.add_tugas(-100123, 'Fisika', 'Laporan gaya', 'Besok')
+    database.add_tugas(2, 'Kimia', 'Laporan asam', 'Besok')
+
+    assert [t['deskripsi'] for t in database.cari_tugas([1], 'lapor', 10)] == ['Laporan integral']
+    hasil = database.cari_tugas([1, -100123], 'laporan', 10)
+    assert sorted(t['chat_id'] for t in hasil) == [-100123, 1]
+    # Token chat tidak ikut dicari sebagai kata biasa.
+    assert database.cari_tugas([1], 'c1', 10) == []
+
+
+def test_cari_menemukan_tugas_yang_diarsipkan(database):
+    database.add_tugas(1, 'Kalkulus', 'Laporan integral', 'Besok')
+    database.add_tugas(1, 'Kalkulus', 'Laporan turunan', 'Besok')
+    selesai = database.cari_tugas([1], 'integral', 10)[0]['id']
+    database.update_tugas_status(1, selesai, 'done')
+
+    assert database.arsipkan_tugas(int(time.time()) + 1, 0) == 1
+    hasil = {t['deskripsi']: t['diarsipkan'] for t in database.cari_tugas([1], 'laporan', 10)}
+    assert hasil == {'Laporan integral': 1, 'Laporan turunan': 0}
+
+    database.clear_all_tugas(1)
+    assert database.cari_tugas([1], 'laporan', 10) == []
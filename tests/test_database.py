@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+import time
+
+
+def _baca_saat_bump(database, monkeypatch, chat_id):
+    """Membaca matkul dari thread lain tepat saat versi dinaikkan."""
+    terbaca = []
+    bump_asli = database._bump_matkul_version
+
+    def bump(cid):
+        bump_asli(cid)
+        t = threading.Thread(target=lambda: terbaca.append([m['nama'] for m in database.get_matkul(cid)]))
+        t.start()
+        t.join()
+
+    monkeypatch.setattr(database, '_bump_matkul_version', bump)
+    return terbaca
+
+
+def test_add_matkul_versi_naik_setelah_commit(database, monkeypatch):
+    terbaca = _baca_saat_bump(database, monkeypatch, 1)
+    versi = database.get_matkul_version(1)
+    database.add_matkul(1, 'Kalkulus', 'Senin', '08:00 - 10:00', 'A1')
+    assert database.get_matkul_version(1) == versi + 1
+    assert terbaca == [['Kalkulus']]
+
+
+def test_delete_matkul_versi_naik_setelah_commit(database, monkeypatch):
+    database.add_matkul(1, 'Kalkulus', 'Senin', '08:00 - 10:00', 'A1')
+    matkul_id = database.get_matkul(1)[0]['id']
+    terbaca = _baca_saat_bump(database, monkeypatch, 1)
+    assert database.delete_matkul(1, matkul_id)
+    assert terbaca == [[]]
+
+
+
+def test_update_status_banyak_hanya_tugas_yang_berubah(database):
+    for i in range(3):
+        database.add_tugas(1, 'Kalkulus', f'Tugas {i}', 'Besok')
+    database.add_tugas(2, 'Kalkulus', 'Tugas chat lain', 'Besok')
+    ids = [t['id'] for t in database.iter_tugas(1)]
+    database.update_tugas_status(1, ids[0], 'done')
+    with database.write_connection() as conn:
+        conn.execute("UPDATE tugas SET selesai_at = 1 WHERE id = ?", (ids[0],))
+
+    # Tugas yang sudah selesai dan tugas chat lain tidak ikut dihitung.
+    assert database.update_status_banyak(1, ids + [4], 'done') == ids[1:]
+    with database.read_connection() as conn:
+        assert conn.execute("SELECT selesai_at FROM tugas WHERE id = ?", (ids[0],)).fetchone()[0] == 1
+    assert database.update_status_banyak(1, ids, 'done') == []
+
+
+def test_import_tugas_tidak_ikut_tugas_instance_lain(database):
+    # Instance lain sedang menulis ke database yang sama saat impor dimulai.
+    lain = sqlite3.connect(database.DB_PATH)
+    lain.execute("BEGIN IMMEDIATE")
+    lain.execute(
+        "INSERT INTO tugas (matkul_nama, deskripsi, deadline, deadline_ts, status, chat_id) "
+        "VALUES ('Fisika', 'Dari instance lain', 'Besok', 2000000000, 'pending', 1)"
+    )
+    hasil = []
+    t = threading.Thread(target=lambda: hasil.extend(database.import_tugas(
+        1, [('Kalkulus', 'Impor', '30/10/2030', 1919000000, 'pending')]
+    )))
+    t.start()
+    time.sleep(0.2)
+    lain.commit()
+    lain.close()
+    t.join()
+    assert [row['deskripsi'] for row in hasil] == ['Impor']
@@ -0,0 +1,53 @@
+import datetime
+
+from deadline import WIB, parse_deadline
+
+# Senin, 19 Oktober 2026 pukul 10:00 WIB.
+SENIN = datetime.datetime(2026, 10, 19, 10, 0, tzinfo=WIB)
+
+
+def _waktu(teks, now=SENIN):
+    return datetime.datetime.fromtimestamp(parse_deadline(teks, now=now), WIB).replace(tzinfo=None)
+
+
+def test_jam_dengan_keterangan_waktu():
+    assert _waktu("besok jam 9 malam") == datetime.datetime(2026, 10, 20, 21, 0)
+    assert _waktu("besok jam 9 pagi") == datetime.datetime(2026, 10, 20, 9, 0)
+    assert _waktu("lusa 4.30 sore") == datetime.datetime(2026, 10, 21, 16, 30)
+    assert _waktu("besok jam 1 siang") == datetime.datetime(2026, 10, 20, 13, 0)
+    assert _waktu("malam ini jam 8") == datetime.datetime(2026, 10, 19, 20, 0)
+    assert _waktu("besok jam 12 malam") == datetime.datetime(2026, 10, 20, 23, 59)
+    assert _waktu("besok jam 21 malam") == datetime.datetime(2026, 10, 20, 21, 0)
+
+
+def test_hari_depan_adalah_minggu_berikutnya():
+    assert _waktu("jumat") == datetime.datetime(2026, 10, 23, 23, 59)
+    assert _waktu("jumat depan") == datetime.datetime(2026, 10, 30, 23, 59)
+    assert _waktu("senin depan jam 7 malam") == datetime.datetime(2026, 10, 26, 19, 0)
+    jumat = SENIN + datetime.timedelta(days=4)
+    assert _waktu("jumat depan", now=jumat) == datetime.datetime(2026, 10, 30, 23, 59)
+
+
+def test_minggu_lagi_bukan_hari_minggu():
+    assert _waktu("deadline 2 minggu lagi") == datetime.datetime(2026, 11, 2, 23, 59)
+    assert _waktu("1 minggu lagi jam 8 pagi") == datetime.datetime(2026, 10, 26, 8, 0)
+    assert _waktu("minggu") == datetime.datetime(2026, 10, 25, 23, 59)
+
+
+def test_hari_ini_yang_jamnya_lewat_jadi_minggu_depan():
+    assert _waktu("senin 08:00") == datetime.datetime(2026, 10, 26, 8, 0)
+    assert _waktu("senin 13:00") == datetime.datetime(2026, 10, 19, 13, 0)
+    assert _waktu("senin") == datetime.datetime(2026, 10, 19, 23, 59)
+
+
+def test_hanya_jam():
+    assert _waktu("jam 9") == datetime.datetime(2026, 10, 20, 9, 0)
+    assert _waktu("15:30") == datetime.datetime(2026, 10, 19, 15, 30)
+
+
+def test_tanggal_absolut():
+    assert _waktu("30/10/2026") == datetime.datetime(2026, 10, 30, 23, 59)
+    assert _waktu("15 Okt 10:00") == datetime.datetime(2027, 10, 15, 10, 0)
+    assert _waktu("2026-12-01 07.30") == datetime.datetime(2026, 12, 1, 7, 30)
+    assert parse_deadline("kapan-kapan", now=SENIN) is None
+    assert parse_deadline("besok", now=SENIN, izinkan_relatif=False) is None
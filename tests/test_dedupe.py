@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import dedupe
+from dedupe import JAWABAN_DEBOUNCE, CallbackDedupe
+
+
+class _Jam:
+    def __init__(self):
+        self.sekarang = 100.0
+
+    def __call__(self):
+        return self.sekarang
+
+
+def _query(message_id, data, user_id=7):
+    async def answer(teks=None, show_alert=False):
+        pass
+    message = SimpleNamespace(chat=SimpleNamespace(id=1), message_id=message_id)
+    return SimpleNamespace(message=message, data=data, from_user=SimpleNamespace(id=user_id), id='q', answer=answer)
+
+
+def _tombol(monkeypatch):
+    jam = _Jam()
+    monkeypatch.setattr(dedupe.time, 'monotonic', jam)
+    return CallbackDedupe(), jam
+
+
+def test_tekanan_ulang_dijawab_dari_memori(monkeypatch):
+    tombol, jam = _tombol(monkeypatch)
+    query = _query(10, 'tdone_5_0')
+    assert tombol.cek(query) is None
+    asyncio.run(tombol.jawab(query, "✅ Tugas ditandai selesai."))
+    jam.sekarang += 2
+    assert tombol.cek(_query(10, 'tdone_5_0')) == ("✅ Tugas ditandai selesai.", False)
+    jam.sekarang += dedupe.TTL_DETIK
+    assert tombol.cek(_query(10, 'tdone_5_0')) is None
+
+
+def test_tombol_sama_di_pesan_lain_ditahan_sebentar(monkeypatch):
+    tombol, jam = _tombol(monkeypatch)
+    assert tombol.cek(_query(10, 'tpage_1')) is None
+    assert tombol.cek(_query(11, 'tpage_1')) == JAWABAN_DEBOUNCE
+    # User lain tidak ikut ditahan.
+    assert tombol.cek(_query(11, 'tpage_1', user_id=8)) is None
+    jam.sekarang += dedupe.DEBOUNCE_DETIK
+    assert tombol.cek(_query(12, 'tpage_1')) is None
+
+
+def test_tombol_lain_dari_user_yang_sama_tetap_diproses(monkeypatch):
+    tombol, _ = _tombol(monkeypatch)
+    assert tombol.cek(_query(10, 'tpage_1')) is None
+    assert tombol.cek(_query(10, 'tpage_2')) is None
+    assert tombol.cek(_query(11, 'tdel_3_0')) is None
+
+
+def test_lupakan_membuat_tekanan_berikutnya_diproses(monkeypatch):
+    tombol, _ = _tombol(monkeypatch)
+    query = _query(10, 'tdel_3_0')
+    assert tombol.cek(query) is None
+    tombol.lupakan(query)
+    assert tombol.cek(_query(10, 'tdel_3_0')) is None
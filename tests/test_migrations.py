@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+
+import migrations
+
+
+def test_dua_instance_bermigrasi_bersamaan(tmp_path):
+    path = str(tmp_path / 'tugas.db')
+    hasil, gagal = [], []
+    mulai = threading.Barrier(2)
+
+    def instance():
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        try:
+            mulai.wait()
+            hasil.append(migrations.jalankan(conn, default_chat_id=1))
+        except Exception as e:
+            gagal.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=instance) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert gagal == []
+    # Setiap migrasi diterapkan tepat sekali, oleh salah satu instance.
+    assert sum(hasil) == migrations.VERSI_TERBARU
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == migrations.VERSI_TERBARU
+    assert conn.execute("SELECT COUNT(*) FROM mata_kuliah").fetchone()[0] == len(migrations.MATKUL_CONTOH)
+    conn.close()
+
+
+def test_index_cari_dibangun_dari_tugas_dan_arsip(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tugas.db')
+    conn = sqlite3.connect(path)
+    monkeypatch.setattr(migrations, 'MIGRASI', migrations.MIGRASI[:11])
+    monkeypatch.setattr(migrations, 'VERSI_TERBARU', 11)
+    migrations.jalankan(conn)
+    conn.execute(
+        "INSERT INTO tugas (id, matkul_nama, deskripsi, deadline, chat_id) VALUES (1, 'Kalkulus', 'Laporan aktif', 'Besok', -100)"
+    )
+    conn.execute(
+        "INSERT INTO tugas_arsip (id, matkul_nama, deskripsi, deadline, status, chat_id, arsip_at) "
+        "VALUES (2, 'Kalkulus', 'Laporan lama', 'Kemarin', 'done', -100, 0)"
+    )
+    conn.commit()
+    monkeypatch.undo()
+
+    assert migrations.jalankan(conn) == 1
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tugas_fts'").fetchone() is None
+    assert conn.execute(
+        "SELECT rowid FROM tugas_cari WHERE tugas_cari MATCH 'chat : cn100 AND laporan' ORDER BY rowid"
+    ).fetchall() == [(1,), (2,)]
+    conn.close()
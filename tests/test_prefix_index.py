@@ -0,0 +1,52 @@
+import asyncio
+
+import prefix_index
+from prefix_index import PrefixIndex
+
+
+def _tugas(id_, matkul, deskripsi, deadline_ts=None):
+    return {'id': id_, 'matkul_nama': matkul, 'deskripsi': deskripsi, 'deadline_ts': deadline_ts}
+
+
+def _index(tugas_per_chat, matkul_per_chat=None):
+    async def muat_matkul(chat_id):
+        return (matkul_per_chat or {}).get(chat_id, [])
+
+    async def muat_tugas(chat_id):
+        return tugas_per_chat.get(chat_id, [])
+
+    return PrefixIndex(muat_matkul, muat_tugas)
+
+
+def _id(hasil):
+    return [(jenis, data['id']) for jenis, data in hasil]
+
+
+def test_cari_prefix_setelah_muat_dan_perubahan():
+    matkul = {1: [{'id': 5, 'nama': 'Kalkulus', 'hari': 'Senin', 'ruangan': 'G3E'}]}
+    index = _index({1: [_tugas(1, 'Kalkulus', 'Laporan integral', 200), _tugas(2, 'Fisika', 'Laporan gaya', 100)]}, matkul)
+
+    async def jalan():
+        assert _id(await index.cari([1], 'lapo')) == [('t', 2), ('t', 1)]
+        assert _id(await index.cari([1], 'kal')) == [('m', 5), ('t', 1)]
+        index.tambah_tugas(1, _tugas(3, 'Kimia', 'Laporan asam', 50))
+        index.hapus_tugas(1, 2)
+        assert _id(await index.cari([1], 'laporan')) == [('t', 3), ('t', 1)]
+        assert _id(await index.cari([1], 'laporan gaya')) == []
+
+    asyncio.run(jalan())
+
+
+def test_penghitung_perubahan_dibuang_bersama_partisi(monkeypatch):
+    monkeypatch.setattr(prefix_index, 'MAKS_PARTISI', 2)
+    index = _index({})
+
+    async def jalan():
+        for chat_id in range(10):
+            await index.cari([chat_id], '')
+            index.tambah_tugas(chat_id, _tugas(chat_id, 'Kalkulus', 'Laporan'))
+        # Chat yang partisinya belum pernah dimuat juga tidak dicatat.
+        index.hapus_tugas(99, 1)
+
+    asyncio.run(jalan())
+    assert set(index._ubah) == set(index._partisi) == {8, 9}
@@ -0,0 +1,152 @@
+import bisect
+import datetime
+import logging
+
+import async_db as adb
+import database as db
+import metrics
+from deadline import HARI, WIB, parse_rentang_jam
+
+logger = logging.getLogger(__name__)
+
+MENIT_SEHARI = 24 * 60
+MENIT_SEMINGGU = 7 * MENIT_SEHARI
+JOB_NAME = "pengingat_kelas"
+
+
+def menit_minggu(waktu: datetime.datetime) -> int:
+    """Menit ke berapa dalam minggu (Senin 00:00 WIB = 0) untuk `waktu`."""
+    waktu = waktu.astimezone(WIB)
+    return waktu.weekday() * MENIT_SEHARI + waktu.hour * 60 + waktu.minute
+
+
+class TimetableIndex:
+    """
+    Indeks jadwal mingguan: setiap matkul menjadi interval [mulai, selesai)
+    dalam menit-minggu, disimpan terurut menurut waktu mulai sehingga
+    pencarian kelas yang sedang/akan berlangsung cukup bisect, O(log n).
+
+    Matkul dengan hari atau jam yang tidak bisa dibaca dilewati. Rentang jam
+    tidak pernah melewati tengah malam (lihat parse_rentang_jam), jadi tidak
+    ada interval yang melewati akhir minggu.
+    """
+
+    def __init__(self, matkul_list):
+        entri = []
+        for matkul in matkul_list:
+            hari = HARI.get(str(matkul['hari']).strip().lower())
+            rentang = parse_rentang_jam(matkul['jam'])
+            if hari is None or rentang is None:
+                continue
+            mulai, selesai = rentang
+            entri.append((hari * MENIT_SEHARI + mulai, hari * MENIT_SEHARI + selesai, dict(matkul)))
+        entri.sort(key=lambda e: (e[0], e[1]))
+        self._entri = entri
+        self._mulai = [e[0] for e in entri]
+        self._durasi_maks = max((e[1] - e[0] for e in entri), default=0)
+
+    def __len__(self):
+        return len(self._entri)
+
+    def sedang_berlangsung(self, menit: int):
+        """Daftar (mulai, selesai, matkul) yang berlangsung pada menit-minggu `menit`."""
+        hasil = []
+        i = bisect.bisect_right(self._mulai, menit)
+        # Hanya interval yang mulai paling lama _durasi_maks menit sebelumnya yang mungkin masih berjalan.
+        while i > 0 and self._mulai[i - 1] > menit - self._durasi_maks:
+            i -= 1
+            if self._entri[i][1] > menit:
+                hasil.append(self._entri[i])
+        hasil.reverse()
+        return hasil
+
+    def berikutnya(self, menit: int):
+        """
+        Kelas pertama yang mulai setelah menit-minggu `menit` (berputar ke minggu
+        berikutnya). Mengembalikan (menit_mulai, [matkul...]) dengan menit_mulai
+        bisa melebihi MENIT_SEMINGGU, atau (None, []) jika indeks kosong.
+        """
+        if not self._mulai:
+            return None, []
+        i = bisect.bisect_right(self._mulai, menit)
+        geser = 0
+        if i == len(self._mulai):
+            i, geser = 0, MENIT_SEMINGGU
+        mulai = self._mulai[i]
+        j = bisect.bisect_right(self._mulai, mulai)
+        return mulai + geser, [e[2] for e in self._entri[i:j]]
+
+
+class ClassReminder:
+    """
+    Pengingat sebelum kelas dimulai untuk semua chat. Seperti ReminderScheduler,
+    hanya satu job aktif yang dijadwalkan tepat pada pengingat terdekat.
+    Indeks gabungan semua chat dibangun ulang hanya jika versi data matkul
+    (db.get_matkul_version(None)) berubah.
+    """
+
+    def __init__(self, kirim, menit_sebelum: int):
+        self._kirim = kirim
+        self.menit_sebelum = menit_sebelum
+        self._indeks = TimetableIndex([])
+        self._versi = None
+        self._job_queue = None
+        self._job = None
+        self._target = None
+
+    async def mulai(self, job_queue) -> None:
+        """Membangun indeks semua matkul lalu menjadwalkan pengingat pertama."""
+        self._job_queue = job_queue
+        await self.segarkan()
+
+    def berhenti(self) -> None:
+        """Membatalkan job pengingat kelas (cth: instance ini bukan lagi pemimpin, lihat lease.py)."""
+        if self._job is not None:
+            self._job.schedule_removal()
+        self._job_queue = None
+        self._job = None
+        self._versi = None
+
+    async def segarkan(self) -> None:
+        """Dipanggil setelah matkul berubah: membangun ulang indeks dan jadwal job jika perlu."""
+        if self._job_queue is None or self.menit_sebelum <= 0:
+            return
+        versi = db.get_matkul_version(None)
+        if versi != self._versi:
+            self._indeks = TimetableIndex(await adb.get_semua_matkul())
+            self._versi = versi
+            logger.info(f"Pengingat kelas: {len(self._indeks)} jadwal kelas diindeks.")
+        # Dikurangi satu supaya kelas yang pengingatnya jatuh di menit ini tidak terlewat.
+        self._jadwalkan(menit_minggu(datetime.datetime.now(WIB)) + self.menit_sebelum - 1)
+
+    def _jadwalkan(self, dari_menit: int) -> None:
+        """Menjadwalkan job pada pengingat kelas pertama yang mulai setelah `dari_menit`."""
+        if self._job is not None:
+            self._job.schedule_removal()
+            self._job = None
+        mulai, _ = self._indeks.berikutnya(dari_menit % MENIT_SEMINGGU)
+        if mulai is None:
+            self._target = None
+            return
+        self._target = mulai % MENIT_SEMINGGU
+        sekarang = datetime.datetime.now(WIB)
+        detik = (
+            (mulai - self.menit_sebelum - menit_minggu(sekarang)) % MENIT_SEMINGGU * 60
+            - sekarang.second - sekarang.microsecond / 1e6
+        )
+        self._job = self._job_queue.run_once(self._jalankan, max(0, detik), name=JOB_NAME)
+
+    @metrics.terukur('job', JOB_NAME)
+    async def _jalankan(self, context) -> None:
+        """Mengirim pengingat untuk semua kelas yang mulai pada menit target, lalu menjadwalkan berikutnya."""
+        self._job = None
+        target = self._target
+        mulai, matkul_list = self._indeks.berikutnya((target - 1) % MENIT_SEMINGGU)
+        if mulai is not None and mulai % MENIT_SEMINGGU == target:
+            for matkul in matkul_list:
+                try:
+                    await self._kirim(context, matkul, self.menit_sebelum)
+                except Exception as e:
+                    logger.error(f"Pengingat kelas: gagal mengirim ke chat {matkul['chat_id']}: {e}")
+        # Job bisa terlambat beberapa detik; lanjut dari menit target, bukan dari jam sekarang.
+        self._jadwalkan(target)
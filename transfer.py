@@ -0,0 +1,207 @@
+import csv
+import datetime
+import io
+import json
+
+import database as db
+from deadline import HARI, HARI_LENGKAP, WIB, parse_deadline, parse_rentang_jam
+
+# Kolom berkas impor/ekspor. Berkas hasil ekspor bisa langsung diimpor lagi.
+KOLOM = {
+    'matkul': ('nama', 'hari', 'jam', 'ruangan'),
+    'tugas': ('matkul', 'deskripsi', 'deadline', 'status'),
+}
+MAKS_UKURAN_IMPOR = 1024 * 1024
+MAKS_BARIS_IMPOR = 5000
+MAKS_PANJANG_TEKS = 500
+
+
+class ImporGagal(Exception):
+    """Berkas impor tidak bisa dibaca sama sekali (format, kolom, atau ukuran)."""
+
+
+def baca_berkas(data: bytes, nama_berkas: str, jenis: str):
+    """Membaca berkas CSV (pemisah , ; atau tab) atau JSON (list objek) menjadi list dict."""
+    try:
+        teks = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ImporGagal("berkas harus berencoding UTF-8.")
+
+    if nama_berkas.lower().endswith('.json'):
+        try:
+            baris = json.loads(teks)
+        except ValueError as e:
+            raise ImporGagal(f"JSON tidak valid ({e}).")
+        if not isinstance(baris, list) or not all(isinstance(b, dict) for b in baris):
+            raise ImporGagal("JSON harus berupa list objek, cth: [{\"nama\": ...}].")
+    else:
+        try:
+            dialek = csv.Sniffer().sniff(teks[:4096], delimiters=',;\t')
+        except csv.Error:
+            dialek = csv.excel
+        baris = list(csv.DictReader(io.StringIO(teks), dialect=dialek))
+
+    if len(baris) > MAKS_BARIS_IMPOR:
+        raise ImporGagal(f"maksimal {MAKS_BARIS_IMPOR} baris per impor.")
+    if baris:
+        kurang = [k for k in KOLOM[jenis] if k != 'status' and k not in baris[0]]
+        if kurang:
+            raise ImporGagal(f"kolom {', '.join(kurang)} tidak ada. Kolom yang dipakai: {', '.join(KOLOM[jenis])}.")
+    return baris
+
+
+def _teks(baris, kolom):
+    nilai = baris.get(kolom)
+    nilai = '' if nilai is None else str(nilai).strip()
+    if len(nilai) > MAKS_PANJANG_TEKS:
+        raise ValueError(f"{kolom} terlalu panjang")
+    return nilai
+
+
+def validasi_matkul(baris):
+    """Mengembalikan (data, error): data berisi (nama, hari, jam, ruangan) yang sudah dinormalkan."""
+    data, error = [], []
+    for nomor, b in enumerate(baris, start=1):
+        try:
+            nama, hari, jam, ruangan = (_teks(b, k) for k in KOLOM['matkul'])
+            if not nama:
+                raise ValueError("nama kosong")
+            if hari.lower() not in HARI:
+                raise ValueError(f"hari '{hari}' tidak dikenal")
+            rentang = parse_rentang_jam(jam)
+            if rentang is None:
+                raise ValueError(f"jam '{jam}' harus seperti 08:00 - 10:00")
+        except ValueError as e:
+            error.append(f"baris {nomor}: {e}")
+            continue
+        mulai, selesai = rentang
+        data.append((
+            nama,
+            HARI_LENGKAP[HARI[hari.lower()]],
+            f"{mulai // 60:02d}:{mulai % 60:02d} - {selesai // 60:02d}:{selesai % 60:02d}",
+            ruangan or '-',
+        ))
+    return data, error
+
+
+def validasi_tugas(baris, now=None):
+    """Mengembalikan (data, error): data berisi (matkul, deskripsi, deadline, deadline_ts, status)."""
+    now = now or datetime.datetime.now(WIB)
+    data, error = [], []
+    for nomor, b in enumerate(baris, start=1):
+        try:
+            matkul, deskripsi, deadline, status = (_teks(b, k) for k in KOLOM['tugas'])
+            if not matkul or not deskripsi:
+                raise ValueError("matkul dan deskripsi wajib diisi")
+            deadline_ts = parse_deadline(deadline, now=now)
+            if deadline_ts is None:
+                raise ValueError(f"deadline '{deadline}' tidak dikenali")
+            status = status.lower() or 'pending'
+            if status not in ('pending', 'done'):
+                raise ValueError(f"status '{status}' harus pending atau done")
+        except ValueError as e:
+            error.append(f"baris {nomor}: {e}")
+            continue
+        data.append((matkul, deskripsi, deadline, deadline_ts, status))
+    return data, error
+
+
+def siapkan_impor(jenis, data: bytes, nama_berkas: str):
+    """Membaca dan memvalidasi berkas impor; mengembalikan (baris_valid, daftar_error)."""
+    baris = baca_berkas(data, nama_berkas, jenis)
+    if jenis == 'matkul':
+        return validasi_matkul(baris)
+    return validasi_tugas(baris)
+
+
+# --- Ekspor ---
+
+def _deadline_ekspor(tugas):
+    # Deadline relatif ("Besok") ditulis sebagai tanggal absolut supaya aman diimpor ulang.
+    if tugas['deadline_ts'] is None:
+        return tugas['deadline']
+    return datetime.datetime.fromtimestamp(tugas['deadline_ts'], WIB).strftime('%Y-%m-%d %H:%M')
+
+
+def ekspor_csv(chat_id, jenis, berkas) -> None:
+    """Menulis matkul/tugas sebuah chat sebagai CSV ke berkas biner, baris demi baris dari DB."""
+    teks = io.TextIOWrapper(berkas, encoding='utf-8', newline='')
+    writer = csv.writer(teks)
+    writer.writerow(KOLOM[jenis])
+    if jenis == 'matkul':
+        for row in db.iter_matkul(chat_id):
+            writer.writerow((row['nama'], row['hari'], row['jam'], row['ruangan']))
+    else:
+        for row in db.iter_tugas(chat_id):
+            writer.writerow((row['matkul_nama'], row['deskripsi'], _deadline_ekspor(row), row['status']))
+    teks.flush()
+    teks.detach()
+
+
+def _ical_teks(teks):
+    return (
+        str(teks).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def _ical_waktu(waktu):
+    return waktu.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _ical_baris(berkas, baris) -> None:
+    """Menulis satu baris iCalendar, dilipat per 75 byte sesuai RFC 5545."""
+    data = baris.encode()
+    batas = 75
+    while len(data) > batas:
+        potong = batas
+        # Jangan memotong di tengah karakter UTF-8.
+        while data[potong] & 0xC0 == 0x80:
+            potong -= 1
+        berkas.write(data[:potong] + b"\r\n ")
+        data = data[potong:]
+        # Baris lanjutan diawali spasi, jadi isinya paling banyak 74 byte.
+        batas = 74
+    berkas.write(data + b"\r\n")
+
+
+def ekspor_ical(chat_id, berkas, now=None) -> None:
+    """
+    Menulis feed iCalendar: setiap matkul sebagai acara mingguan dan setiap
+    tugas pending sebagai acara pada waktu deadline-nya.
+    """
+    now = now or datetime.datetime.now(WIB)
+    hari_ini = now.astimezone(WIB).date()
+    stamp = _ical_waktu(now)
+    for baris in ("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//task-manager//bot tugas//ID",
+                  "CALSCALE:GREGORIAN", "X-WR-CALNAME:Jadwal & Tugas", "X-WR-TIMEZONE:Asia/Jakarta"):
+        _ical_baris(berkas, baris)
+
+    for matkul in db.iter_matkul(chat_id):
+        hari = HARI.get(matkul['hari'].lower())
+        rentang = parse_rentang_jam(matkul['jam'])
+        if hari is None or rentang is None:
+            continue
+        tanggal = hari_ini + datetime.timedelta(days=(hari - hari_ini.weekday()) % 7)
+        mulai, selesai = (
+            datetime.datetime.combine(tanggal, datetime.time(menit // 60, menit % 60), tzinfo=WIB)
+            for menit in rentang
+        )
+        for baris in (
+            "BEGIN:VEVENT", f"UID:matkul-{matkul['id']}@task-manager", f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ical_waktu(mulai)}", f"DTEND:{_ical_waktu(selesai)}", "RRULE:FREQ=WEEKLY",
+            f"SUMMARY:{_ical_teks(matkul['nama'])}", f"LOCATION:{_ical_teks(matkul['ruangan'])}", "END:VEVENT",
+        ):
+            _ical_baris(berkas, baris)
+
+    for tugas in db.iter_tugas(chat_id):
+        if tugas['status'] != 'pending' or tugas['deadline_ts'] is None:
+            continue
+        deadline = datetime.datetime.fromtimestamp(tugas['deadline_ts'], WIB)
+        for baris in (
+            "BEGIN:VEVENT", f"UID:tugas-{tugas['id']}@task-manager", f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ical_waktu(deadline)}", f"SUMMARY:{_ical_teks('Deadline: ' + tugas['matkul_nama'])}",
+            f"DESCRIPTION:{_ical_teks(tugas['deskripsi'])}", "END:VEVENT",
+        ):
+            _ical_baris(berkas, baris)
+
+    _ical_baris(berkas, "END:VCALENDAR")